@@ -1,14 +1,25 @@
+import ipaddress
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from ipwhois import IPWhois
 from ipwhois.exceptions import IPDefinedError
 from core.json_utils import safe_json_dump
+from core.http_cache import cached_call
+from core.network_index import NetworkIndex, most_specific_network
+
+# Network allocations change slowly.
+IP_CACHE_TTL = 7 * 24 * 3600
+
+@cached_call("ipwhois", IP_CACHE_TTL, key=lambda ip_address: ip_address.strip())
+def lookup_ip_whois(ip_address):
+    return IPWhois(ip_address).lookup_whois()
 
 def get_ip_info(ip_address):
     """
     Retrieves information for a given IP address.
     """
     try:
-        obj = IPWhois(ip_address)
-        results = obj.lookup_whois()
+        results = lookup_ip_whois(ip_address)
         return results
     except IPDefinedError as e:
         print(f"IP address is private: {ip_address}. Error: {e}")
@@ -16,3 +27,85 @@ def get_ip_info(ip_address):
     except Exception as e:
         print(f"Error retrieving IP info for {ip_address}: {e}")
         return None
+
+def bucket_of(address):
+    """Neighbourhood (/24 or /48) used to pick one representative lookup per round."""
+    prefixlen = 24 if address.version == 4 else 48
+    return ipaddress.ip_network(f"{address}/{prefixlen}", strict=False)
+
+def get_ip_info_bulk(ip_addresses, max_workers=8, on_result=None):
+    """
+    Retrieves information for many IP addresses.
+
+    Addresses inside a network already resolved by an earlier lookup are
+    answered from the NetworkIndex without a registry query. The rest are
+    looked up in rounds through a pool of max_workers threads: each round
+    queries one address per /24 (/48 for IPv6), indexes the networks it
+    learns and re-checks the remaining addresses before the next round.
+
+    Returns {ip: result or None}; on_result(ip, result), if given, is
+    called as each address is resolved.
+    """
+    index = get_network_index()
+    results = {}
+    pending = []
+
+    def resolve(ip, value):
+        results[ip] = value
+        if on_result:
+            on_result(ip, value)
+
+    def from_index(ip):
+        hit = index.lookup(ip)
+        if hit is None:
+            return False
+        cidr, source_ip = hit
+        source = get_ip_info(source_ip)
+        if source is None:
+            return False
+        answer = dict(source)
+        answer["query"] = ip
+        answer["resolved_from"] = {"network": cidr, "query": source_ip}
+        resolve(ip, answer)
+        return True
+
+    for ip in dict.fromkeys(ip.strip() for ip in ip_addresses if ip and ip.strip()):
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            print(f"Skipping invalid IP address: {ip}")
+            resolve(ip, None)
+            continue
+        if not address.is_global:
+            resolve(ip, None)
+        elif not from_index(ip):
+            pending.append(address)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending:
+            representatives = {}
+            for address in pending:
+                representatives.setdefault(bucket_of(address), address)
+            futures = {str(a): pool.submit(get_ip_info, str(a)) for a in representatives.values()}
+            for ip, future in futures.items():
+                data = future.result()
+                if data:
+                    network = most_specific_network(ip, data)
+                    if network:
+                        index.add(network, ip)
+                resolve(ip, data)
+            pending = [a for a in pending if str(a) not in results and not from_index(str(a))]
+
+    index.save()
+    return results
+
+_network_index = None
+_network_index_lock = threading.Lock()
+
+def get_network_index():
+    """Returns the process-wide NetworkIndex."""
+    global _network_index
+    with _network_index_lock:
+        if _network_index is None:
+            _network_index = NetworkIndex()
+        return _network_index
@@ -1,11 +1,10 @@
-import os
-import shutil
-from sherlock import sherlock
 from notify import QueryNotify
-from sites import SitesInformation
-import result as sherlock_result
 from result import QueryStatus
-from PyQt5.QtCore import QObject, pyqtSignal
+
+from collectors.site_manifest import load_manifest
+from collectors.site_stats import get_site_stats
+from collectors.site_scheduler import order_sites
+from collectors.username_probe import run_probe, run_batch_probe, DEFAULT_CONCURRENCY, DEFAULT_PER_HOST, DEFAULT_SITE_TIMEOUT
 
 class SilentNotifier(QueryNotify):
     def start(self, username):
@@ -19,56 +18,67 @@ class SilentNotifier(QueryNotify):
     def __exit__(self, exc_type, exc_val, exc_tb):
         pass
 
-class RealtimeNotifier(QueryNotify, QObject):
-    """Notifier that emits PyQt signals for real-time updates."""
-    progress = pyqtSignal(int, int)
-    result_found = pyqtSignal(str, str, str)
-    finished = pyqtSignal()
-
-    def __init__(self, total_sites=0):
-        super(RealtimeNotifier, self).__init__()
-        QObject.__init__(self)
-        self.counter = 0
-        self.total = total_sites
-
-    def start(self, message):
-        # This method is called by Sherlock, but we don't need to do anything here
-        # as we've already initialized the total count.
-        pass
+def scan_username(username, notifier=None, concurrency=DEFAULT_CONCURRENCY,
+                  per_host=DEFAULT_PER_HOST, timeout=DEFAULT_SITE_TIMEOUT, top_k=None,
+                  cancel=None):
+    """
+    Scans for a given username across social networks.
 
-    def update(self, result):
-        self.counter += 1
-        self.progress.emit(self.counter, self.total)
-        if result.status == sherlock_result.QueryStatus.CLAIMED:
-            self.result_found.emit(result.site_name, result.site_url_user, "Found")
+    Sites are probed concurrently by the asyncio engine in
+    collectors.username_probe; `concurrency` caps probes in flight,
+    `per_host` caps connections per host and `timeout` is the upper bound
+    on the per-site deadline, which shrinks for sites whose latency history
+    (collectors.site_stats) says they answer faster. Results are delivered
+    through the notifier as they arrive, and the claimed accounts are
+    returned as a list of {"site", "url"} dicts.
 
-    def finish(self):
-        self.finished.emit()
-    def __enter__(self):
-        return self
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        pass
+    Sites with the best historical hit rate and latency are probed first;
+    `top_k` limits the scan to that many of them for a quick triage pass.
+    Setting the `cancel` event aborts the scan, including probes in flight.
+    """
+    # Parsed and compiled once per process; see collectors.site_manifest.
+    manifest = load_manifest()
+    stats = get_site_stats()
+    sites = order_sites(manifest, stats, top_k=top_k)
+    query_notify = notifier if notifier else SilentNotifier()
+    if getattr(query_notify, "total", None) == 0:
+        query_notify.total = len(sites)
+    results = run_probe(username, sites, query_notify, concurrency=concurrency,
+                        per_host=per_host, timeout=timeout, stats=stats, cancel=cancel)
+    return claimed_hits(results)
 
-def scan_username(username, notifier=None):
+def scan_usernames(usernames, notifier=None, on_username_done=None,
+                   concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                   timeout=DEFAULT_SITE_TIMEOUT, top_k=None, cancel=None):
     """
-    Scans for a given username across social networks using Sherlock.
-    Returns a list of found URLs.
+    Scans many usernames together over one shared HTTP session.
+
+    on_username_done(username, hits) is called from the scanning thread as
+    soon as every site has been checked for that username, where hits is a
+    list of {"site", "url"} dicts for the claimed accounts. Site order,
+    `top_k` and `cancel` work as in scan_username.
     """
-    data_file_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'resources', 'data.json'))
-    sites = SitesInformation(data_file_path)
-    site_data_for_sherlock = {name: site.information for name, site in sites.sites.items()}
-    total_sites = len(site_data_for_sherlock)
-    query_notify = notifier if notifier else RealtimeNotifier(total_sites=total_sites)
-    # The sherlock function is blocking, but our notifier will give us live results.
-    sherlock(username, site_data_for_sherlock, query_notify, timeout=60)
+    manifest = load_manifest()
+    stats = get_site_stats()
+    sites = order_sites(manifest, stats, top_k=top_k)
+    usernames = list(dict.fromkeys(u for u in usernames if u))
+    total = len(usernames) * len(sites)
+    query_notify = notifier if notifier else SilentNotifier()
+    if getattr(query_notify, "total", None) == 0:
+        query_notify.total = total
+
+    def username_done(username, results):
+        if on_username_done:
+            on_username_done(username, claimed_hits(results))
 
-    # Permanently fix the caching issue by deleting the created folder.
-    if os.path.isdir(username):
-        try:
-            shutil.rmtree(username)
-        except OSError as e:
-            print(f"Error removing directory {username}: {e}")
+    run_batch_probe(usernames, sites, query_notify, on_username_done=username_done,
+                    concurrency=concurrency, per_host=per_host, timeout=timeout,
+                    stats=stats, cancel=cancel)
 
-    # The results will be collected via the notifier's signals, so we return nothing here.
-    # The original return value is now redundant.
-    return []
+def claimed_hits(results):
+    """Turns {site_name: QueryResult} into a list of {"site", "url"} for claimed accounts."""
+    return [
+        {"site": site_name, "url": result.site_url_user}
+        for site_name, result in sorted(results.items())
+        if result.status == QueryStatus.CLAIMED
+    ]
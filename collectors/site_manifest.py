@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+
+from core.paths import RESOURCES_DIR, cache_path
+
+DEFAULT_MANIFEST_PATH = os.path.join(RESOURCES_DIR, 'data.json')
+# Bump when SiteEntry changes so stale pickles are rebuilt.
+CACHE_FORMAT = 1
+ERROR_TYPES = ("status_code", "message", "response_url")
+REQUEST_METHODS = ("GET", "HEAD", "POST", "PUT")
+
+
+class SiteEntry:
+    """A validated, pre-compiled site definition from the manifest."""
+    __slots__ = ("name", "url", "url_main", "url_probe", "error_type", "error_msgs",
+                 "error_codes", "regex", "method", "headers", "payload", "is_nsfw")
+
+    def __init__(self, name, info):
+        self.name = name
+        self.url = info["url"]
+        self.url_main = info.get("urlMain")
+        self.url_probe = info.get("urlProbe")
+        self.error_type = info["errorType"]
+        if self.error_type not in ERROR_TYPES:
+            raise ValueError(f"unknown errorType '{self.error_type}'")
+
+        error_msgs = info.get("errorMsg") or ()
+        self.error_msgs = (error_msgs,) if isinstance(error_msgs, str) else tuple(error_msgs)
+        error_codes = info.get("errorCode")
+        if error_codes is None:
+            self.error_codes = ()
+        else:
+            self.error_codes = (error_codes,) if isinstance(error_codes, int) else tuple(error_codes)
+        if self.error_type == "message" and not self.error_msgs:
+            raise ValueError("errorType 'message' without errorMsg")
+
+        regex = info.get("regexCheck")
+        self.regex = re.compile(regex) if regex else None
+
+        method = info.get("request_method")
+        if method is not None and method not in REQUEST_METHODS:
+            raise ValueError(f"unsupported request_method '{method}'")
+        if method is None:
+            # Status-code detection doesn't need the body.
+            method = "HEAD" if self.error_type == "status_code" else "GET"
+        self.method = method
+        self.headers = dict(info.get("headers", {}))
+        self.payload = info.get("request_payload")
+        self.is_nsfw = bool(info.get("isNSFW"))
+
+
+class SiteManifest:
+    """The compiled site list, in manifest order."""
+    def __init__(self, sites, digest):
+        self.sites = sites
+        self.digest = digest
+        self.by_name = {site.name: site for site in sites}
+
+    def __len__(self):
+        return len(self.sites)
+
+    def __iter__(self):
+        return iter(self.sites)
+
+
+def compile_manifest(raw, digest=None):
+    """Validates and compiles a parsed manifest dict, skipping broken entries."""
+    sites = []
+    for name, info in raw.items():
+        if name.startswith("$") or not isinstance(info, dict):
+            continue
+        try:
+            sites.append(SiteEntry(name, info))
+        except (KeyError, ValueError, re.error) as e:
+            print(f"Skipping site {name} in manifest: {e}")
+    return SiteManifest(sites, digest)
+
+
+_lock = threading.Lock()
+_loaded = {}  # {path: (mtime_ns, size, manifest)}
+
+
+def _cache_file(path):
+    stem = hashlib.sha1(path.encode('utf-8')).hexdigest()[:12]
+    return cache_path(f"site_manifest_{stem}.pickle")
+
+
+def _read_pickle(pickle_path, digest):
+    try:
+        with open(pickle_path, 'rb') as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if cached.get("format") != CACHE_FORMAT or cached.get("digest") != digest:
+        return None
+    return cached["manifest"]
+
+
+def _write_pickle(pickle_path, digest, manifest):
+    tmp_path = pickle_path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({"format": CACHE_FORMAT, "digest": digest, "manifest": manifest},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, pickle_path)
+    except OSError as e:
+        print(f"Error writing manifest cache {pickle_path}: {e}")
+
+
+def load_manifest(path=DEFAULT_MANIFEST_PATH):
+    """
+    Returns the compiled manifest for path.
+
+    The result is shared by every scan in the process until the JSON file's
+    mtime or size changes. Across restarts, a pickled copy keyed by the file's
+    SHA-256 skips JSON parsing and regex compilation.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with _lock:
+        loaded = _loaded.get(path)
+        if loaded and loaded[0] == stat.st_mtime_ns and loaded[1] == stat.st_size:
+            return loaded[2]
+
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        pickle_path = _cache_file(path)
+        manifest = _read_pickle(pickle_path, digest)
+        if manifest is None:
+            manifest = compile_manifest(json.loads(content), digest)
+            _write_pickle(pickle_path, digest, manifest)
+
+        _loaded[path] = (stat.st_mtime_ns, stat.st_size, manifest)
+        return manifest
@@ -0,0 +1,77 @@
+import json
+import os
+from collections import Counter
+from urllib.parse import urlparse
+
+from core.result_store import get_result_store
+from core import storage
+
+# Number of sites probed by a quick (triage) scan.
+QUICK_SCAN_SITES = 50
+# Median latency assumed for sites we have no samples for, in seconds.
+UNKNOWN_LATENCY = 1.0
+
+
+def _host(url):
+    host = urlparse(url or "").netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def count_saved_hits(manifest, data_dir=None):
+    """
+    Counts CLAIMED sites across every target's saved username results.
+
+    Reads the latest Username scan of each target in the result store, plus
+    legacy data/<target>/username.json files of targets not in the store.
+    Returns (number of saved username scans, Counter of site name -> hits).
+    Entries saved as bare URLs are matched to a site by host.
+    """
+    data_dir = data_dir or storage.DATA_DIR
+    hosts = {_host(site.url_main): site.name for site in manifest if site.url_main}
+    saved = dict(get_result_store(data_dir).iter_latest("Username"))
+    file_name = storage.scan_file_name("Username")
+    if os.path.isdir(data_dir):
+        for target in os.listdir(data_dir):
+            path = os.path.join(data_dir, target, file_name)
+            if target in saved or not os.path.isfile(path):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    saved[target] = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+    hits = Counter()
+    for entries in saved.values():
+        found = set()
+        for entry in entries or []:
+            if isinstance(entry, dict):
+                name = entry.get("site") or hosts.get(_host(entry.get("url")))
+            else:
+                name = hosts.get(_host(str(entry)))
+            if name in manifest.by_name:
+                found.add(name)
+        hits.update(found)
+    return len(saved), hits
+
+
+def order_sites(manifest, stats, top_k=None):
+    """
+    Returns the manifest's sites ordered so likely hits on fast sites come first.
+
+    Sites are ranked by smoothed CLAIMED rate divided by expected (median)
+    latency; sites whose circuit breaker is open go last. With top_k, only
+    the best top_k sites are returned (quick triage mode).
+    """
+    if not stats.seeded:
+        scans, hits = count_saved_hits(manifest)
+        stats.seed_hits([site.name for site in manifest], scans, hits)
+
+    def score(site):
+        latency = stats.latency(site.name, 50) or UNKNOWN_LATENCY
+        return stats.hit_rate(site.name) / (1.0 + latency)
+
+    ranked = sorted(manifest, key=lambda site: (stats.is_skipped(site.name), -score(site)))
+    if top_k is not None:
+        ranked = ranked[:top_k]
+    return ranked
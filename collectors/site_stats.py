@@ -0,0 +1,200 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from result import QueryStatus
+
+from core.paths import cache_path
+
+# Latency samples kept per site; older ones roll off.
+MAX_SAMPLES = 50
+# Below this many samples we fall back to the caller's default timeout.
+MIN_SAMPLES = 5
+# A site's timeout is its p95 latency times this factor, within the bounds below.
+TIMEOUT_P95_FACTOR = 3.0
+MIN_TIMEOUT = 3.0
+# Sites whose median latency is above this get a hedged second request.
+SLOW_SITE_LATENCY = 2.0
+# Consecutive failures before a site is skipped, and for how long (seconds).
+CIRCUIT_FAILURES = 5
+CIRCUIT_COOLDOWN = 30 * 60
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of a list of numbers (q in 0..100)."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = max(0, math.ceil(q / 100.0 * len(ordered)) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class SiteStats:
+    """Latency, failure and hit history for one site."""
+    __slots__ = ("latencies", "requests", "errors", "consecutive_failures", "skip_until",
+                 "checks", "hits")
+
+    def __init__(self, latencies=(), requests=0, errors=0, consecutive_failures=0, skip_until=0.0,
+                 checks=0, hits=0):
+        self.latencies = deque(latencies, maxlen=MAX_SAMPLES)
+        self.requests = requests
+        self.errors = errors
+        self.consecutive_failures = consecutive_failures
+        self.skip_until = skip_until
+        # Usernames checked on this site and how many of them were CLAIMED.
+        self.checks = checks
+        self.hits = hits
+
+    def to_dict(self):
+        return {
+            "latencies": [round(x, 3) for x in self.latencies],
+            "requests": self.requests,
+            "errors": self.errors,
+            "consecutive_failures": self.consecutive_failures,
+            "skip_until": self.skip_until,
+            "checks": self.checks,
+            "hits": self.hits,
+        }
+
+    @property
+    def error_rate(self):
+        return self.errors / self.requests if self.requests else 0.0
+
+
+class SiteStatsStore:
+    """
+    Per-site latency percentiles and failure counts, persisted as JSON.
+
+    Used by the probe engine to size each site's timeout, to decide which
+    sites get a hedged request and to skip sites that keep failing.
+    """
+    def __init__(self, path=None):
+        self.path = path or cache_path("site_stats.json")
+        self.sites = {}
+        # True once hit counts from previously saved scans have been folded in.
+        self.seeded = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading site stats {self.path}: {e}")
+            return
+        with self._lock:
+            self.seeded = raw.get("seeded", False)
+            self.sites = {name: SiteStats(**entry) for name, entry in raw.get("sites", {}).items()}
+
+    def save(self):
+        with self._lock:
+            raw = {
+                "seeded": self.seeded,
+                "sites": {name: stats.to_dict() for name, stats in self.sites.items()},
+            }
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(raw, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving site stats {self.path}: {e}")
+
+    def get(self, site_name):
+        return self.sites.get(site_name)
+
+    def record(self, result):
+        """Records the outcome of one probe (a QueryResult)."""
+        if result.status == QueryStatus.ILLEGAL or result.query_time is None:
+            return
+        with self._lock:
+            stats = self.sites.setdefault(result.site_name, SiteStats())
+            stats.requests += 1
+            if result.status != QueryStatus.UNKNOWN:
+                stats.checks += 1
+            if result.status == QueryStatus.CLAIMED:
+                stats.hits += 1
+            if result.status == QueryStatus.UNKNOWN:
+                stats.errors += 1
+                stats.consecutive_failures += 1
+                if stats.consecutive_failures >= CIRCUIT_FAILURES:
+                    stats.skip_until = time.time() + CIRCUIT_COOLDOWN
+            else:
+                stats.latencies.append(result.query_time)
+                stats.consecutive_failures = 0
+                stats.skip_until = 0.0
+
+    def seed_hits(self, site_names, checks, hits_by_site):
+        """
+        Folds in hit counts from scans saved before telemetry existed.
+
+        checks is the number of saved username scans; hits_by_site maps a
+        site name to how many of them found an account there.
+        """
+        with self._lock:
+            for name in site_names:
+                stats = self.sites.setdefault(name, SiteStats())
+                stats.checks += checks
+                stats.hits += hits_by_site.get(name, 0)
+            self.seeded = True
+
+    def hit_rate(self, site_name, prior=0.05, weight=10):
+        """CLAIMED rate smoothed towards prior, so rarely checked sites aren't all-or-nothing."""
+        stats = self.sites.get(site_name)
+        hits, checks = (stats.hits, stats.checks) if stats else (0, 0)
+        return (hits + prior * weight) / (checks + weight)
+
+    def latency(self, site_name, q):
+        """The site's q-th latency percentile, or None without enough history."""
+        with self._lock:
+            stats = self.sites.get(site_name)
+            if stats is None or len(stats.latencies) < MIN_SAMPLES:
+                return None
+            samples = list(stats.latencies)
+        return percentile(samples, q)
+
+    def timeout_for(self, site_name, default):
+        """Timeout derived from the site's p95 latency, never above default."""
+        p95 = self.latency(site_name, 95)
+        if p95 is None:
+            return default
+        return min(default, max(MIN_TIMEOUT, p95 * TIMEOUT_P95_FACTOR))
+
+    def hedge_delay(self, site_name, timeout):
+        """
+        Seconds to wait before sending a hedged duplicate request, or None.
+
+        Only usually-slow sites are hedged; the duplicate goes out once the
+        first request has taken longer than the site's p95.
+        """
+        p50 = self.latency(site_name, 50)
+        if p50 is None or p50 < SLOW_SITE_LATENCY:
+            return None
+        delay = self.latency(site_name, 95)
+        if delay >= timeout:
+            return None
+        return delay
+
+    def is_skipped(self, site_name):
+        """True while the site's circuit breaker is open."""
+        stats = self.sites.get(site_name)
+        return stats is not None and stats.skip_until > time.time()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_site_stats():
+    """Returns the process-wide SiteStatsStore."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SiteStatsStore()
+        return _store
@@ -0,0 +1,268 @@
+import asyncio
+import time
+
+import aiohttp
+from result import QueryResult, QueryStatus
+
+# Upper bound on probes in flight at once, across all sites.
+DEFAULT_CONCURRENCY = 64
+# Connections kept open to a single host; keeps us polite to shared CDNs.
+DEFAULT_PER_HOST = 4
+# Deadline for a single site, in seconds (connect + response + body).
+DEFAULT_SITE_TIMEOUT = 15
+# How often a cancellable scan checks whether it has been cancelled.
+CANCEL_POLL_INTERVAL = 0.2
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/116.0"
+
+# Fingerprints of WAF challenge pages (same list Sherlock uses).
+WAF_HIT_MSGS = [
+    '.loading-spinner{visibility:hidden}body.no-js .challenge-running{display:none}body.dark{background-color:#222;color:#d9d9d9}body.dark a{color:#fff}body.dark a:hover{color:#ee730a;text-decoration:underline}body.dark .lds-ring div{border-color:#999 transparent transparent}body.dark .font-red{color:#b20f03}body.dark',
+    '{return l.onPageView}}),Object.defineProperty(r,"perimeterxIdentifiers",{enumerable:',
+]
+
+
+def interpolate(value, username):
+    """Replaces the '{}' placeholder in manifest strings, dicts and lists."""
+    if isinstance(value, str):
+        return value.replace("{}", username)
+    if isinstance(value, dict):
+        return {k: interpolate(v, username) for k, v in value.items()}
+    if isinstance(value, list):
+        return [interpolate(v, username) for v in value]
+    return value
+
+
+def build_request(username, site):
+    """
+    Builds the request for one SiteEntry.
+
+    Returns None when the username is not valid for the site (regexCheck).
+    """
+    if site.regex is not None and site.regex.search(username) is None:
+        return None
+
+    url = interpolate(site.url, username.replace(' ', '%20'))
+    probe_url = interpolate(site.url_probe, username) if site.url_probe else url
+
+    headers = {"User-Agent": USER_AGENT}
+    headers.update(site.headers)
+
+    payload = site.payload
+    if payload is not None:
+        payload = interpolate(payload, username)
+
+    return {
+        "url": url,
+        "probe_url": probe_url,
+        "method": site.method,
+        "headers": headers,
+        "json": payload,
+        # response_url sites redirect when the user doesn't exist.
+        "allow_redirects": site.error_type != "response_url",
+    }
+
+
+def classify_response(site, status_code, text):
+    """Maps an HTTP response onto a QueryStatus using the site's errorType."""
+    if text and any(msg in text for msg in WAF_HIT_MSGS):
+        return QueryStatus.WAF
+
+    if site.error_type == "message":
+        if any(error in text for error in site.error_msgs):
+            return QueryStatus.AVAILABLE
+        return QueryStatus.CLAIMED
+    if site.error_type == "status_code":
+        if status_code in site.error_codes:
+            return QueryStatus.AVAILABLE
+        if status_code >= 300 or status_code < 200:
+            return QueryStatus.AVAILABLE
+        return QueryStatus.CLAIMED
+    if 200 <= status_code < 300:
+        return QueryStatus.CLAIMED
+    return QueryStatus.AVAILABLE
+
+
+async def fetch(session, request, site, timeout):
+    """Sends one probe request and returns (QueryStatus, error context)."""
+    try:
+        async with session.request(
+            request["method"],
+            request["probe_url"],
+            headers=request["headers"],
+            json=request["json"],
+            allow_redirects=request["allow_redirects"],
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as resp:
+            text = ""
+            if request["method"] != "HEAD":
+                text = await resp.text(errors="replace")
+            return classify_response(site, resp.status, text), None
+    except asyncio.TimeoutError:
+        return QueryStatus.UNKNOWN, "Timeout Error"
+    except aiohttp.ClientConnectionError:
+        return QueryStatus.UNKNOWN, "Error Connecting"
+    except aiohttp.ClientError:
+        return QueryStatus.UNKNOWN, "Unknown Error"
+
+
+async def hedged_fetch(session, request, site, timeout, hedge_after):
+    """
+    Like fetch(), but sends a duplicate request if the first one is still
+    pending after hedge_after seconds, and keeps whichever answers first.
+    """
+    first = asyncio.ensure_future(fetch(session, request, site, timeout))
+    done, _ = await asyncio.wait({first}, timeout=hedge_after)
+    if done:
+        return first.result()
+
+    second = asyncio.ensure_future(fetch(session, request, site, timeout - hedge_after))
+    pending = {first, second}
+    outcome = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            outcome = next(iter(done)).result()
+            # An error from one copy doesn't count while the other may still succeed.
+            if outcome[0] != QueryStatus.UNKNOWN:
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+    return outcome
+
+
+async def probe_site(session, username, site, timeout=DEFAULT_SITE_TIMEOUT, stats=None):
+    """
+    Checks a single site and returns a QueryResult.
+
+    With a SiteStatsStore, the site's timeout comes from its latency history,
+    usually-slow sites are hedged and sites with an open circuit breaker are
+    skipped without a request.
+    """
+    request = build_request(username, site)
+    if request is None:
+        url = interpolate(site.url, username)
+        return QueryResult(username, site.name, url, QueryStatus.ILLEGAL)
+    if stats is not None and stats.is_skipped(site.name):
+        return QueryResult(username, site.name, request["url"], QueryStatus.UNKNOWN,
+                           context="Skipped (repeated failures)")
+
+    hedge_after = None
+    if stats is not None:
+        timeout = stats.timeout_for(site.name, timeout)
+        if request["method"] in ("GET", "HEAD"):
+            hedge_after = stats.hedge_delay(site.name, timeout)
+
+    started = time.monotonic()
+    if hedge_after is None:
+        status, context = await fetch(session, request, site, timeout)
+    else:
+        status, context = await hedged_fetch(session, request, site, timeout, hedge_after)
+
+    return QueryResult(
+        username, site.name, request["url"], status,
+        query_time=time.monotonic() - started, context=context,
+    )
+
+
+def interleave(usernames, sites):
+    """
+    Yields (username, site) jobs username by username.
+
+    Consecutive jobs go to different sites, so the requests in flight at any
+    moment are spread across hosts rather than piling onto one.
+    """
+    for username in usernames:
+        for site in sites:
+            yield username, site
+
+
+async def probe_usernames(usernames, sites, notifier, on_username_done=None,
+                          concurrency=DEFAULT_CONCURRENCY,
+                          per_host=DEFAULT_PER_HOST,
+                          timeout=DEFAULT_SITE_TIMEOUT,
+                          stats=None, cancel=None):
+    """
+    Probes every SiteEntry in sites for each username over one shared session.
+
+    A fixed set of `concurrency` workers pulls jobs from interleave(), so
+    connections (and their TCP/TLS setup) are reused across usernames. The
+    notifier's update() is called as each probe finishes; on_username_done,
+    if given, is called with (username, {site_name: QueryResult}) once all
+    of a username's sites are done. Every result is recorded in stats (a
+    SiteStatsStore), if given, and the store is saved at the end.
+
+    cancel, if given, is a threading.Event; once it is set no new probes
+    start and the ones in flight are aborted. Sites not probed by then are
+    missing from the returned results.
+    """
+    usernames = list(dict.fromkeys(usernames))
+    sites = list(sites)
+    results = {username: {} for username in usernames}
+    jobs = interleave(usernames, sites)
+
+    for username in usernames:
+        notifier.start(username)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ttl_dns_cache=300)
+
+    async def worker():
+        # Each next() on the shared generator runs to completion before the
+        # event loop switches, so jobs are handed out exactly once.
+        for username, site in jobs:
+            if cancel is not None and cancel.is_set():
+                break
+            result = await probe_site(session, username, site, timeout, stats)
+            if stats is not None:
+                stats.record(result)
+            user_results = results[username]
+            user_results[site.name] = result
+            notifier.update(result)
+            if on_username_done and len(user_results) == len(sites):
+                on_username_done(username, user_results)
+
+    async def watch_cancel(tasks):
+        while not cancel.is_set():
+            await asyncio.sleep(CANCEL_POLL_INTERVAL)
+        for task in tasks:
+            task.cancel()
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        workers = [asyncio.ensure_future(worker()) for _ in range(max(1, concurrency))]
+        watcher = asyncio.ensure_future(watch_cancel(workers)) if cancel is not None else None
+        try:
+            await asyncio.gather(*workers)
+        except asyncio.CancelledError:
+            if cancel is None or not cancel.is_set():
+                raise
+            # Let the aborted probes unwind before the session closes.
+            await asyncio.gather(*workers, return_exceptions=True)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    if stats is not None:
+        stats.save()
+    notifier.finish()
+    return results
+
+
+async def probe_username(username, sites, notifier, **kwargs):
+    """
+    Probes every SiteEntry in sites for username.
+
+    The notifier's update() is called as each site finishes, in completion
+    order, so the slowest site no longer holds back the others.
+    """
+    results = await probe_usernames([username], sites, notifier, **kwargs)
+    return results[username]
+
+
+def run_probe(username, sites, notifier, **kwargs):
+    """Blocking wrapper around probe_username for use from worker threads."""
+    return asyncio.run(probe_username(username, sites, notifier, **kwargs))
+
+
+def run_batch_probe(usernames, sites, notifier, **kwargs):
+    """Blocking wrapper around probe_usernames for use from worker threads."""
+    return asyncio.run(probe_usernames(usernames, sites, notifier, **kwargs))
@@ -1,13 +1,130 @@
+import random
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import whois
+from whois.whois import NICClient
 from core.json_utils import safe_json_dump
+from core.http_cache import cached_call
+from core.rate_limit import TokenBucket
+from core.storage import save_scan_result
+
+# Registrations rarely change within a day.
+WHOIS_CACHE_TTL = 24 * 3600
+# Pacing per WHOIS server; most registries ban clients well above this.
+WHOIS_SERVER_RATE = 0.5  # requests per second
+WHOIS_SERVER_BURST = 2
+# Different WHOIS servers queried in parallel during a bulk run.
+WHOIS_MAX_SERVERS = 8
+WHOIS_RETRIES = 3
+
+class WhoisUnavailable(OSError):
+    """Raised when the WHOIS server could not be reached."""
+
+@cached_call("whois", WHOIS_CACHE_TTL, key=lambda domain: domain.strip().lower())
+def lookup_whois(domain):
+    w = whois.whois(domain)
+    # python-whois swallows socket errors and parses the message as a
+    # record; raise instead so failures are neither cached nor mistaken
+    # for "no data".
+    if getattr(w, "text", "").startswith("Socket not responding"):
+        raise WhoisUnavailable(w.text)
+    return w
 
 def get_whois_info(domain):
     """
     Retrieves WHOIS information for a given domain.
     """
     try:
-        w = whois.whois(domain)
+        w = lookup_whois(domain)
         return w
     except Exception as e:
         print(f"Error retrieving WHOIS for {domain}: {e}")
         return None
+
+def whois_server_for(domain):
+    """Returns the WHOIS server python-whois would query first for domain."""
+    try:
+        server = NICClient().choose_server(domain)
+    except Exception:
+        server = None
+    return server or domain.rsplit(".", 1)[-1]
+
+_server_buckets = {}
+_server_buckets_lock = threading.Lock()
+
+def server_bucket(server):
+    """The process-wide token bucket pacing queries to one WHOIS server, shared by concurrent bulk runs."""
+    with _server_buckets_lock:
+        bucket = _server_buckets.get(server)
+        if bucket is None:
+            bucket = _server_buckets[server] = TokenBucket(WHOIS_SERVER_RATE, WHOIS_SERVER_BURST)
+        return bucket
+
+def lookup_whois_paced(domain, bucket, retries=WHOIS_RETRIES):
+    """
+    Looks up one domain, taking a token from the server's bucket per attempt.
+
+    Socket-level failures (timeouts, resets, refused connections) are
+    retried with exponential backoff; anything else fails immediately.
+    """
+    cached = lookup_whois.cached(domain)
+    if cached is not None:
+        return cached
+    for attempt in range(retries):
+        bucket.acquire()
+        try:
+            return lookup_whois(domain)
+        except OSError as e:
+            if attempt == retries - 1:
+                print(f"Error retrieving WHOIS for {domain} after {retries} attempts: {e}")
+                return None
+            time.sleep((2 ** attempt) + random.random())
+        except Exception as e:
+            print(f"Error retrieving WHOIS for {domain}: {e}")
+            return None
+
+def get_whois_info_bulk(domains, on_result=None, save=True, max_servers=WHOIS_MAX_SERVERS):
+    """
+    Retrieves WHOIS information for many domains.
+
+    Domains are grouped by the WHOIS server of their TLD. Each server has
+    its own token bucket (see server_bucket()) and is worked through
+    sequentially, while up to max_servers servers are queried in parallel.
+    With save, each result is saved to the result store through
+    save_scan_result() as soon as it arrives; on_result(domain, data), if
+    given, is called from the worker thread.
+
+    Returns {domain: data or None}.
+    """
+    by_tld = defaultdict(list)
+    for domain in dict.fromkeys(d.strip().lower() for d in domains if d and d.strip()):
+        by_tld[domain.rsplit(".", 1)[-1]].append(domain)
+    # choose_server() may ask whois.iana.org, so it is resolved once per TLD.
+    groups = defaultdict(list)
+    for tld_domains in by_tld.values():
+        groups[whois_server_for(tld_domains[0])].extend(tld_domains)
+
+    results = {}
+
+    def run_group(server, group):
+        bucket = server_bucket(server)
+        for domain in group:
+            data = lookup_whois_paced(domain, bucket)
+            if data and save:
+                try:
+                    save_scan_result(domain, "Domain", data)
+                except (OSError, sqlite3.Error) as e:
+                    print(f"Error saving WHOIS for {domain}: {e}")
+            results[domain] = data
+            if on_result:
+                on_result(domain, data)
+
+    with ThreadPoolExecutor(max_workers=max_servers) as pool:
+        futures = [pool.submit(run_group, server, group) for server, group in groups.items()]
+        for future in as_completed(futures):
+            future.result()
+    return results
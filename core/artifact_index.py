@@ -0,0 +1,145 @@
+import ipaddress
+import re
+from urllib.parse import urlparse
+
+from core.network_index import most_specific_network
+from core.storage import scan_key
+
+# Kinds of artifact kept in the cross-target index.
+EMAIL = "email"
+NAME_SERVER = "name_server"
+REGISTRANT = "registrant"
+REGISTRAR = "registrar"
+USERNAME = "username"
+PROFILE_URL = "profile_url"
+NETBLOCK = "netblock"
+ARTIFACT_KINDS = [EMAIL, NAME_SERVER, REGISTRANT, REGISTRAR, USERNAME, PROFILE_URL, NETBLOCK]
+
+# WHOIS privacy placeholders shared by unrelated registrations.
+PLACEHOLDERS = ("redacted", "privacy", "not disclosed", "withheld", "data protected", "by proxy")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_email(value):
+    return value.strip().lower()
+
+
+def normalize_name_server(value):
+    return value.strip().lower().rstrip(".")
+
+
+def normalize_text(value):
+    """Registrant and registrar names: case-folded with whitespace collapsed."""
+    value = WHITESPACE_RE.sub(" ", value).strip().casefold()
+    if any(word in value for word in PLACEHOLDERS):
+        return ""
+    return value
+
+
+def normalize_username(value):
+    return value.strip().lstrip("@").lower()
+
+
+def normalize_url(value):
+    """Profile URLs compared without scheme, "www.", query, fragment or trailing slash."""
+    parsed = urlparse(value.strip() if "://" in value else f"https://{value.strip()}")
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if not host:
+        return ""
+    return f"{host}{parsed.path.rstrip('/')}".lower()
+
+
+def normalize_netblock(value):
+    try:
+        return str(ipaddress.ip_network(value.strip(), strict=False))
+    except ValueError:
+        return ""
+
+
+NORMALIZERS = {
+    EMAIL: normalize_email,
+    NAME_SERVER: normalize_name_server,
+    REGISTRANT: normalize_text,
+    REGISTRAR: normalize_text,
+    USERNAME: normalize_username,
+    PROFILE_URL: normalize_url,
+    NETBLOCK: normalize_netblock,
+}
+
+
+def normalize(kind, value):
+    """Normalized form of value for an artifact kind; "" if it should not be indexed."""
+    if not isinstance(value, str):
+        return ""
+    return NORMALIZERS[kind](value)
+
+
+def _strings(value):
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [v for v in value if isinstance(v, str)]
+    return []
+
+
+def extract_accounts(data):
+    """(site, url) pairs from a list of profile entries (dicts or bare URLs)."""
+    if not isinstance(data, list):
+        return
+    for entry in data:
+        if isinstance(entry, dict):
+            url = entry.get("url") or entry.get("profile_url")
+            if url:
+                yield str(entry.get("site") or ""), str(url)
+        elif isinstance(entry, str) and entry:
+            yield "", entry
+
+
+def extract_emails(data):
+    """Lower-cased e-mail addresses from a WHOIS record or a list of profiles."""
+    records = data if isinstance(data, list) else [data]
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        for email in _strings(record.get("emails")):
+            if email.strip():
+                yield normalize_email(email)
+
+
+def extract_artifacts(target, scan_type, data):
+    """
+    The (kind, normalized value) pairs one scan result contributes to the index.
+
+    WHOIS records give e-mails, name servers, registrant name/org and the
+    registrar; profile lists give profile URLs and e-mails; a username
+    scan indexes its target as a username; IP lookups give the most
+    specific netblock containing the address.
+    """
+    key = scan_key(scan_type)
+    pairs = set()
+
+    def add(kind, values):
+        for value in _strings(values):
+            value = normalize(kind, value)
+            if value:
+                pairs.add((kind, value))
+
+    add(EMAIL, list(extract_emails(data)))
+    add(PROFILE_URL, [url for _, url in extract_accounts(data)])
+    if key == "username":
+        add(USERNAME, target)
+    if isinstance(data, dict):
+        if key == "domain":
+            add(NAME_SERVER, data.get("name_servers"))
+            add(REGISTRAR, data.get("registrar"))
+            add(REGISTRANT, data.get("name"))
+            add(REGISTRANT, data.get("org"))
+        elif key == "ip_address":
+            try:
+                netblock = most_specific_network(target, data)
+            except ValueError:
+                netblock = data.get("asn_cidr")
+            add(NETBLOCK, netblock)
+    return pairs
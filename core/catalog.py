@@ -0,0 +1,252 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from core import storage
+from core.paths import cache_path
+from core.result_store import get_result_store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS targets (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    scan_types TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    items INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scans (
+    target TEXT NOT NULL,
+    scan TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    items INTEGER NOT NULL,
+    PRIMARY KEY (target, scan)
+);
+"""
+
+# A target has scan results (in the result store, or legacy
+# data/<name>/<scan>.json files); a profile is a saved list of
+# usernames/emails (data/<name>.json).
+TARGET = "target"
+PROFILE = "profile"
+# Targets indexed per transaction during sync().
+SYNC_BATCH = 500
+
+
+def count_items(path):
+    """Summary stat for one JSON file: list/dict length, 1 for scalars, 0 if unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if isinstance(data, (list, dict)):
+        return len(data)
+    return 0 if data is None else 1
+
+
+def _catalog_file(data_dir):
+    # One catalog per data directory, so e.g. the CLI's --out and the GUI's data/ don't share one.
+    stem = hashlib.sha1(os.path.abspath(data_dir).encode('utf-8')).hexdigest()[:12]
+    return cache_path(f"target_catalog_{stem}.sqlite")
+
+
+class TargetCatalog:
+    """
+    SQLite index of the targets and saved profiles under the data directory.
+
+    Records each target's scan types, sizes, mtimes and item counts so the
+    Targets tab can list, search and filter without walking data/. sync()
+    reconciles the whole tree and result store, re-reading only legacy
+    files whose size or mtime changed; refresh_target() updates a single
+    entry.
+    """
+    def __init__(self, data_dir=None, path=None):
+        self.data_dir = data_dir or storage.DATA_DIR
+        self.path = path or _catalog_file(self.data_dir)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM targets").fetchone()[0]
+
+    def sync(self, full=True):
+        """
+        Brings the index up to date with the data directory.
+
+        A full sync stats every result file (re-reading only changed ones);
+        otherwise only targets that appeared or disappeared are handled,
+        which is all a change to the top-level directory can mean. Work is
+        committed in batches so readers are not blocked for the whole pass.
+        Returns the names whose entries were added, updated or removed.
+        """
+        on_disk = {}
+        if os.path.isdir(self.data_dir):
+            for entry in os.scandir(self.data_dir):
+                if entry.is_dir():
+                    on_disk[entry.name] = TARGET
+                elif entry.name.endswith('.json'):
+                    on_disk[entry.name[:-5]] = PROFILE
+        stored = get_result_store(self.data_dir).latest_scans()
+        for name in stored:
+            on_disk.setdefault(name, TARGET)
+        with self._lock:
+            indexed = {name for (name,) in self._conn.execute("SELECT name FROM targets")}
+            known = {}
+            if full:
+                for target, scan, size, mtime_ns, items in self._conn.execute(
+                        "SELECT target, scan, size, mtime_ns, items FROM scans"):
+                    known.setdefault(target, {})[scan] = (size, mtime_ns, items)
+            removed = sorted(indexed - set(on_disk))
+            for name in removed:
+                self._remove(name)
+            self._conn.commit()
+
+        names = sorted(on_disk) if full else sorted(set(on_disk) - indexed)
+        changed = removed
+        for start in range(0, len(names), SYNC_BATCH):
+            with self._lock:
+                for name in names[start:start + SYNC_BATCH]:
+                    if self._refresh(name, on_disk[name], known.get(name, {}), stored.get(name, {})):
+                        changed.append(name)
+                self._conn.commit()
+        return changed
+
+    def refresh_target(self, name):
+        """Re-indexes one target or profile (e.g. after it was saved or deleted)."""
+        stored = get_result_store(self.data_dir).latest_scans(name).get(name, {})
+        if stored or os.path.isdir(os.path.join(self.data_dir, name)):
+            kind = TARGET
+        elif os.path.isfile(os.path.join(self.data_dir, f"{name}.json")):
+            kind = PROFILE
+        else:
+            kind = None
+        with self._lock:
+            if kind is None:
+                self._remove(name)
+            else:
+                known = {scan: (size, mtime_ns, items) for scan, size, mtime_ns, items in self._conn.execute(
+                    "SELECT scan, size, mtime_ns, items FROM scans WHERE target = ?", (name,))}
+                self._refresh(name, kind, known, stored)
+            self._conn.commit()
+
+    def _remove(self, name):
+        self._conn.execute("DELETE FROM scans WHERE target = ?", (name,))
+        self._conn.execute("DELETE FROM targets WHERE name = ?", (name,))
+
+    def _refresh(self, name, kind, known, stored=None):
+        # Called with the lock held; known is {scan: (size, mtime_ns, items)} from the
+        # index, stored is {scan: (scan_id, created, size, items)} from the result store.
+        # Returns whether the entry changed.
+        stored = stored or {}
+        if kind == PROFILE:
+            files = [(PROFILE, os.path.join(self.data_dir, f"{name}.json"))]
+        else:
+            target_dir = os.path.join(self.data_dir, name)
+            try:
+                files = [(entry.name[:-5], entry.path) for entry in os.scandir(target_dir)
+                         if entry.name.endswith('.json')]
+            except OSError:
+                files = []
+
+        scans = {}
+        changed = not known
+        for scan, path in files:
+            if scan in stored:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            old = known.get(scan)
+            if old is not None and old[:2] == (st.st_size, st.st_mtime_ns):
+                items = old[2]
+            else:
+                items = count_items(path)
+                changed = True
+                self._conn.execute("INSERT OR REPLACE INTO scans VALUES (?, ?, ?, ?, ?)",
+                                   (name, scan, st.st_size, st.st_mtime_ns, items))
+            scans[scan] = (st.st_size, st.st_mtime_ns, items)
+
+        # Stored results supersede legacy files of the same scan type.
+        for scan, (_, created, size, items) in stored.items():
+            entry = (size, int(created * 1e9), items)
+            if known.get(scan) != entry:
+                changed = True
+                self._conn.execute("INSERT OR REPLACE INTO scans VALUES (?, ?, ?, ?, ?)", (name, scan, *entry))
+            scans[scan] = entry
+
+        for scan in set(known) - set(scans):
+            changed = True
+            self._conn.execute("DELETE FROM scans WHERE target = ? AND scan = ?", (name, scan))
+        if not changed:
+            return False
+        scan_types = ",".join(sorted(scan for scan in scans if scan != PROFILE))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO targets VALUES (?, ?, ?, ?, ?, ?)",
+            (name, kind, scan_types,
+             sum(s[0] for s in scans.values()),
+             max((s[1] for s in scans.values()), default=0) / 1e9,
+             sum(s[2] for s in scans.values())),
+        )
+        return True
+
+    def list_targets(self, search=None, scan=None, kind=None, names=None):
+        """
+        Returns index rows as dicts, sorted by name.
+
+        search matches a substring of the name (case-insensitive), scan keeps
+        targets with that result file stem (e.g. "domain"), kind keeps
+        TARGET or PROFILE entries and names, if given, only those targets.
+        """
+        query = "SELECT name, kind, scan_types, size, mtime, items FROM targets WHERE 1 = 1"
+        params = []
+        if search:
+            query += " AND name LIKE ? ESCAPE '\\'"
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        if scan:
+            query += " AND EXISTS (SELECT 1 FROM scans WHERE target = name AND scan = ?)"
+            params.append(scan)
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        if names is not None:
+            names = list(names)
+            query += f" AND name IN ({', '.join('?' * len(names))})"
+            params.extend(names)
+        query += " ORDER BY name"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {"name": name, "kind": kind, "scan_types": scan_types.split(",") if scan_types else [],
+             "size": size, "mtime": mtime, "items": items}
+            for name, kind, scan_types, size, mtime, items in rows
+        ]
+
+    def scan_types(self):
+        """Every result file stem present in the index."""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT scan FROM scans WHERE scan != ? ORDER BY scan",
+                                      (PROFILE,)).fetchall()
+        return [scan for (scan,) in rows]
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Returns the process-wide TargetCatalog, kept current with saves made through core.storage."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = TargetCatalog()
+            storage.add_save_listener(lambda target, scan_type, path: _catalog.refresh_target(target))
+        return _catalog
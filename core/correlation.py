@@ -47,3 +47,52 @@ def find_correlations(identity):
     final_correlations = {k: v for k, v in correlations.items() if v}
 
     return final_correlations
+
+
+# Other targets listed per shared artifact; the rest are only counted.
+SHARED_TARGETS_LIMIT = 20
+
+
+def find_shared_artifacts(target_name, limit=SHARED_TARGETS_LIMIT):
+    """
+    Finds the other targets that share an artifact with target_name.
+
+    Uses the cross-target artifact index in the result store, so no other
+    target's data is loaded. Returns {kind: [(value, count, targets)]},
+    where targets lists at most limit of the count other targets.
+    """
+    from core.result_store import get_result_store
+
+    shared = {}
+    for (kind, value), (count, targets) in get_result_store().shared_artifacts(target_name, limit).items():
+        shared.setdefault(kind, []).append((value, count, targets))
+    return shared
+
+
+def find_fuzzy_correlations(target_name, limit=SHARED_TARGETS_LIMIT):
+    """
+    Finds other targets holding near-identical registrants, e-mails or usernames.
+
+    Candidates come from the blocking keys stored with the artifact index,
+    so only values in the same blocks as target_name's are scored. Returns
+    {kind: [(value, other_value, confidence, count, targets)]}, best first,
+    where targets lists at most limit of the count targets holding
+    other_value.
+    """
+    from core.entity_resolution import FUZZY_KINDS, score_values
+    from core.result_store import get_result_store
+
+    store = get_result_store()
+    matches = {}
+    for kind, value in store.artifacts_of(target_name):
+        if kind not in FUZZY_KINDS:
+            continue
+        candidates = store.block_candidates(kind, value)
+        for (_, other_value), confidence in score_values(kind, [value], candidates).items():
+            targets = [t for t in store.targets_with_artifact(kind, other_value) if t != target_name]
+            if targets:
+                matches.setdefault(kind, []).append(
+                    (value, other_value, confidence, len(targets), targets[:limit]))
+    for entries in matches.values():
+        entries.sort(key=lambda entry: -entry[2])
+    return matches
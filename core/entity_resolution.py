@@ -0,0 +1,239 @@
+"""
+Fuzzy entity resolution over the cross-target artifact index.
+
+Exact lookups in the index only link targets that share a value verbatim.
+Here near-identical registrant names, e-mail addresses and usernames
+("John Smith" / "J. Smith", "john.smith@" / "johnsmith1@") are linked too.
+Comparing every pair of values is quadratic, so each value is first given
+a few blocking keys (phonetic codes and short prefixes, see
+blocking_keys()); only values sharing a key are scored, block by block,
+with RapidFuzz's process.cdist. The cost grows with the size of the
+blocks rather than the number of values.
+"""
+import re
+from collections import defaultdict
+
+from core.artifact_index import EMAIL, REGISTRANT, USERNAME
+
+# Minimum similarity (0-100) for two values to be linked.
+SCORE_CUTOFF = 85
+# Larger blocks are scored in overlapping windows of sorted values.
+MAX_BLOCK_SIZE = 1000
+# Values held by more targets are hubs (shared hosting, privacy services);
+# their links are already visible in the exact index.
+MAX_VALUE_TARGETS = 100
+# Confidence factor for e-mail addresses whose local parts match on different domains.
+DOMAIN_MISMATCH_FACTOR = 0.85
+# Confidence factor for names that only match once given names are reduced
+# to initials ("J. Smith" / "John Smith").
+INITIALS_FACTOR = 0.9
+
+NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+NON_ALPHA_RE = re.compile(r"[^a-z]+")
+SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(
+    ["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"]) for c in letters}
+
+
+def soundex(word):
+    """American Soundex code of word ("smith" -> "S530"); "" if it has no letters."""
+    word = NON_ALPHA_RE.sub("", word.lower())
+    if not word:
+        return ""
+    code, last = word[0].upper(), SOUNDEX_CODES[word[0]]
+    for c in word[1:]:
+        digit = SOUNDEX_CODES[c]
+        if digit != "0" and digit != last:
+            code += digit
+        if c not in "hw":
+            last = digit
+    return (code + "000")[:4]
+
+
+def name_tokens(value):
+    return [token for token in NON_ALPHA_RE.split(value.lower()) if token]
+
+
+def email_parts(value):
+    local, _, domain = value.partition("@")
+    return NON_ALNUM_RE.sub("", local.split("+", 1)[0]), domain
+
+
+def name_keys(value):
+    # Each token of 3+ letters keyed by its Soundex code and the initials
+    # of the other tokens: "john smith" and "j. smith" share "S530:j".
+    tokens = name_tokens(value)
+    keys = set()
+    for i, token in enumerate(tokens):
+        if len(token) < 3:
+            continue
+        others = "".join(sorted({t[0] for j, t in enumerate(tokens) if j != i}))
+        keys.add(f"{soundex(token)}:{others}")
+    return keys
+
+
+def email_keys(value):
+    local, domain = email_parts(value)
+    if not local:
+        return set()
+    keys = {f"d:{domain}:{local[:4]}", f"u:{local}"}
+    if soundex(local):
+        keys.add(f"s:{domain}:{soundex(local)}")
+    return keys
+
+
+def username_keys(value):
+    alnum = NON_ALNUM_RE.sub("", value.lower())
+    if not alnum:
+        return set()
+    keys = {f"p:{alnum[:4]}"}
+    if soundex(alnum):
+        keys.add(f"s:{soundex(alnum)}:{len(alnum) // 4}")
+    return keys
+
+
+def name_string(value):
+    return " ".join(name_tokens(value))
+
+
+def initials_string(value):
+    """Every name token but the last reduced to its initial ("john q smith" -> "j q smith")."""
+    tokens = name_tokens(value)
+    return " ".join([t[0] for t in tokens[:-1]] + tokens[-1:])
+
+
+def has_initial(value):
+    return any(len(token) == 1 for token in name_tokens(value))
+
+
+def email_string(value):
+    return email_parts(value)[0]
+
+
+def username_string(value):
+    return NON_ALNUM_RE.sub("", value.lower())
+
+
+# kind -> (blocking keys, string compared, RapidFuzz scorer name). Only
+# identity-bearing kinds: registrars are hubs shared by unrelated domains.
+FUZZY_KINDS = {
+    REGISTRANT: (name_keys, name_string, "token_sort_ratio"),
+    EMAIL: (email_keys, email_string, "ratio"),
+    USERNAME: (username_keys, username_string, "ratio"),
+}
+
+
+def blocking_keys(kind, value):
+    """The blocking keys of a normalized artifact value; empty for kinds not resolved fuzzily."""
+    if kind not in FUZZY_KINDS:
+        return set()
+    return FUZZY_KINDS[kind][0](value)
+
+
+def confidence(kind, a, b, score):
+    """Similarity score (0-100) of two values turned into a 0-1 edge confidence."""
+    if kind == EMAIL and email_parts(a)[1] != email_parts(b)[1]:
+        score *= DOMAIN_MISMATCH_FACTOR
+    return round(score / 100, 3)
+
+
+def score_values(kind, queries, choices, score_cutoff=SCORE_CUTOFF):
+    """
+    Scores every query against every choice with process.cdist.
+
+    Returns {(query, choice): confidence} for distinct pairs at or above
+    score_cutoff. Names are also compared by initials, for pairs where one
+    side is abbreviated.
+    """
+    # Imported here so the app can start without loading RapidFuzz/NumPy.
+    import numpy as np
+    from rapidfuzz import fuzz, process
+
+    _, processor, scorer = FUZZY_KINDS[kind]
+    if not queries or not choices:
+        return {}
+
+    def cdist(processor):
+        return process.cdist([processor(v) for v in queries], [processor(v) for v in choices],
+                             scorer=getattr(fuzz, scorer), score_cutoff=score_cutoff,
+                             dtype=np.uint8, workers=-1)
+
+    matches = {}
+    scores = cdist(processor)
+    for i, j in zip(*np.nonzero(scores)):
+        a, b = queries[i], choices[j]
+        if a != b:
+            matches[(a, b)] = confidence(kind, a, b, int(scores[i, j]))
+    if processor is name_string and any(map(has_initial, queries + choices)):
+        scores = cdist(initials_string)
+        for i, j in zip(*np.nonzero(scores)):
+            a, b = queries[i], choices[j]
+            if a != b and (a, b) not in matches and (has_initial(a) or has_initial(b)):
+                matches[(a, b)] = confidence(kind, a, b, int(scores[i, j]) * INITIALS_FACTOR)
+    return matches
+
+
+def match_values(kind, values, score_cutoff=SCORE_CUTOFF, max_block_size=MAX_BLOCK_SIZE):
+    """
+    Finds the pairs of near-identical values of one artifact kind.
+
+    Returns {(a, b): confidence} with a < b.
+    """
+    blocks = defaultdict(set)
+    for value in values:
+        for key in blocking_keys(kind, value):
+            blocks[key].add(value)
+
+    matches = {}
+    step = max(1, max_block_size // 2)
+    for block in blocks.values():
+        if len(block) < 2:
+            continue
+        block = sorted(block)
+        # Oversized blocks: sorted-neighbourhood windows overlapping by half.
+        starts = range(0, max(1, len(block) - step), step) if len(block) > max_block_size else [0]
+        for start in starts:
+            window = block[start:start + max_block_size]
+            for (a, b), score in score_values(kind, window, window, score_cutoff).items():
+                if a < b:
+                    matches[(a, b)] = score
+    return matches
+
+
+def resolve_entities(artifacts, kinds=None, score_cutoff=SCORE_CUTOFF):
+    """
+    Links targets through near-identical artifact values.
+
+    artifacts is an iterable of (kind, value, target), e.g. from
+    ResultStore.iter_artifacts(). Returns weighted edges as a list of
+    (target_a, target_b, confidence, evidence) sorted by confidence, where
+    evidence lists the (kind, value_a, value_b, confidence) matches behind
+    the edge and confidence combines them (1 - product of 1 - c).
+    """
+    kinds = set(kinds or FUZZY_KINDS)
+    targets_by_value = defaultdict(set)
+    for kind, value, target in artifacts:
+        if kind in kinds:
+            targets_by_value[(kind, value)].add(target)
+
+    values_by_kind = defaultdict(list)
+    for (kind, value), targets in targets_by_value.items():
+        if len(targets) <= MAX_VALUE_TARGETS:
+            values_by_kind[kind].append(value)
+
+    evidence = defaultdict(list)
+    for kind, values in values_by_kind.items():
+        for (a, b), score in match_values(kind, values, score_cutoff).items():
+            for target_a in targets_by_value[(kind, a)]:
+                for target_b in targets_by_value[(kind, b)]:
+                    if target_a != target_b:
+                        pair = tuple(sorted((target_a, target_b)))
+                        evidence[pair].append((kind, a, b, score))
+
+    edges = []
+    for (target_a, target_b), matches in evidence.items():
+        missing = 1.0
+        for match in matches:
+            missing *= 1.0 - match[3]
+        edges.append((target_a, target_b, round(1.0 - missing, 3), matches))
+    edges.sort(key=lambda edge: -edge[2])
+    return edges
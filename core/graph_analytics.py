@@ -0,0 +1,188 @@
+"""
+Graph analytics over the investigation graph.
+
+The graph is converted once to a SciPy sparse adjacency matrix and every
+measure is computed with sparse matrix products over all nodes at once,
+instead of NetworkX's per-node Python loops: degree centrality, sampled
+(Brandes) betweenness, connected components, PageRank and label
+propagation communities. On merged graphs of tens of thousands of nodes
+this takes seconds where the NetworkX equivalents take minutes.
+"""
+
+# Betweenness is estimated from this many BFS sources (exact on smaller graphs).
+BETWEENNESS_SAMPLES = 64
+# BFS sources traversed together; bounds the (nodes x batch) work arrays.
+BFS_BATCH = 16
+PAGERANK_ALPHA = 0.85
+PAGERANK_TOL = 1e-8
+PAGERANK_MAX_ITER = 100
+COMMUNITY_MAX_ITER = 30
+# Nodes listed as the investigation's pivots, by betweenness.
+TOP_PIVOTS = 5
+
+
+def adjacency_matrix(G):
+    """(nodes, A): the node list and G's symmetric 0/1 CSR adjacency matrix, self-loops dropped."""
+    # Imported here so the app can start without loading NumPy/SciPy.
+    import numpy as np
+    from scipy import sparse
+    nodes = list(G)
+    n = len(nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.array([(index[u], index[v]) for u, v in G.edges() if u != v], dtype=np.int64).reshape(-1, 2)
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    A = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+    A.sum_duplicates()
+    A.data[:] = 1.0
+    return nodes, A
+
+
+def degree_centrality(A):
+    import numpy as np
+    n = A.shape[0]
+    degree = np.asarray(A.sum(axis=1)).ravel()
+    return degree / (n - 1) if n > 1 else np.zeros(n)
+
+
+def betweenness_centrality(A, samples=BETWEENNESS_SAMPLES, seed=0):
+    """
+    Normalized betweenness centrality, estimated from `samples` sources.
+
+    Brandes' algorithm run level by level for a batch of sources at once:
+    the forward BFS counts shortest paths with one sparse product per
+    level, and dependencies are accumulated back the same way. With fewer
+    nodes than samples every node is a source and the result is exact;
+    otherwise the sum is scaled by nodes / samples.
+    """
+    import numpy as np
+    n = A.shape[0]
+    betweenness = np.zeros(n)
+    if n < 3:
+        return betweenness
+    if n <= samples:
+        sources = np.arange(n)
+    else:
+        sources = np.random.default_rng(seed).choice(n, samples, replace=False)
+
+    for start in range(0, len(sources), BFS_BATCH):
+        batch = sources[start:start + BFS_BATCH]
+        columns = np.arange(len(batch))
+        sigma = np.zeros((n, len(batch)))  # shortest paths from each source
+        sigma[batch, columns] = 1.0
+        dist = np.full((n, len(batch)), -1, dtype=np.int32)
+        dist[batch, columns] = 0
+        frontier = sigma.copy()
+        depth = 0
+        while True:
+            reached = A @ frontier
+            new = (reached > 0) & (dist < 0)
+            if not new.any():
+                break
+            depth += 1
+            dist[new] = depth
+            frontier = np.where(new, reached, 0.0)
+            sigma += frontier
+
+        delta = np.zeros_like(sigma)
+        for level in range(depth, 0, -1):
+            at_level = dist == level
+            coefficient = np.divide(1.0 + delta, sigma, out=np.zeros_like(sigma), where=at_level)
+            delta += np.where(dist == level - 1, sigma * (A @ coefficient), 0.0)
+        betweenness += np.where(dist > 0, delta, 0.0).sum(axis=1)
+
+    # Each undirected path is counted from both ends.
+    betweenness *= n / len(sources) / 2
+    return betweenness / ((n - 1) * (n - 2) / 2)
+
+
+def connected_components(A):
+    """Component label of each node, numbered from the largest component down."""
+    from scipy.sparse import csgraph
+    _, labels = csgraph.connected_components(A, directed=False)
+    return relabel_by_size(labels)
+
+
+def pagerank(A, alpha=PAGERANK_ALPHA, tol=PAGERANK_TOL, max_iter=PAGERANK_MAX_ITER):
+    """PageRank by power iteration; isolated nodes spread their rank uniformly."""
+    import numpy as np
+    n = A.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    degree = np.asarray(A.sum(axis=1)).ravel()
+    dangling = degree == 0
+    inverse_degree = np.divide(1.0, degree, out=np.zeros(n), where=~dangling)
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        previous = rank
+        # A is symmetric, so A @ x spreads each node's rank to its neighbours.
+        rank = alpha * (A @ (rank * inverse_degree)) + (alpha * rank[dangling].sum() + 1 - alpha) / n
+        if np.abs(rank - previous).sum() < n * tol:
+            break
+    return rank
+
+
+def label_propagation(A, max_iter=COMMUNITY_MAX_ITER):
+    """
+    Community label of each node by synchronous label propagation.
+
+    Every node takes the label most common among its neighbours and
+    itself (ties to the smallest label); counting the node's own label
+    keeps the update from oscillating on bipartite target/artifact graphs.
+    Each round is one sparse matrix built from (node, neighbour label)
+    pairs, so it costs O(edges). Communities are numbered largest first.
+    """
+    import numpy as np
+    from scipy import sparse
+    n = A.shape[0]
+    labels = np.arange(n)
+    if n == 0:
+        return labels
+    A = (A + sparse.identity(n, format='csr')).tocoo()
+    ones = np.ones(A.nnz)
+    for _ in range(max_iter):
+        counts = sparse.csr_matrix((ones, (A.row, labels[A.col])), shape=(n, n))
+        counts.sum_duplicates()
+        updated = np.asarray(counts.argmax(axis=1)).ravel()
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+    return relabel_by_size(labels)
+
+
+def relabel_by_size(labels):
+    import numpy as np
+    _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    order = np.argsort(-counts, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse]
+
+
+def analyze(G, samples=BETWEENNESS_SAMPLES):
+    """
+    Computes the analytics of G.
+
+    Returns a dict with "metrics" ({node: {"degree", "betweenness",
+    "pagerank", "component", "community"}}), the number of "components"
+    and "communities", and the "pivots": the TOP_PIVOTS nodes with the
+    highest betweenness. Meant to run off the GUI thread.
+    """
+    import numpy as np
+    nodes, A = adjacency_matrix(G)
+    if not nodes:
+        return {"metrics": {}, "components": 0, "communities": 0, "pivots": []}
+    degree = degree_centrality(A)
+    betweenness = betweenness_centrality(A, samples)
+    rank = pagerank(A)
+    components = connected_components(A)
+    communities = label_propagation(A)
+    metrics = {node: {"degree": float(degree[i]), "betweenness": float(betweenness[i]),
+                      "pagerank": float(rank[i]), "component": int(components[i]),
+                      "community": int(communities[i])}
+               for i, node in enumerate(nodes)}
+    top = np.argsort(-betweenness, kind='stable')[:TOP_PIVOTS]
+    return {"metrics": metrics,
+            "components": int(components.max()) + 1,
+            "communities": int(communities.max()) + 1,
+            "pivots": [nodes[i] for i in top if betweenness[i] > 0]}
@@ -0,0 +1,237 @@
+import functools
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+
+from core.paths import cache_path
+
+# On-disk size cap; least recently used entries are evicted beyond it.
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    last_access REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+"""
+
+
+def normalize_url(url, params=None):
+    """Canonical form of a URL: lower-case scheme/host, sorted query, no fragment."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(k), str(v)) for k, v in params.items())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/",
+                       urlencode(sorted(query)), ""))
+
+
+class CachedResponse:
+    """The parts of a requests.Response that collectors use, as stored in the cache."""
+    def __init__(self, url, status_code, text, headers):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+        self.from_cache = True
+
+    def raise_for_status(self):
+        pass
+
+
+class HttpCache:
+    """
+    SQLite-backed cache for collector results and HTTP responses.
+
+    Entries carry a per-namespace TTL; stale HTTP entries keep their
+    ETag/Last-Modified so they can be revalidated instead of refetched.
+    The file is capped at max_bytes with least-recently-used eviction, and
+    hits/misses are counted per namespace.
+    """
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or cache_path("http_cache.sqlite")
+        self.max_bytes = max_bytes
+        self.hits = Counter()
+        self.misses = Counter()
+        self.revalidated = Counter()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key, allow_stale=False):
+        """
+        Returns (value, etag, last_modified, fresh) for key, or None.
+
+        Stale entries are only returned with allow_stale (for revalidation).
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires, etag, last_modified FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            fresh = row[1] > now
+            if not fresh and not allow_stale:
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return pickle.loads(row[0]), row[2], row[3], fresh
+
+    def put(self, key, namespace, value, ttl, etag=None, last_modified=None):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, namespace, blob, len(blob), now + ttl, now, etag, last_modified),
+            )
+            self._total += len(blob) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def touch(self, key, ttl):
+        """Extends a revalidated entry's lifetime by ttl."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE entries SET expires = ?, last_access = ? WHERE key = ?",
+                               (now + ttl, now, key))
+            self._conn.commit()
+
+    def _evict(self):
+        # Drop the least recently used entries until we're 10% under the cap.
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY last_access")
+        doomed = []
+        for key, size in rows:
+            if self._total <= target:
+                break
+            doomed.append((key,))
+            self._total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def clear(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                self._conn.execute("DELETE FROM entries")
+            else:
+                self._conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+            self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def stats(self):
+        """Hit/miss/revalidation counters per namespace, plus the on-disk size."""
+        namespaces = set(self.hits) | set(self.misses) | set(self.revalidated)
+        return {
+            "bytes": self._total,
+            "namespaces": {
+                ns: {"hits": self.hits[ns], "misses": self.misses[ns], "revalidated": self.revalidated[ns]}
+                for ns in sorted(namespaces)
+            },
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """Returns the process-wide HttpCache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache()
+        return _cache
+
+
+def cached_get(url, namespace, ttl, session=None, params=None, before_request=None, **kwargs):
+    """
+    GET url through the cache.
+
+    Fresh entries are returned without touching the network. Stale ones are
+    revalidated with If-None-Match/If-Modified-Since when the server gave
+    us an ETag or Last-Modified. Only 200 responses are stored.
+    before_request, if given, is called right before any network request
+    (e.g. for rate limiting) and is skipped on cache hits.
+    """
+    cache = get_http_cache()
+    key = f"{namespace}:GET {normalize_url(url, params)}"
+    cached = cache.get(key, allow_stale=True)
+    if cached is not None and cached[3]:
+        cache.hits[namespace] += 1
+        return cached[0]
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if cached is not None:
+        if cached[1]:
+            headers["If-None-Match"] = cached[1]
+        if cached[2]:
+            headers["If-Modified-Since"] = cached[2]
+
+    if before_request:
+        before_request()
+    resp = (session or requests).get(url, params=params, headers=headers, **kwargs)
+
+    if resp.status_code == 304 and cached is not None:
+        cache.revalidated[namespace] += 1
+        cache.touch(key, ttl)
+        return cached[0]
+
+    cache.misses[namespace] += 1
+    if resp.status_code == 200:
+        stored = CachedResponse(resp.url, resp.status_code, resp.text, dict(resp.headers))
+        cache.put(key, namespace, stored, ttl,
+                  etag=resp.headers.get("ETag"), last_modified=resp.headers.get("Last-Modified"))
+    return resp
+
+
+def cached_call(namespace, ttl, key=None):
+    """
+    Decorator caching a lookup function's non-None results for ttl seconds.
+
+    key maps the call's arguments to the cache key; by default it is the
+    repr of the arguments. Exceptions and None results are not cached.
+    The wrapper's cached(*args, **kwargs) returns the cached value, or None,
+    without calling the function (e.g. to skip rate limiting on hits).
+    """
+    def decorator(func):
+        def cache_key(args, kwargs):
+            arg_key = key(*args, **kwargs) if key else repr((args, sorted(kwargs.items())))
+            return f"{namespace}:{arg_key}"
+
+        def cached(*args, **kwargs):
+            entry = get_http_cache().get(cache_key(args, kwargs))
+            return entry[0] if entry is not None else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_http_cache()
+            entry_key = cache_key(args, kwargs)
+            entry = cache.get(entry_key)
+            if entry is not None:
+                cache.hits[namespace] += 1
+                return entry[0]
+            cache.misses[namespace] += 1
+            value = func(*args, **kwargs)
+            if value is not None:
+                cache.put(entry_key, namespace, value, ttl)
+            return value
+        wrapper.cached = cached
+        return wrapper
+    return decorator
@@ -1,34 +1,87 @@
 import os
 import json
+import threading
+from collections import OrderedDict
+from core import storage
 from core.json_utils import safe_json_dump
+from core.result_store import get_result_store
+
+# Identities kept in memory by get_identity(), least recently used first out.
+IDENTITY_CACHE_SIZE = 64
 
 class TargetIdentity:
     """
     Represents a single target and all associated OSINT data.
+
+    Results come from the result store (latest row per scan type), with
+    data/<name>/<scan>.json files from before the migration as a fallback.
+    Nothing is read up front: each scan type is loaded on first access and
+    memoized until a newer row is saved or the file's size or mtime changes.
     """
-    def __init__(self, name):
+    def __init__(self, name, data_dir=None):
         """
         Initializes a TargetIdentity object.
 
         Args:
             name (str): The name of the target (e.g., username, domain).
+            data_dir (str): Directory holding the targets; defaults to core.storage.DATA_DIR.
         """
         self.name = name
-        self.data = {}  # {scan_type: data}
-        self.load_data()
+        self.data_dir = data_dir or storage.DATA_DIR
+        self.target_dir = os.path.join(self.data_dir, name)
+        self._files = {}  # {scan_type: path}
+        self._files_mtime = None
+        self._loaded = {}  # {scan_type: (version, data)}
+        self._lock = threading.Lock()
+
+    @property
+    def data(self):
+        return self.get_all_data()
+
+    def stored_scans(self):
+        """Maps each scan type in the result store to the id of its latest row."""
+        scans = get_result_store(self.data_dir).latest_scans(self.name).get(self.name, {})
+        return {storage.scan_label(key): summary[0] for key, summary in scans.items()}
+
+    def scan_files(self):
+        """Maps each legacy scan type to its file; the directory is re-listed only when it changes."""
+        try:
+            mtime = os.stat(self.target_dir).st_mtime_ns
+        except OSError:
+            return {}
+        with self._lock:
+            if mtime != self._files_mtime:
+                self._files = {
+                    storage.scan_label(filename[:-5]): os.path.join(self.target_dir, filename)
+                    for filename in os.listdir(self.target_dir) if filename.endswith(".json")
+                }
+                self._files_mtime = mtime
+            return dict(self._files)
+
+    def scan_types(self):
+        return sorted(set(self.stored_scans()) | set(self.scan_files()))
 
     def load_data(self):
-        """Loads all saved data for the target from the data directory."""
-        target_dir = os.path.join("data", self.name)
-        if not os.path.isdir(target_dir):
-            return
-
-        for filename in os.listdir(target_dir):
-            if filename.endswith(".json"):
-                scan_type = filename.replace(".json", "").replace('_', ' ').title()
-                file_path = os.path.join(target_dir, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    self.data[scan_type] = json.load(f)
+        """Loads (or reloads, if changed on disk) the data for every scan type."""
+        return self.get_all_data()
+
+    def data_version(self, scan_type):
+        """
+        What identifies the current data of scan_type: the id of its latest
+        stored row, or a legacy file's (size, mtime); None if there is none.
+        """
+        scan_type = storage.scan_label(scan_type)
+        scan_id = self.stored_scans().get(scan_type)
+        if scan_id is not None:
+            return scan_id
+        path = self.scan_files().get(scan_type)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
 
     def get_data(self, scan_type):
         """
@@ -40,8 +93,52 @@ class TargetIdentity:
         Returns:
             The data for the specified scan type, or None if not found.
         """
-        return self.data.get(scan_type)
+        scan_type = storage.scan_label(scan_type)
+        version = self.data_version(scan_type)
+        if version is None:
+            return None
+        with self._lock:
+            cached = self._loaded.get(scan_type)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+        if isinstance(version, int):
+            data = get_result_store(self.data_dir).load(version)
+        else:
+            path = self.scan_files().get(scan_type)
+            if path is None:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        with self._lock:
+            self._loaded[scan_type] = (version, data)
+        return data
 
     def get_all_data(self):
         """Returns all data associated with the target."""
-        return self.data
+        return {scan_type: self.get_data(scan_type) for scan_type in self.scan_types()}
+
+    def history(self, scan_type):
+        """Every stored result for scan_type as (scan_id, created, data), newest first."""
+        return get_result_store(self.data_dir).history(self.name, scan_type)
+
+
+_identities = OrderedDict()
+_identities_lock = threading.Lock()
+
+def get_identity(name):
+    """
+    Returns the shared TargetIdentity for name.
+
+    The most recently used IDENTITY_CACHE_SIZE identities stay in memory,
+    so the raw data view, correlations and graph for a target all reuse
+    the same parsed files.
+    """
+    with _identities_lock:
+        identity = _identities.get(name)
+        if identity is None or identity.data_dir != storage.DATA_DIR:
+            identity = TargetIdentity(name)
+            _identities[name] = identity
+        _identities.move_to_end(name)
+        while len(_identities) > IDENTITY_CACHE_SIZE:
+            _identities.popitem(last=False)
+        return identity
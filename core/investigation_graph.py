@@ -0,0 +1,305 @@
+import json
+import os
+import random
+import threading
+from collections import OrderedDict
+
+from core import storage
+from core.paths import cache_path
+from core.result_store import get_result_store
+
+TARGET = "target"
+# Layouts kept per graph version by InvestigationGraph.
+LAYOUT_CACHE_SIZE = 8
+# Graph analytics results kept per graph version.
+ANALYTICS_CACHE_SIZE = 4
+# Layout iterations from scratch and when warm-started from a previous layout.
+COLD_ITERATIONS = 50
+WARM_ITERATIONS = 15
+# Up to this many nodes repulsion is computed between every pair; larger
+# graphs repel from the centroids of a LAYOUT_GRID x LAYOUT_GRID grid.
+LAYOUT_EXACT_NODES = 1000
+LAYOUT_GRID = 16
+# Rows of the pairwise repulsion computed at once (bounds memory).
+LAYOUT_CHUNK = 512
+# Spread of new nodes placed around their already laid-out neighbours.
+SEED_JITTER = 0.05
+
+
+def target_node(name):
+    return f"{TARGET}:{name}"
+
+
+def artifact_node(kind, value):
+    return f"{kind}:{value}"
+
+
+def seed_positions(G, previous):
+    """
+    Initial positions for G taken from a previous layout.
+
+    Nodes already laid out keep their position; new nodes are placed next
+    to the mean of their placed neighbours (or at random if they have
+    none), so a warm-started layout only has to settle the changes.
+    """
+    rng = random.Random(0)
+    pos = {node: previous[node] for node in G if node in previous}
+    pending = [node for node in G if node not in pos]
+    # New nodes attached only to other new nodes are placed on later passes.
+    for _ in range(3):
+        unplaced = []
+        for node in pending:
+            placed = [pos[n] for n in G[node] if n in pos]
+            if not placed:
+                unplaced.append(node)
+                continue
+            x = sum(p[0] for p in placed) / len(placed)
+            y = sum(p[1] for p in placed) / len(placed)
+            pos[node] = (x + rng.uniform(-SEED_JITTER, SEED_JITTER), y + rng.uniform(-SEED_JITTER, SEED_JITTER))
+        if len(unplaced) == len(pending):
+            break
+        pending = unplaced
+    for node in pending:
+        pos[node] = (rng.uniform(-1, 1), rng.uniform(-1, 1))
+    return pos
+
+
+def grid_centroids(pos, size):
+    """Centroids and node counts of the non-empty cells of a size x size grid over pos."""
+    import numpy as np
+    low = pos.min(axis=0)
+    span = np.maximum(pos.max(axis=0) - low, 1e-9)
+    cells = np.minimum(((pos - low) / span * size).astype(np.intp), size - 1)
+    cell_ids = cells[:, 0] * size + cells[:, 1]
+    counts = np.bincount(cell_ids, minlength=size * size)
+    sums = np.stack([np.bincount(cell_ids, weights=pos[:, axis], minlength=size * size) for axis in (0, 1)], axis=1)
+    occupied = counts > 0
+    return sums[occupied] / counts[occupied, None], counts[occupied].astype(float)
+
+
+def compute_layout(G, previous=None):
+    """
+    Force-directed (Fruchterman-Reingold) layout of G as {node: (x, y)}.
+
+    With a previous layout the run is warm-started from seed_positions()
+    and needs far fewer iterations. Forces are computed with NumPy over
+    all nodes at once; beyond LAYOUT_EXACT_NODES nodes, repulsion comes
+    from the mass-weighted centroids of a grid over the layout instead of
+    every other node, so each iteration stays linear in the graph size.
+    Meant to run off the GUI thread.
+    """
+    # Imported here so the app can start without loading NumPy.
+    import numpy as np
+    nodes = list(G)
+    n = len(nodes)
+    if n == 0:
+        return {}
+    rng = np.random.default_rng(0)
+    if previous:
+        initial = seed_positions(G, previous)
+        pos = np.array([initial[node] for node in nodes], dtype=float)
+        iterations, temperature = WARM_ITERATIONS, 0.02
+    else:
+        pos = rng.uniform(-1, 1, (n, 2))
+        iterations, temperature = COLD_ITERATIONS, 0.1
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.array([(index[u], index[v]) for u, v in G.edges() if u != v], dtype=np.intp).reshape(-1, 2)
+    k = 2.0 / np.sqrt(n)  # ideal edge length in the [-1, 1] box
+    cooling = temperature / (iterations + 1)
+    min_dist2 = (k / 10) ** 2
+
+    for _ in range(iterations):
+        if n > LAYOUT_EXACT_NODES:
+            sources, mass = grid_centroids(pos, LAYOUT_GRID)
+        else:
+            sources, mass = pos, np.ones(n)
+        disp = np.zeros_like(pos)
+        for start in range(0, n, LAYOUT_CHUNK):
+            delta = pos[start:start + LAYOUT_CHUNK, None, :] - sources[None, :, :]
+            dist2 = np.maximum((delta ** 2).sum(axis=-1), min_dist2)
+            disp[start:start + LAYOUT_CHUNK] += (delta * (k * k * mass / dist2)[..., None]).sum(axis=1)
+        if len(edges):
+            delta = pos[edges[:, 0]] - pos[edges[:, 1]]
+            force = delta * (np.linalg.norm(delta, axis=1) / k)[:, None]
+            np.subtract.at(disp, edges[:, 0], force)
+            np.add.at(disp, edges[:, 1], force)
+        length = np.maximum(np.linalg.norm(disp, axis=1), 1e-9)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    pos -= pos.mean(axis=0)
+    extent = np.abs(pos).max()
+    if extent > 0:
+        pos /= extent
+    return {node: (float(x), float(y)) for node, (x, y) in zip(nodes, pos)}
+
+
+class InvestigationGraph:
+    """
+    One graph merging every target added to the investigation.
+
+    Targets are linked to the artifacts (e-mails, name servers, registrants,
+    profile URLs, netblocks...) the result store's artifact index holds for
+    them, so targets sharing an artifact are connected through it. Adding
+    a target or saving a scan for one updates only that target's edges;
+    each change bumps `version`. Layouts and analytics (see
+    core.graph_analytics) are cached per version, and the most recent
+    layout is kept as the warm start for the next one. The
+    list of targets and the last layout are saved to the cache directory.
+    """
+    def __init__(self, path=None):
+        # Imported here so the app can start without loading NetworkX.
+        import networkx as nx
+        self.path = path or cache_path("investigation.json")
+        self.graph = nx.Graph()
+        self.targets = set()
+        self.version = 0
+        self._layouts = OrderedDict()  # {version: {node: (x, y)}}
+        self._latest_layout = {}
+        self._analytics = OrderedDict()  # {version: graph_analytics.analyze() result}
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self.load()
+
+    def __contains__(self, name):
+        return name in self.targets
+
+    def add_target(self, name):
+        """Adds a target to the investigation; returns False if it was already in it."""
+        with self._lock:
+            if name in self.targets:
+                return False
+            self.targets.add(name)
+            self._sync_target(name)
+            self.version += 1
+        self.save()
+        return True
+
+    def remove_target(self, name):
+        with self._lock:
+            if name not in self.targets:
+                return
+            self.targets.discard(name)
+            self._drop_target(name)
+            self.version += 1
+        self.save()
+
+    def clear(self):
+        with self._lock:
+            self.targets.clear()
+            self.graph.clear()
+            self.version += 1
+        self.save()
+
+    def refresh_target(self, name):
+        """Re-reads a target's artifacts after one of its scans was saved."""
+        with self._lock:
+            if name not in self.targets:
+                return
+            self._sync_target(name)
+            self.version += 1
+
+    def _sync_target(self, name):
+        # Called with the lock held: replaces the target's edges with its current artifacts.
+        node = target_node(name)
+        wanted = {artifact_node(kind, value): (kind, value)
+                  for kind, value in get_result_store().artifacts_of(name)}
+        if node not in self.graph:
+            self.graph.add_node(node, type=TARGET, label=name)
+        for other in list(self.graph[node]):
+            if other not in wanted:
+                self.graph.remove_edge(node, other)
+                if self.graph.degree(other) == 0:
+                    self.graph.remove_node(other)
+        for other, (kind, value) in wanted.items():
+            if other not in self.graph:
+                self.graph.add_node(other, type=kind, label=value)
+            self.graph.add_edge(node, other)
+
+    def _drop_target(self, name):
+        node = target_node(name)
+        if node not in self.graph:
+            return
+        neighbours = list(self.graph[node])
+        self.graph.remove_node(node)
+        for other in neighbours:
+            if self.graph.degree(other) == 0:
+                self.graph.remove_node(other)
+
+    def snapshot(self):
+        """(version, copy of the graph), safe to use from another thread."""
+        with self._lock:
+            return self.version, self.graph.copy()
+
+    def cached_layout(self, version):
+        with self._lock:
+            return self._layouts.get(version)
+
+    def latest_layout(self):
+        """The most recently computed layout (possibly of an older version)."""
+        with self._lock:
+            return self._latest_layout
+
+    def store_layout(self, version, pos):
+        with self._lock:
+            self._layouts[version] = pos
+            self._layouts.move_to_end(version)
+            while len(self._layouts) > LAYOUT_CACHE_SIZE:
+                self._layouts.popitem(last=False)
+            if version == max(self._layouts):
+                self._latest_layout = pos
+        self.save()
+
+    def cached_analytics(self, version):
+        with self._lock:
+            return self._analytics.get(version)
+
+    def store_analytics(self, version, analytics):
+        with self._lock:
+            self._analytics[version] = analytics
+            self._analytics.move_to_end(version)
+            while len(self._analytics) > ANALYTICS_CACHE_SIZE:
+                self._analytics.popitem(last=False)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading investigation {self.path}: {e}")
+            return
+        with self._lock:
+            for name in raw.get("targets", []):
+                self.targets.add(name)
+                self._sync_target(name)
+            self._latest_layout = {node: tuple(xy) for node, xy in raw.get("layout", {}).items()}
+            self.version += 1
+
+    def save(self):
+        with self._lock:
+            raw = {"targets": sorted(self.targets),
+                   "layout": {node: list(xy) for node, xy in self._latest_layout.items() if node in self.graph}}
+        tmp_path = self.path + ".tmp"
+        with self._save_lock:
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(raw, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Error saving investigation {self.path}: {e}")
+
+
+_investigation = None
+_investigation_lock = threading.Lock()
+
+
+def get_investigation():
+    """Returns the process-wide InvestigationGraph, kept current with saves made through core.storage."""
+    global _investigation
+    with _investigation_lock:
+        if _investigation is None:
+            _investigation = InvestigationGraph()
+            storage.add_save_listener(lambda target, scan_type, scan_id: _investigation.refresh_target(target))
+        return _investigation
@@ -1,20 +1,115 @@
+"""JSON serialization for scan results, with an optional orjson backend."""
 import datetime
 import json
+import os
+import threading
 
-def convert_datetime(obj):
-    if isinstance(obj, dict):
-        return {k: convert_datetime(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_datetime(i) for i in obj]
-    elif isinstance(obj, datetime.datetime):
-        return obj.isoformat()
-    elif isinstance(obj, datetime.date):
+_orjson = None
+
+
+def orjson_module():
+    """The orjson module, or False if it is not installed."""
+    global _orjson
+    if _orjson is None:
+        # Imported here so the app can start without loading orjson.
+        try:
+            import orjson
+            _orjson = orjson
+        except ImportError:
+            _orjson = False
+    return _orjson
+
+
+def json_default(obj):
+    """default= hook: datetimes and dates as ISO 8601 strings."""
+    if isinstance(obj, (datetime.datetime, datetime.date)):
         return obj.isoformat()
-    else:
-        return obj
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _chained_default(default):
+    if default is None:
+        return json_default
+
+    def hook(obj):
+        if isinstance(obj, (datetime.datetime, datetime.date)):
+            return obj.isoformat()
+        return default(obj)
+    return hook
+
+
+def dumps(data, pretty=False, default=None):
+    """
+    Serializes data to a str.
+
+    default is called for other values that cannot be encoded, e.g.
+    default=str to stringify anything unknown instead of raising TypeError.
+    """
+    hook = _chained_default(default)
+    orjson = orjson_module()
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(data, default=hook, option=option).decode('utf-8')
+        except TypeError:
+            # orjson.JSONEncodeError, e.g. integers beyond 64 bits; the json module encodes those.
+            pass
+    if pretty:
+        return json.dumps(data, default=hook, indent=2)
+    return json.dumps(data, default=hook, separators=(',', ':'))
+
+
+def dump(data, fp, pretty=False, default=None):
+    """Serializes data to a text file object."""
+    fp.write(dumps(data, pretty, default))
+
 
 def safe_json_dump(data, fp, **kwargs):
-    json.dump(convert_datetime(data), fp, **kwargs)
+    """json.dump() with datetimes encoded as ISO strings; accepts json.dump's keyword arguments."""
+    json.dump(data, fp, **dict(kwargs, default=_chained_default(kwargs.get("default"))))
+
 
 def safe_json_dumps(data, **kwargs):
-    return json.dumps(convert_datetime(data), **kwargs)
+    """json.dumps() with datetimes encoded as ISO strings; accepts json.dumps's keyword arguments."""
+    return json.dumps(data, **dict(kwargs, default=_chained_default(kwargs.get("default"))))
+
+
+class NdjsonWriter:
+    """
+    Writes one compact JSON document per line (NDJSON).
+
+    Takes an open text file object, or a path that is opened for appending
+    (an append-only log). Safe to call from several threads; each record
+    is encoded outside the lock and written as a single line.
+    """
+    def __init__(self, fp, default=None, flush=True):
+        self._owns_file = isinstance(fp, (str, os.PathLike))
+        self.fp = open(fp, 'a', encoding='utf-8') if self._owns_file else fp
+        self.default = default
+        self.flush = flush
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = dumps(record, default=self.default) + "\n"
+        with self._lock:
+            self.fp.write(line)
+            if self.flush:
+                self.fp.flush()
+
+    def write_many(self, records):
+        lines = "".join(dumps(record, default=self.default) + "\n" for record in records)
+        with self._lock:
+            self.fp.write(lines)
+            if self.flush:
+                self.fp.flush()
+
+    def close(self):
+        if self._owns_file:
+            self.fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
@@ -0,0 +1,101 @@
+import ipaddress
+import json
+import os
+import threading
+
+from core.paths import cache_path
+
+
+def most_specific_network(ip_address, results):
+    """
+    Returns the smallest CIDR from a WHOIS answer that contains ip_address.
+
+    Broader parent allocations (e.g. a /9 held by the upstream registry)
+    are skipped, since another address inside them may belong to a
+    different organisation.
+    """
+    address = ipaddress.ip_address(ip_address)
+    candidates = [results.get("asn_cidr")]
+    for net in results.get("nets") or []:
+        candidates.extend((net.get("cidr") or "").split(","))
+    best = None
+    for cidr in candidates:
+        if not cidr or cidr == "NA":
+            continue
+        try:
+            network = ipaddress.ip_network(cidr.strip(), strict=False)
+        except ValueError:
+            continue
+        if address in network and (best is None or network.prefixlen > best.prefixlen):
+            best = network
+    return str(best) if best else None
+
+
+class NetworkIndex:
+    """
+    Index of IP networks already resolved by WHOIS/RDAP.
+
+    Maps each network (CIDR) to the address whose lookup produced it.
+    Networks are bucketed by (IP version, prefix length), so finding the
+    most specific network that contains an address takes one dict probe
+    per distinct prefix length instead of a scan over all networks.
+    """
+    def __init__(self, path=None):
+        self.path = path or cache_path("ip_networks.json")
+        self._buckets = {}  # {(version, prefixlen): {network_int: (cidr, source_ip)}}
+        self._prefixes = {4: [], 6: []}  # prefix lengths in use, most specific first
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def add(self, cidr, source_ip):
+        network = ipaddress.ip_network(cidr, strict=False)
+        key = (network.version, network.prefixlen)
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = {}
+                prefixes = self._prefixes[network.version]
+                prefixes.append(network.prefixlen)
+                prefixes.sort(reverse=True)
+            self._buckets[key][int(network.network_address)] = (str(network), source_ip)
+
+    def lookup(self, ip):
+        """Returns (cidr, source_ip) of the most specific known network containing ip, or None."""
+        address = ipaddress.ip_address(ip)
+        value = int(address)
+        bits = address.max_prefixlen
+        with self._lock:
+            for prefixlen in self._prefixes[address.version]:
+                mask = ((1 << prefixlen) - 1) << (bits - prefixlen) if prefixlen else 0
+                hit = self._buckets[(address.version, prefixlen)].get(value & mask)
+                if hit is not None:
+                    return hit
+        return None
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading network index {self.path}: {e}")
+            return
+        for cidr, source_ip in raw.items():
+            try:
+                self.add(cidr, source_ip)
+            except ValueError:
+                continue
+
+    def save(self):
+        with self._lock:
+            raw = {cidr: source for bucket in self._buckets.values() for cidr, source in bucket.values()}
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(raw, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Error saving network index {self.path}: {e}")
@@ -0,0 +1,12 @@
+import os
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RESOURCES_DIR = os.path.join(PROJECT_ROOT, 'resources')
+# Derived, rebuildable state (compiled manifests, indexes, stats).
+CACHE_DIR = os.path.join(PROJECT_ROOT, 'cache')
+
+
+def cache_path(filename):
+    """Returns the path of a file in the cache directory, creating the directory if needed."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, filename)
@@ -3,6 +3,39 @@ import random
 import requests
 from bs4 import BeautifulSoup
 import urllib.parse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+from core.http_cache import cached_get
+from core.rate_limit import TokenBucket
+
+# Search results for a query are reused for a few hours.
+SEARCH_CACHE_TTL = 6 * 3600
+# Global pacing for requests to the search engine: a burst of one query
+# per site, then one request every two seconds.
+SEARCH_RATE = 0.5
+SEARCH_BURST = 5
+# How often a cancellable search checks whether it has been cancelled.
+CANCEL_POLL_INTERVAL = 0.2
+
+def polite_delay():
+    """Random 1-3 second pause before hitting the search engine."""
+    time.sleep(1 + random.random() * 2)
+
+_session = None
+_limiter = TokenBucket(SEARCH_RATE, SEARCH_BURST)
+_session_lock = threading.Lock()
+
+def get_search_session():
+    """Returns the shared, connection-pooled session used for searches."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=len(SEARCH_SITES))
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
 
 # List of user agents to rotate
 USER_AGENTS = [
@@ -29,15 +62,18 @@ def get_search_url(query):
     }
     return f"{base_url}?{urllib.parse.urlencode(params)}"
 
-def search_site(query, site_name, max_retries=3):
-    """Search a site using Startpage."""
+def search_site(query, site_name, max_retries=3, session=None, limiter=None):
+    """
+    Search a site using Startpage.
+
+    With a limiter (TokenBucket), each network request waits for a token
+    instead of sleeping a fixed 1-3 seconds.
+    """
     results = []
+    before_request = limiter.acquire if limiter else polite_delay
     
     for attempt in range(max_retries):
         try:
-            # Add delay between requests
-            time.sleep(1 + random.random() * 2)  # 1-3 second delay
-            
             # Rotate user agent
             headers = {
                 'User-Agent': random.choice(USER_AGENTS),
@@ -50,7 +86,9 @@ def search_site(query, site_name, max_retries=3):
             url = get_search_url(query)
             print(f"Searching {site_name} for: {query}")
             
-            response = requests.get(url, headers=headers, timeout=15)
+            # Cache hits skip the delay between requests
+            response = cached_get(url, "people_search", SEARCH_CACHE_TTL, session=session,
+                                  headers=headers, timeout=15, before_request=before_request)
             response.raise_for_status()
             
             # Parse results
@@ -96,48 +134,82 @@ def search_site(query, site_name, max_retries=3):
     
     return []
 
-def search_person(name):
-    """Search for a person across multiple social media sites."""
+def search_person_on_site(name, site, pattern, session=None, limiter=None):
+    """Search one site for a person and return a list of profile dicts."""
+    # Format the query with quotes around the name
+    formatted_name = f'"{name}"'
+    query = pattern.format(formatted_name)
+    print(f"Searching {site} for {formatted_name}...")
+
+    # Get search results
+    search_results = search_site(query, site, session=session, limiter=limiter)
+
+    if not search_results:
+        print(f"No results found on {site} for {formatted_name}")
+        return []
+
+    print(f"Found {len(search_results)} results on {site}")
+
+    # Process search results
     people = []
-    
-    # Don't shuffle sites to make debugging easier
-    sites = SEARCH_SITES
-    
-    for site, pattern in sites:
-        try:
-            # Format the query with quotes around the name
-            formatted_name = f'"{name}"'
-            query = pattern.format(formatted_name)
-            print(f"Searching {site} for {formatted_name}...")
-            
-            # Get search results
-            search_results = search_site(query, site)
-            
-            if not search_results:
-                print(f"No results found on {site} for {formatted_name}")
-                continue
-                
-            print(f"Found {len(search_results)} results on {site}")
-            
-            # Process search results
-            for result in search_results:
-                profile = {
-                    "site": site,
-                    "name": name,
-                    "profile_url": result.get('url', ''),
-                    "title": result.get('title', f"{name} on {site}"),
-                    "snippet": result.get('snippet', f"Profile link for {name} on {site}"),
-                    "avatar_url": "",
-                    "location": "",
-                    "emails": [],
-                    "phones": [],
-                }
-                people.append(profile)
-                print(f"- Found: {profile['title']}")
-            
-        except Exception as e:
-            print(f"Error searching {site} for {name}: {str(e)}")
-            continue
-    
+    for result in search_results:
+        profile = {
+            "site": site,
+            "name": name,
+            "profile_url": result.get('url', ''),
+            "title": result.get('title', f"{name} on {site}"),
+            "snippet": result.get('snippet', f"Profile link for {name} on {site}"),
+            "avatar_url": "",
+            "location": "",
+            "emails": [],
+            "phones": [],
+        }
+        people.append(profile)
+        print(f"- Found: {profile['title']}")
+    return people
+
+def search_person(name, on_site_results=None, cancel=None):
+    """
+    Search for a person across multiple social media sites.
+
+    All sites are queried concurrently over one pooled session, paced by a
+    shared token bucket. on_site_results(site, profiles), if given, is
+    called from the worker thread as each site finishes. The returned list
+    keeps SEARCH_SITES order.
+
+    Once the `cancel` event (if given) is set, sites that have not started
+    are dropped and the search returns what it has so far without waiting
+    for requests still in flight.
+    """
+    session = get_search_session()
+    by_site = {}
+
+    def search(site, pattern):
+        if cancel is not None and cancel.is_set():
+            return []
+        return search_person_on_site(name, site, pattern, session, _limiter)
+
+    pool = ThreadPoolExecutor(max_workers=len(SEARCH_SITES))
+    try:
+        futures = {pool.submit(search, site, pattern): site for site, pattern in SEARCH_SITES}
+        pending = set(futures)
+        poll = CANCEL_POLL_INTERVAL if cancel is not None else None
+        while pending:
+            done, pending = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+            if cancel is not None and cancel.is_set():
+                break
+            for future in done:
+                site = futures[future]
+                try:
+                    by_site[site] = future.result()
+                except Exception as e:
+                    print(f"Error searching {site} for {name}: {str(e)}")
+                    by_site[site] = []
+                if on_site_results:
+                    on_site_results(site, by_site[site])
+    finally:
+        pool.shutdown(wait=cancel is None or not cancel.is_set(), cancel_futures=True)
+
+    people = [profile for site, _ in SEARCH_SITES for profile in by_site.get(site, [])]
     print(f"\nFound {len(people)} total potential profiles")
     return people
@@ -1,11 +1,24 @@
+import threading
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 import requests
 from bs4 import BeautifulSoup
 import re
+from core.http_cache import cached_get
 
-def enrich_github(url):
+# Profile pages are re-checked at most once a day.
+ENRICH_CACHE_TTL = 24 * 3600
+# Enrichment threads in total, and requests in flight to any one domain.
+ENRICH_WORKERS = 8
+ENRICH_PER_DOMAIN = 2
+# Enriched URLs remembered per pool; older ones are fetched again (from the HTTP cache).
+ENRICH_DONE_SIZE = 2048
+
+def enrich_github(url, session=None):
     # url: https://github.com/<username>
     try:
-        resp = requests.get(url, timeout=10)
+        resp = cached_get(url, "enrich", ENRICH_CACHE_TTL, session=session, timeout=10)
         if resp.status_code != 200:
             return {}
         soup = BeautifulSoup(resp.text, 'html.parser')
@@ -31,10 +44,10 @@ def enrich_github(url):
     except Exception as e:
         return {}
 
-def enrich_twitter(url):
+def enrich_twitter(url, session=None):
     # Twitter blocks scraping; best effort for public profiles only
     try:
-        resp = requests.get(url, timeout=10, headers={
+        resp = cached_get(url, "enrich", ENRICH_CACHE_TTL, session=session, timeout=10, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'})
         if resp.status_code != 200:
             return {}
@@ -53,10 +66,89 @@ def enrich_twitter(url):
     except Exception:
         return {}
 
-def enrich_profile(url, site):
+def enrich_profile(url, site, session=None):
     if 'github.com' in url:
-        return enrich_github(url)
+        return enrich_github(url, session)
     if 'twitter.com' in url:
-        return enrich_twitter(url)
+        return enrich_twitter(url, session)
     # Add more platforms as needed
     return {}
+
+class EnrichmentPool:
+    """
+    Enriches profile URLs on a bounded thread pool.
+
+    Requests share one session and each URL is fetched only once at a time.
+    URLs wait in a queue per domain and are handed to the pool only while
+    fewer than per_domain of that domain's requests are running, so a busy
+    domain never holds pool threads that other domains could use.
+    on_enriched(url, info) is called from a pool thread when a URL is
+    done, and right away if it is among the last done_size enriched.
+    """
+    def __init__(self, on_enriched, max_workers=ENRICH_WORKERS, per_domain=ENRICH_PER_DOMAIN,
+                 done_size=ENRICH_DONE_SIZE):
+        self.on_enriched = on_enriched
+        self.session = requests.Session()
+        self.per_domain = per_domain
+        self.done_size = done_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="enrich")
+        self._pending = defaultdict(deque)  # {domain: deque of (url, site)} waiting for a slot
+        self._running = defaultdict(int)  # {domain: requests in the pool}
+        self._done = OrderedDict()  # {url: info}, least recently used first
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def submit(self, url, site):
+        """Queues url for enrichment; returns False if it was already queued or done."""
+        with self._lock:
+            if url in self._in_flight:
+                return False
+            info = self._done.get(url)
+            if info is None:
+                self._in_flight.add(url)
+                domain = urlsplit(url).netloc.lower()
+                self._pending[domain].append((url, site))
+                self._dispatch(domain)
+                return True
+            self._done.move_to_end(url)
+        self.on_enriched(url, info)
+        return False
+
+    def _dispatch(self, domain):
+        # Called with the lock held: starts the domain's next URLs while it has free slots.
+        pending = self._pending[domain]
+        while pending and self._running[domain] < self.per_domain:
+            url, site = pending.popleft()
+            self._running[domain] += 1
+            self._executor.submit(self._run, url, site, domain)
+        if not pending:
+            del self._pending[domain]
+
+    def _slot_freed(self, domain):
+        # Runs as each request completes: frees its slot and starts the domain's next URL.
+        with self._lock:
+            self._running[domain] -= 1
+            if not self._running[domain]:
+                del self._running[domain]
+            if domain in self._pending:
+                self._dispatch(domain)
+
+    def _run(self, url, site, domain):
+        try:
+            try:
+                info = enrich_profile(url, site, self.session)
+            except Exception:
+                info = {}
+            with self._lock:
+                self._in_flight.discard(url)
+                self._done[url] = info
+                while len(self._done) > self.done_size:
+                    self._done.popitem(last=False)
+            self.on_enriched(url, info)
+        finally:
+            self._slot_freed(domain)
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            self._pending.clear()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,51 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill at `rate` per second up to `capacity`; acquire() blocks
+    until a token is available, so bursts up to `capacity` go out at once
+    and sustained traffic is paced at `rate`.
+    """
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """Takes tokens if available right now; returns whether it did."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Blocks until tokens are available and takes them.
+
+        Returns False if timeout (seconds) expires first, True otherwise.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None:
+                if now + wait > deadline:
+                    return False
+            time.sleep(wait)
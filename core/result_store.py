@@ -0,0 +1,355 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from core import storage
+from core.artifact_index import extract_accounts, extract_artifacts, extract_emails, normalize
+from core.entity_resolution import blocking_keys
+from core.json_utils import dumps
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    target TEXT NOT NULL,
+    scan_type TEXT NOT NULL,
+    created REAL NOT NULL,
+    registrar TEXT,
+    size INTEGER NOT NULL,
+    items INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scans_target ON scans (target, scan_type, id);
+CREATE INDEX IF NOT EXISTS scans_type ON scans (scan_type, created);
+CREATE INDEX IF NOT EXISTS scans_created ON scans (created);
+CREATE INDEX IF NOT EXISTS scans_registrar ON scans (registrar) WHERE registrar IS NOT NULL;
+CREATE TABLE IF NOT EXISTS accounts (
+    scan_id INTEGER NOT NULL,
+    target TEXT NOT NULL,
+    site TEXT NOT NULL,
+    url TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS accounts_site ON accounts (site);
+CREATE INDEX IF NOT EXISTS accounts_scan ON accounts (scan_id);
+CREATE TABLE IF NOT EXISTS emails (
+    scan_id INTEGER NOT NULL,
+    target TEXT NOT NULL,
+    email TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS emails_email ON emails (email);
+CREATE INDEX IF NOT EXISTS emails_scan ON emails (scan_id);
+CREATE TABLE IF NOT EXISTS artifacts (
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    target TEXT NOT NULL,
+    scan_type TEXT NOT NULL,
+    PRIMARY KEY (kind, value, target, scan_type)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS artifacts_target ON artifacts (target, scan_type);
+CREATE TABLE IF NOT EXISTS artifact_blocks (
+    kind TEXT NOT NULL,
+    block TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (kind, block, value)
+) WITHOUT ROWID;
+"""
+# Bumped when a derived table needs rebuilding from the stored scans.
+SCHEMA_VERSION = 2
+
+# Latest scan of each type per target.
+LATEST = """
+SELECT id, target, scan_type, created, size, items FROM scans
+WHERE id IN (SELECT MAX(id) FROM scans {where} GROUP BY target, scan_type)
+"""
+
+RESULTS_FILE = "results.sqlite"
+
+
+def count_items(data):
+    if isinstance(data, (list, dict)):
+        return len(data)
+    return 0 if data is None else 1
+
+
+class ResultStore:
+    """
+    Append-only SQLite store of scan results.
+
+    Every save adds a row to `scans`, so earlier results stay available
+    as history; readers normally want the latest row per (target, scan
+    type). Accounts (site, URL), e-mail addresses and the registrar are
+    extracted into indexed columns/tables for cross-target queries.
+    Saves are transactional; save_many() and transaction() group many
+    saves into one commit.
+
+    The `artifacts` table is an inverted index over the latest scans:
+    normalized values (e-mails, name servers, registrants, usernames,
+    profile URLs, netblocks; see core.artifact_index) mapped to the
+    targets they appear in. Each save replaces that target's artifacts for
+    the scan type, so lookups never touch the scan data. `artifact_blocks`
+    holds the fuzzy-matching blocking keys of those values (see
+    core.entity_resolution); values no longer indexed are left behind in it
+    and drop out when joined back to `artifacts`.
+    """
+    def __init__(self, path=None):
+        self.path = path or os.path.join(storage.DATA_DIR, RESULTS_FILE)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self.rebuild_artifacts()
+
+    @contextmanager
+    def transaction(self):
+        """Groups every save made inside the block into a single commit."""
+        with self._lock:
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.rollback()
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.commit()
+
+    def save(self, target, scan_type, data, created=None):
+        """Appends one scan result; returns its id."""
+        with self.transaction():
+            return self._insert(target, scan_type, data, created)
+
+    def save_many(self, records):
+        """Appends (target, scan_type, data[, created]) records in one transaction; returns their ids."""
+        with self.transaction():
+            return [self._insert(*record) for record in records]
+
+    def _insert(self, target, scan_type, data, created=None):
+        # Encoded without copying data; the extractors below only read its strings.
+        blob = dumps(data, default=str)
+        registrar = data.get("registrar") if isinstance(data, dict) else None
+        if isinstance(registrar, list):
+            registrar = registrar[0] if registrar else None
+        if not isinstance(registrar, str):
+            registrar = None
+        cursor = self._conn.execute(
+            "INSERT INTO scans (target, scan_type, created, registrar, size, items, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (target, storage.scan_key(scan_type), created or time.time(), registrar, len(blob), count_items(data), blob),
+        )
+        scan_id = cursor.lastrowid
+        self._conn.executemany("INSERT INTO accounts VALUES (?, ?, ?, ?)",
+                               [(scan_id, target, site, url) for site, url in extract_accounts(data)])
+        self._conn.executemany("INSERT INTO emails VALUES (?, ?, ?)",
+                               [(scan_id, target, email) for email in set(extract_emails(data))])
+        self._index_artifacts(target, storage.scan_key(scan_type), data)
+        return scan_id
+
+    def _index_artifacts(self, target, scan_type, data):
+        artifacts = extract_artifacts(target, scan_type, data)
+        self._conn.execute("DELETE FROM artifacts WHERE target = ? AND scan_type = ?", (target, scan_type))
+        self._conn.executemany("INSERT INTO artifacts VALUES (?, ?, ?, ?)",
+                               [(kind, value, target, scan_type) for kind, value in artifacts])
+        self._conn.executemany("INSERT OR IGNORE INTO artifact_blocks VALUES (?, ?, ?)",
+                               [(kind, block, value) for kind, value in artifacts
+                                for block in blocking_keys(kind, value)])
+
+    def rebuild_artifacts(self):
+        """Re-derives the artifact index from the latest scans (e.g. after the extraction rules changed)."""
+        with self.transaction():
+            self._conn.execute("DELETE FROM artifacts")
+            self._conn.execute("DELETE FROM artifact_blocks")
+            rows = self._conn.execute(
+                "SELECT target, scan_type, data FROM scans WHERE id IN "
+                "(SELECT MAX(id) FROM scans GROUP BY target, scan_type)")
+            for target, scan_type, data in rows.fetchall():
+                self._index_artifacts(target, scan_type, json.loads(data))
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def latest_scans(self, target=None):
+        """
+        Summaries of the latest scan per (target, scan type), without the data.
+
+        Returns {target: {scan key: (scan_id, created, size, items)}}, with
+        scan types normalized by core.storage.scan_key ("ip_address").
+        """
+        where, params = ("WHERE target = ?", (target,)) if target is not None else ("", ())
+        with self._lock:
+            rows = self._conn.execute(LATEST.format(where=where), params).fetchall()
+        summaries = {}
+        for scan_id, row_target, scan_type, created, size, items in rows:
+            summaries.setdefault(row_target, {})[scan_type] = (scan_id, created, size, items)
+        return summaries
+
+    def load(self, scan_id):
+        """The data of one scan row, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM scans WHERE id = ?", (scan_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def latest(self, target, scan_type):
+        """The most recent data saved for target and scan_type, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM scans WHERE target = ? AND scan_type = ? ORDER BY id DESC LIMIT 1",
+                (target, storage.scan_key(scan_type)),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def history(self, target, scan_type):
+        """Every saved result for target and scan_type as (scan_id, created, data), newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, created, data FROM scans WHERE target = ? AND scan_type = ? ORDER BY id DESC",
+                (target, storage.scan_key(scan_type)),
+            ).fetchall()
+        return [(scan_id, created, json.loads(data)) for scan_id, created, data in rows]
+
+    def iter_latest(self, scan_type):
+        """Yields (target, data) for the latest scan of scan_type of every target."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT target, data FROM scans WHERE id IN "
+                "(SELECT MAX(id) FROM scans WHERE scan_type = ? GROUP BY target)",
+                (storage.scan_key(scan_type),),
+            ).fetchall()
+        for target, data in rows:
+            yield target, json.loads(data)
+
+    def targets_with_site(self, site):
+        return self._targets("SELECT DISTINCT target FROM accounts WHERE site = ?", site)
+
+    def targets_with_email(self, email):
+        return self._targets("SELECT DISTINCT target FROM emails WHERE email = ?", email.strip().lower())
+
+    def targets_with_registrar(self, registrar):
+        return self._targets("SELECT DISTINCT target FROM scans WHERE registrar = ?", registrar)
+
+    def targets_with_artifact(self, kind, value):
+        """Targets whose latest scans contain value (normalized for kind)."""
+        return self._targets("SELECT DISTINCT target FROM artifacts WHERE kind = ? AND value = ?",
+                             kind, normalize(kind, value))
+
+    def artifacts_of(self, target):
+        """The (kind, value) pairs indexed for target, sorted."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT DISTINCT kind, value FROM artifacts WHERE target = ? ORDER BY kind, value",
+                (target,)).fetchall()
+
+    def iter_artifacts(self, kinds=None):
+        """Yields every indexed (kind, value, target), optionally only for the given kinds."""
+        query, params = "SELECT DISTINCT kind, value, target FROM artifacts", ()
+        if kinds:
+            query += f" WHERE kind IN ({', '.join('?' * len(kinds))})"
+            params = tuple(kinds)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        yield from rows
+
+    def block_candidates(self, kind, value):
+        """Indexed values of kind sharing a blocking key with value (value itself excluded)."""
+        blocks = sorted(blocking_keys(kind, value))
+        if not blocks:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT value FROM artifact_blocks WHERE kind = ? AND block IN ({', '.join('?' * len(blocks))}) "
+                "AND value != ? AND EXISTS (SELECT 1 FROM artifacts a WHERE a.kind = artifact_blocks.kind "
+                "AND a.value = artifact_blocks.value)",
+                (kind, *blocks, value)).fetchall()
+        return [candidate for (candidate,) in rows]
+
+    def shared_artifacts(self, target, limit=None):
+        """
+        Artifacts of target that other targets share.
+
+        Returns {(kind, value): (number of other targets, [up to limit of them])}.
+        """
+        shared = {}
+        with self._lock:
+            for kind, value in self.artifacts_of(target):
+                count = self._conn.execute(
+                    "SELECT COUNT(DISTINCT target) FROM artifacts WHERE kind = ? AND value = ? AND target != ?",
+                    (kind, value, target)).fetchone()[0]
+                if not count:
+                    continue
+                rows = self._conn.execute(
+                    "SELECT DISTINCT target FROM artifacts WHERE kind = ? AND value = ? AND target != ? "
+                    "ORDER BY target LIMIT ?", (kind, value, target, -1 if limit is None else limit))
+                shared[(kind, value)] = (count, [other for (other,) in rows])
+        return shared
+
+    def _targets(self, query, *params):
+        with self._lock:
+            return sorted(target for (target,) in self._conn.execute(query, params))
+
+
+def migrate_json_tree(store, data_dir=None, remove=False):
+    """
+    Imports every data/<target>/<scan>.json into store, dated by file mtime.
+
+    Files already imported (same target, scan type and timestamp) are
+    skipped, so the migration can be re-run. With remove, imported files
+    are deleted afterwards (and target directories left empty). Returns
+    (imported, skipped) counts.
+    """
+    data_dir = data_dir or storage.DATA_DIR
+    imported = skipped = 0
+    if not os.path.isdir(data_dir):
+        return imported, skipped
+    for target_entry in os.scandir(data_dir):
+        if not target_entry.is_dir():
+            continue
+        records, paths = [], []
+        for entry in os.scandir(target_entry.path):
+            if not entry.name.endswith('.json'):
+                continue
+            scan_type = storage.scan_key(entry.name[:-5])
+            created = entry.stat().st_mtime
+            with store._lock:
+                exists = store._conn.execute(
+                    "SELECT 1 FROM scans WHERE target = ? AND scan_type = ? AND created = ?",
+                    (target_entry.name, scan_type, created),
+                ).fetchone()
+            if exists:
+                skipped += 1
+                paths.append(entry.path)
+                continue
+            try:
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping {entry.path}: {e}")
+                continue
+            records.append((target_entry.name, scan_type, data, created))
+            paths.append(entry.path)
+        store.save_many(records)
+        imported += len(records)
+        if remove:
+            for path in paths:
+                os.remove(path)
+            if not os.listdir(target_entry.path):
+                os.rmdir(target_entry.path)
+    return imported, skipped
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_result_store(data_dir=None):
+    """Returns the shared ResultStore of data_dir (default core.storage.DATA_DIR)."""
+    path = os.path.join(data_dir or storage.DATA_DIR, RESULTS_FILE)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ResultStore(path)
+        return store
@@ -0,0 +1,404 @@
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from notify import QueryNotify
+from result import QueryStatus
+
+from core.paths import cache_path
+from core.storage import save_scan_result
+
+# Scans are network-bound, so the pool is sized like Python's default for
+# I/O work rather than by core count alone.
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+QUEUED = "Queued"
+RUNNING = "Running"
+DONE = "Done"
+FAILED = "Failed"
+CANCELLED = "Cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# Job type scanning a list of usernames together (see scan_usernames).
+USERNAME_BATCH = "Username Batch"
+# Scan types with a bulk collector; queued jobs of one type are run together
+# (see run_bulk_scan) so they share its per-server pacing and dedup.
+BULK_SCAN_TYPES = ("Domain", "IP Address")
+
+
+class ScanJob:
+    """
+    One queued scan: what to scan, how urgent it is, and how far along it is.
+
+    Higher priority runs first; equal priorities run in submission order.
+    For USERNAME_BATCH jobs, target is a list of usernames.
+    """
+    __slots__ = ("job_id", "scan_type", "target", "priority", "top_k", "save",
+                 "status", "done", "total", "detail", "result", "error",
+                 "cancel_event", "created", "started", "finished")
+
+    def __init__(self, job_id, scan_type, target, priority=0, top_k=None, save=False):
+        self.job_id = job_id
+        self.scan_type = scan_type
+        self.target = target
+        self.priority = priority
+        self.top_k = top_k
+        self.save = save
+        self.status = QUEUED
+        self.done = 0
+        self.total = 0
+        self.detail = ""
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+    @property
+    def label(self):
+        if isinstance(self.target, list):
+            return f"{len(self.target)} usernames"
+        return self.target
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def to_dict(self):
+        return {
+            "scan_type": self.scan_type,
+            "target": self.target,
+            "priority": self.priority,
+            "top_k": self.top_k,
+            "save": self.save,
+        }
+
+
+class JobNotifier(QueryNotify):
+    """Sherlock notifier that records progress on a ScanJob and reports hits."""
+    def __init__(self, job, on_hit=None, on_progress=None):
+        super().__init__()
+        self.job = job
+        self.on_hit = on_hit
+        self.on_progress = on_progress
+        self.total = 0
+
+    def start(self, message):
+        self.job.total = self.total
+
+    def update(self, result):
+        self.job.done += 1
+        if self.on_progress:
+            self.on_progress(self.job)
+        if result.status == QueryStatus.CLAIMED and self.on_hit:
+            self.on_hit(self.job, result.username, result.site_name, result.site_url_user)
+
+    def finish(self):
+        pass
+
+
+def run_scan_job(job, on_hit=None, on_site_results=None, on_progress=None, on_target_done=None):
+    """
+    Runs one job in the calling thread and returns its result.
+
+    on_hit(job, username, site, url) is called for each claimed account of
+    a username scan; on_site_results(job, site, profiles) for each site of
+    a real-name search; on_progress(job) whenever job.done advances; and
+    on_target_done(job, username, hits, error) as each username of a batch
+    is finished and saved (error is None, or why saving failed). All are
+    called from the scanning thread. Domain and IP lookups are single
+    blocking calls and only honour cancellation before they start.
+    """
+    cancel = job.cancel_event
+    if cancel.is_set():
+        return None
+    if job.scan_type == "Username":
+        from collectors.sherlock import scan_username
+        return scan_username(job.target, notifier=JobNotifier(job, on_hit, on_progress),
+                             top_k=job.top_k, cancel=cancel)
+    if job.scan_type == USERNAME_BATCH:
+        from collectors.sherlock import scan_usernames
+        saved = {}
+
+        def save_username(username, hits):
+            error = None
+            try:
+                save_scan_result(username, "Username", hits)
+                saved[username] = len(hits)
+                job.detail = f"Saved {len(hits)} accounts for '{username}'"
+            except (OSError, sqlite3.Error) as e:
+                error = str(e)
+                job.detail = f"Error saving results for {username}: {e}"
+            if on_target_done:
+                on_target_done(job, username, hits, error)
+
+        scan_usernames(job.target, notifier=JobNotifier(job, on_hit, on_progress),
+                       on_username_done=save_username,
+                       top_k=job.top_k, cancel=cancel)
+        return saved
+    if job.scan_type == "Real Name":
+        from core.people_search import search_person, SEARCH_SITES
+        job.total = len(SEARCH_SITES)
+
+        def site_done(site, people):
+            job.done += 1
+            if on_progress:
+                on_progress(job)
+            if on_site_results:
+                on_site_results(job, site, people)
+
+        return search_person(job.target, on_site_results=site_done, cancel=cancel)
+    if job.scan_type == "Domain":
+        from collectors.whois import get_whois_info
+        return get_whois_info(job.target)
+    if job.scan_type == "IP Address":
+        from collectors.ipinfo import get_ip_info
+        return get_ip_info(job.target)
+    raise ValueError(f"Unknown scan type: {job.scan_type}")
+
+
+def bulk_key(target):
+    """How run_bulk_scan() identifies a target in its results."""
+    return target.strip().lower()
+
+
+def run_bulk_scan(scan_type, targets, on_result=None):
+    """
+    Looks up many Domain or IP Address targets with the bulk collector.
+
+    Domains go through get_whois_info_bulk (grouped by WHOIS server, with a
+    token bucket and backoff per server) and IPs through get_ip_info_bulk
+    (answered from already known networks where possible). Nothing is
+    saved here. on_result(target, data) is called as each target resolves,
+    with target as bulk_key(); returns {target: data or None}.
+    """
+    targets = [bulk_key(target) for target in targets]
+    if scan_type == "Domain":
+        from collectors.whois import get_whois_info_bulk
+        return get_whois_info_bulk(targets, on_result=on_result, save=False)
+    if scan_type == "IP Address":
+        from collectors.ipinfo import get_ip_info_bulk
+        return get_ip_info_bulk(targets, on_result=on_result)
+    raise ValueError(f"No bulk scan for: {scan_type}")
+
+
+class ScanScheduler:
+    """
+    Runs ScanJobs on a bounded pool of worker threads.
+
+    runner(job) does the actual scan and returns its result; on_change(job),
+    if given, is called from a worker thread whenever a job changes state.
+    A worker taking a job of a BULK_SCAN_TYPES type also takes every other
+    job of that type still queued and runs them with one bulk_runner call.
+    Jobs that are still queued or running are written to path, and are
+    queued again by restore() on the next start.
+    """
+    def __init__(self, runner=run_scan_job, max_workers=DEFAULT_SCAN_WORKERS, on_change=None, path=None,
+                 bulk_runner=run_bulk_scan):
+        self.runner = runner
+        self.bulk_runner = bulk_runner
+        self.on_change = on_change
+        self.path = path or cache_path("scan_jobs.json")
+        self.max_workers = max(1, max_workers)
+        self.jobs = {}
+        self._heap = []
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._threads = []
+        self._cond = threading.Condition()
+        self._save_lock = threading.Lock()
+        self._closing = False
+
+    def new_job(self, scan_type, target, priority=0, top_k=None, save=False):
+        """Creates a job without queueing it, e.g. to hook it up before it can start."""
+        with self._cond:
+            return ScanJob(next(self._ids), scan_type, target, priority, top_k, save)
+
+    def submit(self, scan_type, target, priority=0, top_k=None, save=False):
+        return self.enqueue(self.new_job(scan_type, target, priority, top_k, save))
+
+    def enqueue(self, job):
+        with self._cond:
+            self.jobs[job.job_id] = job
+            heapq.heappush(self._heap, (-job.priority, next(self._seq), job.job_id))
+            self._spawn_workers()
+            self._cond.notify()
+        self._changed(job)
+        return job
+
+    def cancel(self, job_id):
+        """Cancels a queued job, or asks a running one to stop."""
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return False
+            job.cancel_event.set()
+            queued = job.status == QUEUED
+            if queued:
+                job.status = CANCELLED
+                job.finished = time.time()
+        if queued:
+            self._changed(job)
+        return True
+
+    def set_max_workers(self, max_workers):
+        """Resizes the pool; surplus workers exit after their current job."""
+        with self._cond:
+            self.max_workers = max(1, max_workers)
+            self._spawn_workers()
+            self._cond.notify_all()
+
+    def pending(self):
+        return [job for job in self.jobs.values() if job.status not in FINISHED_STATES]
+
+    def clear_finished(self):
+        """Forgets jobs that are done, failed or cancelled."""
+        with self._cond:
+            self.jobs = {job_id: job for job_id, job in self.jobs.items()
+                         if job.status not in FINISHED_STATES}
+
+    def _spawn_workers(self):
+        # Each running job holds a thread, so size by everything unfinished.
+        while len(self._threads) < min(self.max_workers, len(self.pending())):
+            thread = threading.Thread(target=self._work, daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_job(self):
+        # Called with the condition held; returns None when this worker should exit.
+        while True:
+            if self._closing or len(self._threads) > self.max_workers:
+                return None
+            while self._heap:
+                _, _, job_id = heapq.heappop(self._heap)
+                job = self.jobs.get(job_id)
+                if job is not None and job.status == QUEUED:
+                    return job
+            if not self._cond.wait(timeout=30):
+                return None
+
+    def _claim_bulk(self, job):
+        # Called with the condition held: the other queued jobs run_bulk_scan can take with job.
+        if self.bulk_runner is None or job.scan_type not in BULK_SCAN_TYPES:
+            return [job]
+        return [job] + [other for other in self.jobs.values()
+                        if other is not job and other.status == QUEUED and other.scan_type == job.scan_type]
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                if job is None:
+                    self._threads.remove(threading.current_thread())
+                    return
+                jobs = self._claim_bulk(job)
+                for claimed in jobs:
+                    claimed.status = RUNNING
+                    claimed.started = time.time()
+            for claimed in jobs:
+                self._changed(claimed)
+            if self.bulk_runner is not None and job.scan_type in BULK_SCAN_TYPES:
+                self._work_bulk(jobs)
+                continue
+            try:
+                job.result = self.runner(job)
+                if job.save and job.result and job.scan_type != USERNAME_BATCH:
+                    save_scan_result(job.target, job.scan_type, job.result)
+                self._finish(job, CANCELLED if job.cancelled else DONE)
+            except Exception as e:
+                job.error = str(e)
+                self._finish(job, CANCELLED if job.cancelled else FAILED)
+
+    def _work_bulk(self, jobs):
+        by_target = defaultdict(list)
+        for job in jobs:
+            by_target[bulk_key(job.target)].append(job)
+
+        def on_result(target, data):
+            for job in by_target.pop(target, ()):
+                if job.cancelled:
+                    self._finish(job, CANCELLED)
+                    continue
+                job.result = data
+                try:
+                    if job.save and data:
+                        save_scan_result(job.target, job.scan_type, data)
+                    self._finish(job, DONE)
+                except (OSError, sqlite3.Error) as e:
+                    job.error = str(e)
+                    self._finish(job, FAILED)
+
+        try:
+            self.bulk_runner(jobs[0].scan_type, list(by_target), on_result=on_result)
+        except Exception as e:
+            for job in jobs:
+                job.error = job.error or str(e)
+                self._finish(job, CANCELLED if job.cancelled else FAILED)
+        # Targets the bulk lookup skipped (e.g. invalid addresses).
+        for remaining in list(by_target.values()):
+            for job in remaining:
+                self._finish(job, CANCELLED if job.cancelled else DONE)
+
+    def _finish(self, job, status):
+        with self._cond:
+            if job.status in FINISHED_STATES:
+                return
+            job.status = status
+            job.finished = time.time()
+        self._changed(job)
+
+    def _changed(self, job):
+        self.save()
+        if self.on_change:
+            self.on_change(job)
+
+    def save(self):
+        """Writes the specs of queued and running jobs to disk."""
+        if self._closing:
+            return
+        with self._save_lock:
+            with self._cond:
+                pending = sorted(self.pending(), key=lambda job: job.job_id)
+                raw = [job.to_dict() for job in pending if not job.cancelled]
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(raw, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Error saving scan queue {self.path}: {e}")
+
+    def restore(self):
+        """
+        Queues the jobs left pending by the previous run; returns them.
+
+        Nobody is watching a resumed job, so its result is always saved.
+        """
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading scan queue {self.path}: {e}")
+            return []
+        return [
+            self.submit(spec["scan_type"], spec["target"], spec.get("priority", 0),
+                        spec.get("top_k"), save=True)
+            for spec in raw if spec.get("scan_type") and spec.get("target")
+        ]
+
+    def shutdown(self):
+        """Stops all work; pending jobs stay on disk for the next start."""
+        self.save()
+        with self._cond:
+            self._closing = True
+            for job in self.jobs.values():
+                job.cancel_event.set()
+            self._cond.notify_all()
@@ -0,0 +1,38 @@
+DATA_DIR = "data"
+
+# Called as listener(target, scan_type, scan_id) after every save_scan_result.
+_save_listeners = []
+
+
+def add_save_listener(listener):
+    """Registers a callable to be told about every saved scan result."""
+    _save_listeners.append(listener)
+
+
+def scan_key(scan_type):
+    """Normalizes a scan type ("IP Address") or result file stem to its key ("ip_address")."""
+    return scan_type.replace(' ', '_').lower()
+
+
+def scan_label(scan_type):
+    """Maps a scan type or key ("ip_address") to its display name ("Ip Address")."""
+    return scan_key(scan_type).replace('_', ' ').title()
+
+
+def scan_file_name(scan_type):
+    """Maps a scan type (e.g. "IP Address") to its legacy file name ("ip_address.json")."""
+    return f"{scan_key(scan_type)}.json"
+
+
+def save_scan_result(target, scan_type, data):
+    """
+    Appends the results of one scan to the result store (data/results.sqlite).
+
+    Earlier results for the same target and scan type are kept as history.
+    Returns the id of the new scan row.
+    """
+    from core.result_store import get_result_store
+    scan_id = get_result_store().save(target, scan_type, data)
+    for listener in _save_listeners:
+        listener(target, scan_type, scan_id)
+    return scan_id
@@ -2,7 +2,6 @@ import sys
 from PyQt5.QtWidgets import QApplication, QDialog
 import qdarkstyle
 
-from ui.dashboard import Dashboard
 from ui.lock_screen import LockScreen
 
 def main():
@@ -11,6 +10,8 @@ def main():
     
     lock = LockScreen()
     if lock.exec_() == QDialog.Accepted:
+        # Imported only after unlocking so the lock screen paints right away.
+        from ui.dashboard import Dashboard
         window = Dashboard()
         window.show()
         sys.exit(app.exec_())
@@ -0,0 +1,202 @@
+"""
+Headless command-line runner for the collectors.
+
+    python -m osintool scan --type username --input list.txt --out data/
+    python -m osintool migrate [--remove-json]
+
+Scans go through the same pipeline as the desktop app (core.scan_jobs),
+share its caches and are saved to the same result store
+(data/results.sqlite). `migrate` imports the data/<target>/<type>.json
+files written by older versions into the store.
+
+Results are streamed to stdout as NDJSON, one object per line; the
+collectors' own log output goes to stderr. Nothing here imports Qt.
+
+Exit codes: 0 when every target was scanned, 1 when some failed, 2 for
+usage errors and 130 when interrupted.
+"""
+import argparse
+import contextlib
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core import storage
+from core.json_utils import NdjsonWriter
+from core.scan_jobs import (ScanJob, run_scan_job, run_bulk_scan, BULK_SCAN_TYPES, USERNAME_BATCH,
+                            DEFAULT_SCAN_WORKERS)
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+SCAN_TYPES = {
+    "username": "Username",
+    "realname": "Real Name",
+    "domain": "Domain",
+    "ip": "IP Address",
+}
+
+
+def read_targets(args):
+    """Targets from the command line and --input (one per line, '#' comments, '-' for stdin)."""
+    targets = list(args.targets)
+    if args.input:
+        with (contextlib.nullcontext(sys.stdin) if args.input == "-" else open(args.input, encoding='utf-8')) as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    targets.append(line)
+    return list(dict.fromkeys(targets))
+
+
+def scan_usernames(targets, args, out):
+    """All usernames go into one batch job so they share a single HTTP session."""
+    failed = []
+    job = ScanJob(0, USERNAME_BATCH, targets, top_k=args.top_k)
+
+    def on_hit(job, username, site, url):
+        out.write(dict(event="hit", type="username", target=username, site=site, url=url))
+
+    def on_target_done(job, username, hits, error):
+        if error:
+            failed.append(username)
+            out.write(dict(event="error", type="username", target=username, error=error))
+        else:
+            out.write(dict(event="result", type="username", target=username, data=hits))
+
+    try:
+        run_scan_job(job, on_hit=on_hit, on_target_done=on_target_done)
+    except KeyboardInterrupt:
+        job.cancel_event.set()
+        raise
+    except Exception as e:
+        out.write(dict(event="error", type="username", target=None, error=str(e)))
+        return targets
+    return failed
+
+
+def scan_bulk(scan_type, targets, args, out):
+    """Domains and IPs go through the bulk collectors, which pace and dedup registry queries."""
+    failed = []
+    type_name = args.type
+
+    def on_result(target, data):
+        if data is None:
+            failed.append(target)
+            out.write(dict(event="error", type=type_name, target=target, error="no data"))
+            return
+        try:
+            storage.save_scan_result(target, scan_type, data)
+        except (OSError, sqlite3.Error) as e:
+            failed.append(target)
+            out.write(dict(event="error", type=type_name, target=target, error=str(e)))
+            return
+        out.write(dict(event="result", type=type_name, target=target, data=data))
+
+    run_bulk_scan(scan_type, targets, on_result=on_result)
+    return failed
+
+
+def scan_targets(scan_type, targets, args, out):
+    """Scan types without a bulk collector run one job per target on a thread pool."""
+    failed = []
+    jobs = [ScanJob(i, scan_type, target) for i, target in enumerate(targets, 1)]
+    type_name = args.type
+
+    def run(job):
+        data = run_scan_job(job)
+        if data is None:
+            raise LookupError("no data")
+        storage.save_scan_result(job.target, scan_type, data)
+        return data
+
+    pool = ThreadPoolExecutor(max_workers=args.workers)
+    try:
+        futures = {pool.submit(run, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                out.write(dict(event="result", type=type_name, target=job.target, data=future.result()))
+            except Exception as e:
+                failed.append(job.target)
+                out.write(dict(event="error", type=type_name, target=job.target, error=str(e)))
+    except KeyboardInterrupt:
+        for job in jobs:
+            job.cancel_event.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return failed
+
+
+def cmd_scan(args):
+    targets = read_targets(args)
+    if not targets:
+        print("No targets given; pass them as arguments or with --input.", file=sys.stderr)
+        return EXIT_USAGE
+    if args.out:
+        storage.DATA_DIR = args.out
+    if args.quick:
+        from collectors.site_scheduler import QUICK_SCAN_SITES
+        args.top_k = QUICK_SCAN_SITES
+
+    out = NdjsonWriter(sys.stdout, default=str)
+    scan_type = SCAN_TYPES[args.type]
+    # Collectors print progress; keep stdout clean for the NDJSON stream.
+    with contextlib.redirect_stdout(sys.stderr):
+        if scan_type == "Username":
+            failed = scan_usernames(targets, args, out)
+        elif scan_type in BULK_SCAN_TYPES:
+            failed = scan_bulk(scan_type, targets, args, out)
+        else:
+            failed = scan_targets(scan_type, targets, args, out)
+    out.write(dict(event="summary", type=args.type, targets=len(targets), failed=len(failed)))
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def cmd_migrate(args):
+    from core.result_store import get_result_store, migrate_json_tree
+    if args.data:
+        storage.DATA_DIR = args.data
+    imported, skipped = migrate_json_tree(get_result_store(), remove=args.remove_json)
+    print(f"Imported {imported} scan results into {get_result_store().path} "
+          f"({skipped} already present).", file=sys.stderr)
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="osintool", description="Headless OSINT collectors.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="Scan targets and stream results as NDJSON.")
+    scan.add_argument("targets", nargs="*", help="Targets to scan.")
+    scan.add_argument("--type", required=True, choices=sorted(SCAN_TYPES), help="Kind of target.")
+    scan.add_argument("--input", help="File with one target per line ('-' for stdin).")
+    scan.add_argument("--out", help=f"Directory results are saved to (default: {storage.DATA_DIR}).")
+    scan.add_argument("--quick", action="store_true", help="Username scans: only probe the best-ranked sites.")
+    scan.add_argument("--workers", type=int, default=DEFAULT_SCAN_WORKERS,
+                      help="Targets scanned in parallel (real-name scans).")
+    scan.set_defaults(func=cmd_scan, top_k=None)
+
+    migrate = commands.add_parser("migrate", help="Import legacy per-scan JSON files into the result store.")
+    migrate.add_argument("--data", help=f"Data directory to migrate (default: {storage.DATA_DIR}).")
+    migrate.add_argument("--remove-json", action="store_true", help="Delete the JSON files once imported.")
+    migrate.set_defaults(func=cmd_migrate)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+JSON serialization benchmark for scan results.
+
+Serializes a synthetic multi-MB result set (WHOIS records with datetimes,
+IP lookups, profile lists) the way results used to be written (a
+datetime-converted deep copy, indent=4) and with core.json_utils, and
+prints the time and peak traced memory of each.
+
+    python scripts/json_benchmark.py [--records 20000] [--runs 3]
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from core import json_utils  # noqa: E402
+
+
+def legacy_convert(obj):
+    # What json_utils did before: a converted copy of the whole tree.
+    if isinstance(obj, dict):
+        return {k: legacy_convert(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [legacy_convert(i) for i in obj]
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    return obj
+
+
+def make_results(records):
+    base = datetime.datetime(2020, 1, 1)
+    results = []
+    for i in range(records):
+        if i % 3 == 0:
+            results.append({
+                "domain_name": f"example{i}.com", "registrar": "Example Registrar, Inc.",
+                "creation_date": base + datetime.timedelta(days=i),
+                "expiration_date": [base + datetime.timedelta(days=i + 365), base + datetime.timedelta(days=i + 366)],
+                "name_servers": [f"ns{j}.example{i}.com" for j in range(4)],
+                "emails": [f"abuse@example{i}.com", f"admin{i}@example.org"],
+                "name": f"Registrant {i}", "org": f"Org {i % 97}", "country": "US",
+            })
+        elif i % 3 == 1:
+            results.append({
+                "ip": f"10.{i % 256}.{i // 256 % 256}.1", "asn": 64512 + i % 1000,
+                "asn_cidr": f"10.{i % 256}.0.0/16", "asn_description": "EXAMPLE-AS",
+                "network": {"cidr": f"10.{i % 256}.0.0/16", "name": f"NET-{i}",
+                            "events": [{"action": "registration", "timestamp": base + datetime.timedelta(hours=i)}]},
+            })
+        else:
+            results.append([{"site": f"site{j}", "url": f"https://site{j}.example/user{i}",
+                             "checked": base + datetime.timedelta(minutes=i)} for j in range(8)])
+    return results
+
+
+def measure(fn, runs):
+    """(best seconds, peak traced bytes) of fn()."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000, help="Scan results in the set.")
+    parser.add_argument("--runs", type=int, default=3, help="Best of this many runs is reported.")
+    args = parser.parse_args()
+
+    results = make_results(args.records)
+    candidates = [
+        ("legacy (copy + indent=4)", lambda: json.dumps(legacy_convert(results), indent=4)),
+        ("json default= hook, pretty", lambda: json.dumps(results, default=json_utils.json_default, indent=2)),
+        ("json default= hook, compact", lambda: json.dumps(results, default=json_utils.json_default,
+                                                           separators=(',', ':'))),
+    ]
+    if json_utils.orjson_module():
+        candidates.append(("json_utils.dumps (orjson)", lambda: json_utils.dumps(results)))
+    else:
+        print("orjson is not installed; json_utils.dumps uses the json module.")
+
+    print(f"{'':30} {'MB out':>7} {'seconds':>8} {'peak MB':>8}")
+    for name, fn in candidates:
+        size = len(fn())
+        seconds, peak = measure(fn, args.runs)
+        print(f"{name:30} {size / 1e6:7.1f} {seconds:8.3f} {peak / 1e6:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Startup import benchmark for the desktop app.
+
+Imports the modules the app needs to show the lock screen and dashboard
+in a fresh interpreter under `python -X importtime`, prints the slowest
+imports, and exits with status 1 if the total goes over the budget or a
+heavy dependency that should be imported lazily gets loaded at startup.
+
+    python scripts/startup_benchmark.py [--budget-ms 300] [--top 15]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What main.py imports before and right after the lock screen.
+STARTUP_MODULES = ["ui.lock_screen", "ui.dashboard"]
+# Cumulative import time allowed for STARTUP_MODULES, in milliseconds.
+IMPORT_BUDGET_MS = 300
+# Loaded only when the tab or collector that needs them is first used.
+DEFERRED_MODULES = ["matplotlib", "networkx", "numpy", "scipy", "rapidfuzz", "whois", "ipwhois", "bs4",
+                    "aiohttp", "requests", "sherlock"]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(modules):
+    """Returns [(name, self_us, cumulative_us, depth)] for one cold import of modules."""
+    code = "import " + ", ".join(modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"Importing {', '.join(modules)} failed.")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def startup_us(rows):
+    # Interpreter startup (site, encodings) is not ours to budget.
+    return sum(cumulative for name, _, cumulative, depth in rows
+               if depth == 0 and name in STARTUP_MODULES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list.")
+    parser.add_argument("--runs", type=int, default=3, help="Best of this many runs is reported.")
+    args = parser.parse_args()
+
+    # Import times are noisy; the fastest run is the most representative.
+    runs = [measure(STARTUP_MODULES) for _ in range(max(1, args.runs))]
+    rows = min(runs, key=startup_us)
+    total_ms = startup_us(rows) / 1000
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us, depth in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {'  ' * depth}{name}")
+    print(f"\nTotal startup import time: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    imported = {name.split(".")[0] for name, _, _, _ in rows}
+    eager = [module for module in DEFERRED_MODULES if module in imported]
+    failed = False
+    if eager:
+        print(f"Imported at startup but should be deferred: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("Over the startup import budget.")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
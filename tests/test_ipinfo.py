@@ -0,0 +1,18 @@
+from unittest import mock
+
+from collectors import ipinfo
+from core import http_cache
+from core.network_index import NetworkIndex
+
+
+def test_bulk_answers_a_covering_cidr_with_one_lookup(tmp_path):
+    answer = {"asn_cidr": "8.8.8.0/24", "nets": [{"cidr": "8.8.8.0/24"}]}
+    ips = ["8.8.8.1", "8.8.8.2", "8.8.8.3", "8.8.8.200"]
+    with mock.patch.object(http_cache, "_cache", http_cache.HttpCache(str(tmp_path / "cache.sqlite"))), \
+            mock.patch.object(ipinfo, "get_network_index", return_value=NetworkIndex(str(tmp_path / "nets.json"))), \
+            mock.patch.object(ipinfo, "IPWhois") as ipwhois:
+        ipwhois.return_value.lookup_whois.return_value = answer
+        results = ipinfo.get_ip_info_bulk(ips)
+    assert ipwhois.call_count == 1
+    assert set(results) == set(ips)
+    assert all(results[ip] for ip in ips)
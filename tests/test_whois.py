@@ -0,0 +1,12 @@
+from unittest import mock
+
+from collectors import whois
+
+
+def test_bulk_resolves_whois_server_once_per_tld():
+    domains = ["a.com", "b.com", "c.net", "d.com", "e.net", "f.io"]
+    with mock.patch.object(whois.NICClient, "choose_server", return_value="whois.example") as choose_server, \
+            mock.patch.object(whois, "lookup_whois_paced", return_value=None):
+        results = whois.get_whois_info_bulk(domains, save=False)
+    assert set(results) == set(domains)
+    assert choose_server.call_count == 3
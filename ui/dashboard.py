@@ -1,49 +1,43 @@
-import json
-import os
-from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QTextBrowser, QComboBox, QTabWidget, QProgressBar, QLabel, QScrollArea, QFrame
-from PyQt5.QtCore import QObject, QThread, pyqtSignal, Qt
-
-from collectors.sherlock import scan_username, RealtimeNotifier
-from collectors.whois import get_whois_info
-from collectors.ipinfo import get_ip_info
-from ui.target_manager import TargetManager
-from core.json_utils import safe_json_dump
-
-class Worker(QObject):
-    finished = pyqtSignal()
-    result = pyqtSignal(object)
-    error = pyqtSignal(str)
-    progress = pyqtSignal(int, int)
-    partial_result = pyqtSignal(str, str, str)
+from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QTextBrowser, QComboBox, QTabWidget, QProgressBar, QFrame, QCheckBox, QListView
+from PyQt5.QtCore import QObject, pyqtSignal, QUrl
+from PyQt5.QtGui import QDesktopServices
 
-    def __init__(self, scan_type, target):
-        super().__init__()
-        self.scan_type = scan_type
-        self.target = target
-
-    def run(self):
-        try:
-            if self.scan_type == "Username":
-                notifier = RealtimeNotifier()
-                notifier.progress.connect(self.progress)
-                notifier.result_found.connect(self.partial_result)
-                # scan_username is now non-blocking in terms of final result,
-                # but the work is done in-thread and progress is emitted.
-                scan_username(self.target, notifier=notifier)
-                # Emit an empty list to signal completion of this scan type.
-                self.result.emit([])
-            elif self.scan_type == "Domain":
-                data = get_whois_info(self.target)
-                self.result.emit(data)
-            elif self.scan_type == "IP Address":
-                data = get_ip_info(self.target)
-                self.result.emit(data)
-            else:
-                self.result.emit(None)
-        except Exception as e:
-            self.error.emit(str(e))
-        finally:
-            self.finished.emit()
+from collectors.site_scheduler import QUICK_SCAN_SITES
+from core.scan_jobs import ScanScheduler, run_scan_job, USERNAME_BATCH, FINISHED_STATES, DONE, FAILED
+from ui.target_manager import TargetManager
+from ui.job_queue import JobQueuePanel
+from ui.scan_frames import FrameCoalescer
+from ui.result_model import ProfileListModel, ProfileFilterProxy, ProfileCardDelegate, OrderRole, SiteRole, UrlRole
+from core.storage import save_scan_result
+
+# Interactive scans jump ahead of queued batch work.
+INTERACTIVE_PRIORITY = 10
+BATCH_PRIORITY = 0
+
+class JobBridge(QObject):
+    """Carries scheduler callbacks from scan threads to the GUI thread."""
+    job_changed = pyqtSignal(object)
+    site_results = pyqtSignal(object, str, list)
+
+class Enricher(QObject):
+    """Bridges the EnrichmentPool's worker threads back to the GUI thread."""
+    enriched = pyqtSignal(str, dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Created on first use so requests/BeautifulSoup load after startup.
+        self.pool = None
+
+    def submit(self, url, site):
+        if self.pool is None:
+            from core.profile_enrich import EnrichmentPool
+            # Emitting from the pool threads queues delivery onto the GUI thread.
+            self.pool = EnrichmentPool(self.enriched.emit)
+        return self.pool.submit(url, site)
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown()
 
 class Dashboard(QMainWindow):
     def __init__(self):
@@ -51,6 +45,16 @@ class Dashboard(QMainWindow):
         self.setWindowTitle("OSINT Desktop Intelligence Tool")
         self.setGeometry(100, 100, 1200, 800)
         self.current_results = []
+        self.enricher = Enricher(self)
+        self.enricher.enriched.connect(self.apply_enrichment)
+        self.frames = FrameCoalescer(parent=self)
+        self.frames.frame.connect(self.apply_frame)
+        # The job whose hits and progress the Live Scan tab shows.
+        self.focused_job = None
+        self.bridge = JobBridge(self)
+        self.bridge.job_changed.connect(self.job_changed)
+        self.bridge.site_results.connect(self.job_site_results)
+        self.scheduler = ScanScheduler(self.run_job, on_change=self.bridge.job_changed.emit)
 
         self.tabs = QTabWidget()
         self.setCentralWidget(self.tabs)
@@ -60,9 +64,17 @@ class Dashboard(QMainWindow):
         self.setup_live_scan_ui()
 
         self.target_manager_widget = TargetManager()
+        self.target_manager_widget.scan_requested.connect(self.start_batch_scan)
         self.tabs.addTab(self.target_manager_widget, "Targets")
 
-        self.statusBar().showMessage("Ready")
+        self.job_queue_widget = JobQueuePanel(self.scheduler)
+        self.tabs.addTab(self.job_queue_widget, "Queue")
+        restored = self.scheduler.restore()
+
+        if restored:
+            self.statusBar().showMessage(f"Resumed {len(restored)} scans from the last session.")
+        else:
+            self.statusBar().showMessage("Ready")
 
     def setup_live_scan_ui(self):
         live_scan_layout = QVBoxLayout(self.live_scan_widget)
@@ -72,12 +84,17 @@ class Dashboard(QMainWindow):
         self.target_input = QLineEdit()
         self.scan_type_combo = QComboBox()
         self.scan_type_combo.addItems(["Username", "Real Name", "Domain", "IP Address"])
+        self.quick_checkbox = QCheckBox(f"Quick (top {QUICK_SCAN_SITES} sites)")
+        self.quick_checkbox.setToolTip("Only probe the sites with the best hit rate and latency so far.")
         self.scan_button = QPushButton("Scan")
+        self.cancel_button = QPushButton("Cancel")
         self.save_button = QPushButton("Save Results")
 
         input_layout.addWidget(self.target_input)
         input_layout.addWidget(self.scan_type_combo)
+        input_layout.addWidget(self.quick_checkbox)
         input_layout.addWidget(self.scan_button)
+        input_layout.addWidget(self.cancel_button)
         input_layout.addWidget(self.save_button)
         live_scan_layout.addLayout(input_layout)
 
@@ -86,24 +103,49 @@ class Dashboard(QMainWindow):
         self.progress_bar.setVisible(False)
         live_scan_layout.addWidget(self.progress_bar)
 
-        # --- Profile Card Scroll Area ---
-        self.card_scroll = QScrollArea()
-        self.card_scroll.setWidgetResizable(True)
-        self.card_container = QWidget()
-        self.card_layout = QVBoxLayout(self.card_container)
-        self.card_layout.setAlignment(Qt.AlignTop)
-        self.card_scroll.setWidget(self.card_container)
-        live_scan_layout.addWidget(self.card_scroll)
+        # --- Result Filter/Sort ---
+        view_layout = QHBoxLayout()
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter results")
+        self.sort_combo = QComboBox()
+        self.sort_combo.addItems(["Found order", "Site", "URL"])
+        view_layout.addWidget(self.filter_input)
+        view_layout.addWidget(self.sort_combo)
+        live_scan_layout.addLayout(view_layout)
+
+        # --- Profile Card List (virtualized: only visible rows are painted) ---
+        self.result_model = ProfileListModel(self)
+        self.result_proxy = ProfileFilterProxy(self)
+        self.result_proxy.setSourceModel(self.result_model)
+        self.result_proxy.sort(0)
+        self.result_view = QListView()
+        self.result_view.setModel(self.result_proxy)
+        self.result_view.setItemDelegate(ProfileCardDelegate(self.result_view))
+        self.result_view.setUniformItemSizes(True)
+        self.result_view.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.result_view.doubleClicked.connect(self.open_result_url)
+        live_scan_layout.addWidget(self.result_view)
+
+        # --- Details Area (Domain/IP tables, messages and errors) ---
+        self.details_view = QTextBrowser()
+        self.details_view.setOpenExternalLinks(True)
+        self.details_view.setVisible(False)
+        live_scan_layout.addWidget(self.details_view)
 
         # --- Connections and Initial State ---
         self.scan_button.clicked.connect(self.start_scan)
+        self.cancel_button.clicked.connect(self.cancel_scan)
+        self.cancel_button.setEnabled(False)
         self.save_button.clicked.connect(self.save_results)
         self.save_button.setEnabled(False)
         self.scan_type_combo.currentIndexChanged.connect(self.update_input_placeholder)
         self.update_input_placeholder() # Set initial placeholder
+        self.filter_input.textChanged.connect(self.result_proxy.setFilterFixedString)
+        self.sort_combo.currentIndexChanged.connect(self.update_sort)
 
     def update_input_placeholder(self):
         scan_type = self.scan_type_combo.currentText()
+        self.quick_checkbox.setVisible(scan_type == "Username")
         if scan_type == "Username":
             self.target_input.setPlaceholderText("Enter username")
         elif scan_type == "Real Name":
@@ -121,66 +163,159 @@ class Dashboard(QMainWindow):
             self.statusBar().showMessage("Error: Target cannot be empty.")
             return
 
-        self.scan_button.setEnabled(False)
+        job = self.scheduler.new_job(self.current_scan_type, self.target,
+                                     priority=INTERACTIVE_PRIORITY, top_k=self.quick_top_k())
+        self.focus_job(job)
+        self.scheduler.enqueue(job)
+        self.statusBar().showMessage(f"Scanning {self.current_scan_type} for '{self.target}'...")
+
+    def start_batch_scan(self, usernames):
+        self.tabs.setCurrentWidget(self.live_scan_widget)
+        self.target = usernames
+        self.current_scan_type = USERNAME_BATCH
+        job = self.scheduler.new_job(USERNAME_BATCH, usernames, priority=BATCH_PRIORITY,
+                                     top_k=self.quick_top_k())
+        self.focus_job(job)
+        self.scheduler.enqueue(job)
+        self.statusBar().showMessage(f"Batch scanning {len(usernames)} usernames...")
+
+    def focus_job(self, job):
+        """Shows job's hits and progress in the Live Scan tab from now on."""
+        previous = self.focused_job
+        if previous is not None and previous.status not in FINISHED_STATES:
+            # Nobody is watching it any more, so keep its results on disk.
+            previous.save = True
+        self.focused_job = job
         self.save_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
         self.current_results = []
-        self.statusBar().showMessage(f"Scanning {self.current_scan_type} for '{self.target}'...")
-        # Clear profile cards
-        for i in reversed(range(self.card_layout.count())):
-            widget = self.card_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        if self.current_scan_type == "Username":
-            self.progress_bar.setVisible(True)
-            self.progress_bar.setValue(0)
-
-        self.thread = QThread()
-        self.worker = Worker(self.current_scan_type, self.target)
-        self.worker.moveToThread(self.thread)
-
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.worker.result.connect(self.display_results)
-        self.worker.error.connect(self.scan_error)
-        self.worker.progress.connect(self.update_progress)
-        self.worker.partial_result.connect(self.append_username_result)
-
-        self.thread.start()
+        self.people_sites_done = 0
+        self.clear_cards()
+        self.progress_bar.setVisible(job.scan_type in ("Username", "Real Name", USERNAME_BATCH))
+        self.progress_bar.setValue(0)
+        self.frames.start()
+
+    def cancel_scan(self):
+        if self.focused_job is not None:
+            self.scheduler.cancel(self.focused_job.job_id)
+
+    def run_job(self, job):
+        # Runs on a scheduler thread; only the focused job feeds the live view.
+        def on_hit(job, username, site, url):
+            if job is self.focused_job:
+                label = f"{site} ({username})" if job.scan_type == USERNAME_BATCH else site
+                self.frames.add_hit(label, url, "Found")
+
+        def on_progress(job):
+            if job is self.focused_job and job.scan_type != "Real Name":
+                self.frames.add_progress(job.done, job.total)
+
+        def on_site_results(job, site, people):
+            self.bridge.site_results.emit(job, site, people)
+
+        return run_scan_job(job, on_hit=on_hit, on_site_results=on_site_results, on_progress=on_progress)
+
+    def job_changed(self, job):
+        if job.scan_type == USERNAME_BATCH and job.detail:
+            self.statusBar().showMessage(job.detail)
+        if job.status not in FINISHED_STATES:
+            return
+        if job is not self.focused_job:
+            return
+        self.frames.stop()
+        self.cancel_button.setEnabled(False)
+        if job.status == FAILED:
+            self.scan_error(job.error)
+        elif job.status != DONE:
+            self.progress_bar.setVisible(False)
+            self.statusBar().showMessage("Scan cancelled.", 5000)
+        elif job.scan_type == USERNAME_BATCH:
+            self.batch_finished()
+        else:
+            self.display_results(job.result)
+
+    def job_site_results(self, job, site, people):
+        if job is self.focused_job:
+            self.append_people_results(site, people)
+
+    def quick_top_k(self):
+        return QUICK_SCAN_SITES if self.quick_checkbox.isChecked() else None
+
+    def batch_finished(self):
+        self.progress_bar.setVisible(False)
+        self.statusBar().showMessage("Batch scan finished.", 5000)
+
+    def clear_cards(self):
+        self.result_model.clear()
+        self.details_view.clear()
+        self.details_view.setVisible(False)
+
+    def show_details(self, html):
+        """Shows rich text (tables, messages, errors) under the result list."""
+        self.details_view.setHtml(html)
+        self.details_view.setVisible(True)
+
+    def update_sort(self):
+        role = {"Site": SiteRole, "URL": UrlRole}.get(self.sort_combo.currentText(), OrderRole)
+        self.result_proxy.setSortRole(role)
+        self.result_proxy.sort(0)
+
+    def open_result_url(self, index):
+        url = index.data(UrlRole)
+        if url:
+            QDesktopServices.openUrl(QUrl(url))
 
     def update_progress(self, value, total):
         self.progress_bar.setMaximum(total)
         self.progress_bar.setValue(value)
 
-    def append_username_result(self, site, url, status):
-        # Enrich profile (async could be added later for speed)
-        enriched = self.enrich_profile(url, site)
-        self.current_results.append(enriched)
-        self.update_results_table()
-
-    def update_results_table(self):
-        # Clear previous cards
-        for i in reversed(range(self.card_layout.count())):
-            widget = self.card_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-        if not self.current_results:
-            label = QLabel("No profiles found.")
-            label.setStyleSheet("color: #ccc; font-size: 16px;")
-            self.card_layout.addWidget(label)
+    def apply_frame(self, done, total, hits):
+        """Applies one coalesced batch of scan progress and hits."""
+        if total:
+            self.update_progress(done, total)
+        if hits:
+            self.append_username_results(hits)
+
+    def append_username_results(self, hits):
+        # Show placeholder rows now; the enrichment pool fills them in later.
+        entries = [self.username_entry(site, url, {}) for site, url, status in hits]
+        for entry in self.result_model.extend(entries, pending=True):
+            self.current_results.append(entry)
+            self.enricher.submit(entry["url"], entry["site"])
+
+    def apply_enrichment(self, url, info):
+        entry = self.result_model.entry_for_url(url)
+        if entry is None:
             return
-        for entry in self.current_results:
-            card = ProfileCard(entry)
-            self.card_layout.addWidget(card)
+        entry.update(self.username_entry(entry["site"], url, info))
+        self.result_model.mark_updated(url)
+
+    def append_people_results(self, site, people):
+        from core.people_search import SEARCH_SITES
+        self.people_sites_done += 1
+        self.update_progress(self.people_sites_done, len(SEARCH_SITES))
+        for entry in people:
+            self.result_model.append(self.person_card_entry(entry))
+
+    @staticmethod
+    def person_card_entry(entry):
+        return {
+            "name": entry.get("name", ""),
+            "site": entry.get("site", ""),
+            "bio": entry.get("title", ""),
+            "avatar_url": entry.get("avatar_url", ""),
+            "location": entry.get("location", ""),
+            "emails": entry.get("emails", []),
+            "phones": entry.get("phones", []),
+            "url": entry.get("profile_url", ""),
+            "snippet": entry.get("snippet", "")
+        }
 
-    def enrich_profile(self, url, site):
-        try:
-            from core.profile_enrich import enrich_profile as real_enrich
-            info = real_enrich(url, site)
-        except Exception:
-            info = {}
+    def show_no_profiles(self):
+        self.show_details("<p style='color:#ccc;font-size:16px;'>No profiles found.</p>")
+
+    @staticmethod
+    def username_entry(site, url, info):
         entry = {
             "site": site,
             "url": url,
@@ -196,18 +331,9 @@ class Dashboard(QMainWindow):
             self.statusBar().showMessage("No results to save.", 5000)
             return
 
-        data_dir = "data"
-        target_dir = os.path.join(data_dir, self.target)
-        os.makedirs(target_dir, exist_ok=True)
-
-        file_name = f"{self.current_scan_type.replace(' ', '_').lower()}.json"
-        file_path = os.path.join(target_dir, file_name)
-
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                safe_json_dump(self.current_results, f, indent=4)
-            self.statusBar().showMessage(f"Results saved to {file_path}", 5000)
-            self.target_manager_widget.populate_target_list()
+            scan_id = save_scan_result(self.target, self.current_scan_type, self.current_results)
+            self.statusBar().showMessage(f"Results saved for '{self.target}' (scan #{scan_id})", 5000)
         except Exception as e:
             self.statusBar().showMessage(f"Error saving results: {e}", 5000)
 
@@ -228,59 +354,36 @@ class Dashboard(QMainWindow):
         return html
 
     def display_results(self, data):
-        # Clear previous cards
-        for i in reversed(range(self.card_layout.count())):
-            widget = self.card_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
         if self.current_scan_type == "Real Name":
-            # Real person OSINT search
-            try:
-                from core.people_search import search_person
-                people = search_person(self.target)
-                if not people:
-                    card = QLabel("<span style='color:#ffb347;font-size:18px;'>No public profiles found for this name.</span>")
-                    self.card_layout.addWidget(card)
-                else:
-                    for entry in people:
-                        self.card_layout.addWidget(ProfileCard({
-                            "name": entry.get("name", ""),
-                            "site": entry.get("site", ""),
-                            "bio": entry.get("title", ""),
-                            "avatar_url": entry.get("avatar_url", ""),
-                            "location": entry.get("location", ""),
-                            "emails": entry.get("emails", []),
-                            "phones": entry.get("phones", []),
-                            "url": entry.get("profile_url", ""),
-                            "snippet": entry.get("snippet", "")
-                        }))
-                self.progress_bar.setVisible(False)
-            except Exception as e:
-                card = QLabel(f"<span style='color:red;'>Error searching for people: {e}</span>")
-                self.card_layout.addWidget(card)
-                self.progress_bar.setVisible(False)
+            # Profile cards were already added per site by append_people_results.
+            if not data:
+                self.show_details("<span style='color:#ffb347;font-size:18px;'>No public profiles found for this name.</span>")
+            self.progress_bar.setVisible(False)
         elif self.current_scan_type != "Username":
-            # Show non-username results as a card
+            self.clear_cards()
+            # Show non-username results as a table
             self.current_results = data
-            html = self.format_dict_to_html_table(data)
-            card = QLabel(html)
-            card.setStyleSheet("color: #eee; font-size: 15px;")
-            card.setTextFormat(Qt.RichText)
-            self.card_layout.addWidget(card)
+            self.show_details(self.format_dict_to_html_table(data))
             self.progress_bar.setVisible(False)
         else:
+            # Cards were added as hits arrived and are enriched in the background.
             self.progress_bar.setVisible(False)
-            self.update_results_table()
+            if not self.current_results:
+                self.show_no_profiles()
 
         self.statusBar().showMessage("Scan finished.", 5000)
-        self.scan_button.setEnabled(True)
         if self.current_results:
             self.save_button.setEnabled(True)
 
+    def closeEvent(self, event):
+        self.job_queue_widget.timer.stop()
+        self.scheduler.shutdown()
+        self.enricher.shutdown()
+        super().closeEvent(event)
+
     def scan_error(self, error_message):
         self.progress_bar.setVisible(False)
-        # Show error in card area
-        error_label = QLabel(f"<p style='color: red;'>An error occurred:<br>{error_message}</p>")
-        self.card_layout.addWidget(error_label)
+        # Show error below the results
+        self.details_view.append(f"<p style='color: red;'>An error occurred:<br>{error_message}</p>")
+        self.details_view.setVisible(True)
         self.statusBar().showMessage("Scan failed.", 5000)
-        self.scan_button.setEnabled(True)
@@ -0,0 +1,335 @@
+import math
+from collections import defaultdict
+
+import numpy as np
+from PyQt5.QtCore import Qt, QRectF, QPointF, pyqtSignal
+from PyQt5.QtGui import QColor, QPen, QPainter, QPolygonF, QFont
+from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsItem, QGraphicsEllipseItem, QToolTip
+
+# Layout coordinates ([-1, 1]) are multiplied by this to get scene units.
+SCENE_SCALE = 1000.0
+# Side of a SpatialGrid cell, in scene units.
+GRID_CELL = 50.0
+# Node diameters in pixels; nodes keep their on-screen size when zooming.
+NODE_SIZE = 6
+TARGET_NODE_SIZE = 11
+# Labels are drawn once no more than this many nodes are in view.
+MAX_LABELS = 300
+# At most this many edges are drawn per paint; when zoomed out further, an
+# evenly spaced subset stands in for the rest.
+MAX_DRAWN_EDGES = 30000
+# Above this many edges or nodes in view, they are drawn without
+# antialiasing (and nodes as squares); at that density it is not visible.
+MAX_ANTIALIASED = 5000
+# Pointer distance, in pixels, within which a node counts as hovered.
+HOVER_RADIUS = 8
+ZOOM_STEP = 1.25
+
+EDGE_COLOR = QColor(128, 128, 128, 90)
+LABEL_COLOR = QColor('white')
+HOVER_COLOR = QColor('#ffffff')
+
+
+def polygon(xy):
+    """QPolygonF of an (n, 2) array, filled through its buffer instead of n QPointF objects."""
+    xy = np.ascontiguousarray(xy, dtype=np.float64)
+    poly = QPolygonF(len(xy))
+    if len(xy):
+        buffer = poly.data()
+        buffer.setsize(xy.nbytes)
+        np.frombuffer(buffer, dtype=np.float64)[:] = xy.ravel()
+    return poly
+
+
+class SpatialGrid:
+    """Uniform grid over node positions for point queries (hit-testing, hover)."""
+    def __init__(self, cell=GRID_CELL):
+        self.cell = cell
+        self.cells = defaultdict(list)
+
+    def _key(self, x, y):
+        return (int(math.floor(x / self.cell)), int(math.floor(y / self.cell)))
+
+    def insert(self, index, x, y):
+        self.cells[self._key(x, y)].append(index)
+
+    def rebuild(self, xy):
+        self.cells = defaultdict(list)
+        keys = np.floor(xy / self.cell).astype(np.int64)
+        for index, (cx, cy) in enumerate(keys.tolist()):
+            self.cells[(cx, cy)].append(index)
+
+    def nearest(self, x, y, radius, xy):
+        """Index of the node closest to (x, y) within radius, or None."""
+        x0, y0 = self._key(x - radius, y - radius)
+        x1, y1 = self._key(x + radius, y + radius)
+        candidates = [i for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)
+                      for i in self.cells.get((cx, cy), ())]
+        if not candidates:
+            return None
+        candidates = np.array(candidates)
+        dist2 = ((xy[candidates] - (x, y)) ** 2).sum(axis=1)
+        best = int(dist2.argmin())
+        return int(candidates[best]) if dist2[best] <= radius * radius else None
+
+
+class EdgeLayer(QGraphicsItem):
+    """Draws the edges in one batched drawLines() call, culled to the exposed area."""
+    def __init__(self, canvas):
+        super().__init__()
+        self.canvas = canvas
+        # Panning scrolls the viewport, so only the newly exposed strip is painted.
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+    def boundingRect(self):
+        return self.canvas.bounds
+
+    def paint(self, painter, option, widget=None):
+        lines, low, high = self.canvas.edge_lines, self.canvas.edge_low, self.canvas.edge_high
+        if not len(lines):
+            return
+        rect = option.exposedRect
+        visible = np.flatnonzero((low[:, 0] <= rect.right()) & (high[:, 0] >= rect.left())
+                                 & (low[:, 1] <= rect.bottom()) & (high[:, 1] >= rect.top()))
+        if len(visible) > MAX_DRAWN_EDGES:
+            visible = visible[::math.ceil(len(visible) / MAX_DRAWN_EDGES)]
+        painter.setRenderHint(QPainter.Antialiasing, len(visible) <= MAX_ANTIALIASED)
+        painter.setPen(QPen(EDGE_COLOR, 0))
+        painter.drawLines(polygon(lines[visible].reshape(-1, 2)))
+
+
+class NodeLayer(QGraphicsItem):
+    """
+    Draws the nodes as round points, one drawPoints() call per node type.
+
+    Labels are level-of-detail culled: they are drawn, at a fixed screen
+    size, only for the nodes in view and only once few enough are.
+    """
+    def __init__(self, canvas):
+        super().__init__()
+        self.canvas = canvas
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.font = QFont()
+        self.font.setPointSize(8)
+
+    def boundingRect(self):
+        return self.canvas.bounds
+
+    def paint(self, painter, option, widget=None):
+        canvas = self.canvas
+        if not len(canvas.xy):
+            return
+        rect = option.exposedRect.adjusted(-TARGET_NODE_SIZE, -TARGET_NODE_SIZE, TARGET_NODE_SIZE, TARGET_NODE_SIZE)
+        xy = canvas.xy
+        visible = ((xy[:, 0] >= rect.left()) & (xy[:, 0] <= rect.right())
+                   & (xy[:, 1] >= rect.top()) & (xy[:, 1] <= rect.bottom()))
+        in_view = np.flatnonzero(visible)
+        detailed = len(in_view) <= MAX_ANTIALIASED
+        painter.setRenderHint(QPainter.Antialiasing, detailed)
+        for kind, (color, size) in canvas.styles.items():
+            indices = np.flatnonzero(visible & (canvas.kinds == kind))
+            if not len(indices):
+                continue
+            pen = QPen(color, size)
+            pen.setCosmetic(True)
+            pen.setCapStyle(Qt.RoundCap if detailed else Qt.SquareCap)
+            painter.setPen(pen)
+            painter.drawPoints(polygon(xy[indices]))
+
+        if len(in_view) > MAX_LABELS:
+            return
+        transform = painter.worldTransform()
+        painter.save()
+        painter.resetTransform()
+        painter.setFont(self.font)
+        painter.setPen(LABEL_COLOR)
+        for index in in_view.tolist():
+            point = transform.map(QPointF(*xy[index]))
+            painter.drawText(point + QPointF(TARGET_NODE_SIZE / 2 + 2, 4), canvas.labels[index])
+        painter.restore()
+
+
+class GraphCanvas(QGraphicsView):
+    """
+    QGraphicsScene-based renderer for large graphs.
+
+    Node positions and edges are kept in NumPy arrays and drawn by two
+    batched layer items rather than one item per node or edge, so 50k
+    nodes and 200k edges stay responsive: drawing is culled to the exposed
+    area, labels appear only when zoomed in, and a SpatialGrid answers
+    hover and click hit-tests. set_graph() appends new nodes and edges
+    in place and only repositions everything when the layout changed.
+    """
+    # Emitted with the node id when a node is clicked.
+    node_clicked = pyqtSignal(str)
+
+    def __init__(self, node_colors, default_color, parent=None):
+        super().__init__(parent)
+        self.setScene(QGraphicsScene(self))
+        self.setRenderHint(QPainter.Antialiasing)
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        self.setMouseTracking(True)
+        self.node_colors = node_colors  # {node type: color}
+        self.default_color = default_color
+        self.bounds = QRectF()
+        self.hovered = None
+        # Optional node id -> extra tooltip text (e.g. the node's analytics).
+        self.describe = None
+        self.reset()
+
+        self.edge_layer = EdgeLayer(self)
+        self.node_layer = NodeLayer(self)
+        self.highlight = QGraphicsEllipseItem(-TARGET_NODE_SIZE, -TARGET_NODE_SIZE,
+                                              2 * TARGET_NODE_SIZE, 2 * TARGET_NODE_SIZE)
+        self.highlight.setPen(QPen(HOVER_COLOR, 2))
+        self.highlight.setFlag(QGraphicsItem.ItemIgnoresTransformations)
+        self.highlight.setVisible(False)
+        for z, item in enumerate((self.edge_layer, self.node_layer, self.highlight)):
+            item.setZValue(z)
+            self.scene().addItem(item)
+
+    def reset(self):
+        self.ids = []
+        self.index = {}
+        self.labels = []
+        self.kinds = np.zeros(0, dtype=np.int32)
+        self.styles = {}  # {kind code: (QColor, size)}
+        self.kind_codes = {}
+        self.xy = np.zeros((0, 2))
+        self.edges = np.zeros((0, 2), dtype=np.intp)
+        self.edge_set = set()
+        self.edge_lines = np.zeros((0, 4))
+        self.edge_low = self.edge_high = np.zeros((0, 2))
+        self.grid = SpatialGrid()
+
+    def kind_code(self, kind):
+        code = self.kind_codes.get(kind)
+        if code is None:
+            code = self.kind_codes[kind] = len(self.kind_codes)
+            color = self.node_colors.get(kind, self.default_color)
+            self.styles[code] = (QColor(color), TARGET_NODE_SIZE if kind == 'target' else NODE_SIZE)
+        return code
+
+    def set_graph(self, G, pos):
+        """
+        Shows G at pos ({node: (x, y)} in layout coordinates).
+
+        Nodes and edges not yet shown are appended and only the area around
+        them is repainted. Removed nodes or edges mean a rebuild, and moved
+        nodes (a new layout) a full repaint.
+        """
+        if any(node not in G for node in self.ids):
+            self.reset()
+        old_count = len(self.ids)
+        xy = np.array([pos.get(node, (0.0, 0.0)) for node in self.ids], dtype=float).reshape(-1, 2) * SCENE_SCALE
+        moved = not np.allclose(xy, self.xy)
+        if moved:
+            self.xy = xy
+            self.grid.rebuild(self.xy)
+
+        new_nodes = [node for node in G if node not in self.index]
+        if new_nodes:
+            self.ids.extend(new_nodes)
+            self.index.update((node, old_count + i) for i, node in enumerate(new_nodes))
+            attrs = G.nodes
+            self.labels.extend(str(attrs[node].get('label', node)) for node in new_nodes)
+            self.kinds = np.concatenate([self.kinds, np.array(
+                [self.kind_code(attrs[node].get('type')) for node in new_nodes], dtype=np.int32)])
+            new_xy = np.array([pos.get(node, (0.0, 0.0)) for node in new_nodes], dtype=float) * SCENE_SCALE
+            self.xy = np.vstack([self.xy, new_xy])
+            for i, (x, y) in enumerate(new_xy.tolist(), old_count):
+                self.grid.insert(i, x, y)
+
+        index = self.index
+        edges = {(index[u], index[v]) if index[u] < index[v] else (index[v], index[u]) for u, v in G.edges()}
+        rebuilt = not edges >= self.edge_set
+        if rebuilt:
+            new_edges = edges
+            self.edges = np.array(sorted(edges), dtype=np.intp).reshape(-1, 2)
+        else:
+            new_edges = edges - self.edge_set
+            if new_edges:
+                self.edges = np.vstack([self.edges, np.array(sorted(new_edges), dtype=np.intp)])
+        self.edge_set = edges
+        start, end = self.xy[self.edges[:, 0]], self.xy[self.edges[:, 1]]
+        self.edge_lines = np.hstack([start, end])
+        # Bounding boxes of the edges, for culling.
+        self.edge_low, self.edge_high = np.minimum(start, end), np.maximum(start, end)
+        self.update_bounds()
+
+        if moved or rebuilt or not old_count:
+            dirty = self.bounds
+        else:
+            # Only the area around what was appended needs repainting.
+            touched = list(range(old_count, len(self.ids))) + [i for edge in new_edges for i in edge]
+            dirty = self.rect_of(touched)
+        if not dirty.isEmpty():
+            self.edge_layer.update(dirty)
+            self.node_layer.update(dirty)
+        self.hover(None)
+
+    def rect_of(self, indices):
+        if not indices:
+            return QRectF()
+        xy = self.xy[np.array(indices)]
+        (x0, y0), (x1, y1) = xy.min(axis=0), xy.max(axis=0)
+        margin = 2 * TARGET_NODE_SIZE / max(self.transform().m11(), 1e-6) + 200
+        return QRectF(x0 - margin, y0 - margin, x1 - x0 + 2 * margin, y1 - y0 + 2 * margin)
+
+    def update_bounds(self):
+        self.edge_layer.prepareGeometryChange()
+        self.node_layer.prepareGeometryChange()
+        if len(self.xy):
+            (x0, y0), (x1, y1) = self.xy.min(axis=0), self.xy.max(axis=0)
+            margin = 0.05 * max(x1 - x0, y1 - y0, SCENE_SCALE)
+            self.bounds = QRectF(x0 - margin, y0 - margin, x1 - x0 + 2 * margin, y1 - y0 + 2 * margin)
+        else:
+            self.bounds = QRectF()
+        self.scene().setSceneRect(self.bounds)
+
+    def fit(self):
+        if not self.bounds.isEmpty():
+            self.fitInView(self.bounds, Qt.KeepAspectRatio)
+
+    def node_at(self, view_pos):
+        if not len(self.xy):
+            return None
+        point = self.mapToScene(view_pos)
+        radius = HOVER_RADIUS / max(self.transform().m11(), 1e-6)
+        return self.grid.nearest(point.x(), point.y(), radius, self.xy)
+
+    def hover(self, index):
+        self.hovered = index
+        if index is None:
+            self.highlight.setVisible(False)
+            QToolTip.hideText()
+            return
+        self.highlight.setPos(*self.xy[index])
+        self.highlight.setVisible(True)
+
+    def tooltip(self, index):
+        extra = self.describe(self.ids[index]) if self.describe else None
+        return f"{self.labels[index]}\n{extra}" if extra else self.labels[index]
+
+    def wheelEvent(self, event):
+        factor = ZOOM_STEP if event.angleDelta().y() > 0 else 1 / ZOOM_STEP
+        self.scale(factor, factor)
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        if event.buttons():
+            return
+        index = self.node_at(event.pos())
+        if index != self.hovered:
+            self.hover(index)
+            if index is not None:
+                QToolTip.showText(event.globalPos(), self.tooltip(index), self)
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        if event.button() == Qt.LeftButton:
+            index = self.node_at(event.pos())
+            if index is not None:
+                self.node_clicked.emit(self.ids[index])
@@ -1,51 +1,224 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import networkx as nx
-import matplotlib.pyplot as plt
+import threading
+
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton
+
+from core.graph_analytics import analyze
+from core.investigation_graph import TARGET, compute_layout, seed_positions
+
+NODE_COLORS = {
+    'target': '#ff4757',  # Red
+    'email': '#2ed573',  # Green
+    'registrar': '#1e90ff',  # Blue
+    'name_server': '#ffa502',  # Orange
+    'registrant': '#706fd3',  # Purple
+    'username': '#eccc68',  # Yellow
+    'profile_url': '#70a1ff',  # Light blue
+    'netblock': '#ff6b81',  # Pink
+}
+DEFAULT_NODE_COLOR = '#7f8fa6'  # Grey
+
 
 class GraphView(QWidget):
-    """A widget to display a NetworkX graph using Matplotlib."""
+    """
+    A widget to display the investigation graph.
+
+    The GraphCanvas (and NumPy with it) is created the first time a graph
+    is actually drawn; changes made while the widget is hidden are drawn
+    when it is next shown. Each graph version is copied out of the
+    InvestigationGraph on a background thread, and that copy is what is
+    drawn and handed to the layout and analytics threads. Layouts are
+    computed on a background thread, warm-started from the previous layout,
+    and cached per graph version by the InvestigationGraph; until a new
+    layout is ready the graph is drawn at seeded positions (new nodes next
+    to their neighbours). Graph
+    analytics (centralities, components, communities) are computed the
+    same way and shown in the node tooltips, with the pivots in the status.
+    """
+    # Emitted from the snapshot thread with (graph version, graph copy, seeded positions).
+    graph_ready = pyqtSignal(int, object, object)
+    # Emitted from the layout thread with (graph version, positions).
+    layout_ready = pyqtSignal(int, object)
+    # Emitted from the analytics thread with (graph version, analyze() result).
+    analytics_ready = pyqtSignal(int, object)
+    # Emitted with the target name when a target node is clicked.
+    target_activated = pyqtSignal(str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.figure = Figure(figsize=(5, 4), dpi=100)
-        self.canvas = FigureCanvas(self.figure)
+        self.canvas = None
+        self.investigation = None
+        self.graph = None  # copy of the investigation graph at graph_version
+        self.graph_version = None
+        self.snapshot_running = False
+        self.drawn = None  # (version, laid out) of what is on screen
+        self.layout_version = None  # version the layout thread is working on
+        self.analytics = None  # analytics of the version on screen
+        self.analytics_version = None  # version the analytics thread is working on
+        self.needs_draw = False
+        self.graph_ready.connect(self.apply_graph)
+        self.layout_ready.connect(self.apply_layout)
+        self.analytics_ready.connect(self.apply_analytics)
+
+        self.status_label = QLabel()
+        self.clear_button = QPushButton("Clear Graph")
+        self.clear_button.clicked.connect(self.clear_graph)
+        bar = QHBoxLayout()
+        bar.addWidget(self.status_label, 1)
+        bar.addWidget(self.clear_button)
         layout = QVBoxLayout()
-        layout.addWidget(self.canvas)
+        layout.addLayout(bar)
         self.setLayout(layout)
 
-    def update_graph(self, G):
-        """Clears the current figure and draws the new graph G."""
-        self.figure.clear()
-        if not G or G.number_of_nodes() == 0:
-            ax = self.figure.add_subplot(111)
-            ax.text(0.5, 0.5, "No data to visualize.", ha='center', va='center')
-            self.canvas.draw()
+    def ensure_canvas(self):
+        if self.canvas is None:
+            from .graph_canvas import GraphCanvas
+            self.canvas = GraphCanvas(NODE_COLORS, DEFAULT_NODE_COLOR)
+            self.canvas.node_clicked.connect(self.node_clicked)
+            self.canvas.describe = self.describe_node
+            self.layout().addWidget(self.canvas)
+
+    def node_clicked(self, node):
+        kind, _, name = node.partition(":")
+        if kind == TARGET:
+            self.target_activated.emit(name)
+
+    def show_investigation(self, investigation):
+        """Shows the investigation graph, drawing it now if visible or else when next shown."""
+        if investigation is not self.investigation:
+            self.graph = self.graph_version = None
+        self.investigation = investigation
+        self.refresh()
+
+    def refresh(self):
+        """Redraws if the investigation changed since it was last drawn."""
+        if self.investigation is None:
             return
+        self.needs_draw = True
+        if self.isVisible():
+            self.draw_graph()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.needs_draw:
+            self.draw_graph()
+
+    def clear_graph(self):
+        if self.investigation is not None:
+            self.investigation.clear()
+            self.refresh()
+
+    def draw_graph(self):
+        self.needs_draw = False
+        if self.investigation.version == self.graph_version:
+            self.show_graph()
+        elif not self.snapshot_running:
+            # apply_graph takes the next snapshot if the graph changes meanwhile.
+            self.snapshot_running = True
+            investigation = self.investigation
+
+            def run():
+                version, G = investigation.snapshot()
+                self.graph_ready.emit(version, G, seed_positions(G, investigation.latest_layout()))
+            threading.Thread(target=run, daemon=True).start()
+
+    def apply_graph(self, version, G, seeds):
+        self.snapshot_running = False
+        self.graph, self.graph_version = G, version
+        self.show_graph(seeds)
+        if self.investigation.version != version:
+            self.refresh()
+
+    def show_graph(self, seeds=None):
+        """Draws the current snapshot, at its cached layout or else at seeds while one is computed."""
+        version, G = self.graph_version, self.graph
+        pos = self.investigation.cached_layout(version) if G.number_of_nodes() else {}
+        laid_out = pos is not None
+        if self.drawn != (version, laid_out):
+            if not laid_out:
+                pos = seeds if seeds is not None else seed_positions(G, self.investigation.latest_layout())
+                self.start_layout()
+            self.render(G, pos)
+            self.drawn = (version, laid_out)
+        self.analytics = self.investigation.cached_analytics(version)
+        if self.analytics is None and G.number_of_nodes():
+            self.start_analytics()
+        self.update_status(G, laid_out)
+
+    def update_status(self, G, laid_out):
+        if G.number_of_nodes() == 0:
+            self.status_label.setText("No data to visualize.")
+            return
+        targets = sum(1 for _, kind in G.nodes(data='type') if kind == TARGET)
+        status = f"{targets} targets · {G.number_of_nodes()} nodes · {G.number_of_edges()} edges"
+        if self.analytics:
+            status += f" · {self.analytics['components']} components · {self.analytics['communities']} communities"
+            pivots = [str(G.nodes[node].get('label', node)) for node in self.analytics['pivots'] if node in G]
+            if pivots:
+                status += f"\nPivots: {', '.join(pivots)}"
+        if not laid_out:
+            status += " · laying out…"
+        elif self.analytics is None:
+            status += " · analyzing…"
+        self.status_label.setText(status)
+
+    def describe_node(self, node):
+        """Tooltip text with a node's analytics, once computed."""
+        metrics = (self.analytics or {}).get('metrics', {}).get(node)
+        if metrics is None:
+            return None
+        return (f"Degree: {metrics['degree']:.3f} · Betweenness: {metrics['betweenness']:.3f}"
+                f" · PageRank: {metrics['pagerank']:.4f}\n"
+                f"Component #{metrics['component'] + 1} · Community #{metrics['community'] + 1}")
+
+    def start_layout(self):
+        """Computes the layout of the current snapshot on a background thread."""
+        if self.layout_version is not None:
+            return  # apply_layout redraws, which starts the next run if the graph changed meanwhile
+        version, G = self.graph_version, self.graph
+        previous = self.investigation.latest_layout()
+        self.layout_version = version
+
+        def run():
+            try:
+                pos = compute_layout(G, previous)
+            except Exception as e:
+                print(f"Error computing graph layout: {e}")
+                pos = None
+            self.layout_ready.emit(version, pos)
+        threading.Thread(target=run, daemon=True).start()
+
+    def apply_layout(self, version, pos):
+        self.layout_version = None
+        if pos is not None:
+            self.investigation.store_layout(version, pos)
+        self.refresh()
+
+    def start_analytics(self):
+        """Computes the analytics of the current snapshot on a background thread."""
+        if self.analytics_version is not None:
+            return  # apply_analytics triggers the next run if the graph changed meanwhile
+        version, G = self.graph_version, self.graph
+        self.analytics_version = version
+
+        def run():
+            try:
+                analytics = analyze(G)
+            except Exception as e:
+                print(f"Error computing graph analytics: {e}")
+                analytics = {}  # cached too, so a failing graph is not retried
+            self.analytics_ready.emit(version, analytics)
+        threading.Thread(target=run, daemon=True).start()
+
+    def apply_analytics(self, version, analytics):
+        self.analytics_version = None
+        self.investigation.store_analytics(version, analytics)
+        self.refresh()
 
-        ax = self.figure.add_subplot(111)
-        pos = nx.spring_layout(G, k=0.5, iterations=50)  # Position nodes
-
-        # Define colors for different node types
-        node_colors = []
-        for node in G.nodes():
-            node_type = G.nodes[node].get('type')
-            if node_type == 'target':
-                node_colors.append('#ff4757')  # Red
-            elif node_type == 'email':
-                node_colors.append('#2ed573')  # Green
-            elif node_type == 'registrar':
-                node_colors.append('#1e90ff')  # Blue
-            elif node_type == 'name_server':
-                node_colors.append('#ffa502')  # Orange
-            elif node_type == 'registrant':
-                node_colors.append('#706fd3')  # Purple
-            else:
-                node_colors.append('#7f8fa6')  # Grey
-
-        nx.draw(G, pos, ax=ax, with_labels=True, node_color=node_colors,
-                node_size=2000, font_size=8, font_color='white',
-                edge_color='gray')
-
-        ax.set_title("Target Correlations")
-        self.canvas.draw()
+    def render(self, G, pos):
+        """Shows G at pos, adding to what is already drawn where possible."""
+        self.ensure_canvas()
+        was_empty = not self.canvas.ids
+        self.canvas.set_graph(G, pos)
+        if was_empty:
+            self.canvas.fit()
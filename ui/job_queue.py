@@ -0,0 +1,91 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QLabel, QSpinBox
+from PyQt5.QtCore import Qt, QTimer
+
+# How often the table picks up progress from running jobs.
+REFRESH_INTERVAL_MS = 250
+COLUMNS = ["#", "Type", "Target", "Priority", "Status", "Progress", "Detail"]
+
+
+class JobQueuePanel(QWidget):
+    """
+    Table of queued, running and finished scan jobs.
+
+    Progress is polled from the jobs on a timer rather than signalled per
+    event, so twenty busy scans cost one table refresh per interval.
+    """
+    def __init__(self, scheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.rows_by_id = {}
+        layout = QVBoxLayout(self)
+
+        # --- Controls ---
+        controls = QHBoxLayout()
+        self.cancel_button = QPushButton("Cancel Selected")
+        self.cancel_button.clicked.connect(self.cancel_selected)
+        self.clear_button = QPushButton("Clear Finished")
+        self.clear_button.clicked.connect(self.clear_finished)
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 64)
+        self.workers_spin.setValue(scheduler.max_workers)
+        self.workers_spin.valueChanged.connect(scheduler.set_max_workers)
+        controls.addWidget(self.cancel_button)
+        controls.addWidget(self.clear_button)
+        controls.addStretch()
+        controls.addWidget(QLabel("Parallel scans:"))
+        controls.addWidget(self.workers_spin)
+        layout.addLayout(controls)
+
+        # --- Job Table ---
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+
+    def refresh(self):
+        for job in list(self.scheduler.jobs.values()):
+            row = self.rows_by_id.get(job.job_id)
+            if row is None:
+                row = self.table.rowCount()
+                self.table.insertRow(row)
+                self.rows_by_id[job.job_id] = row
+                for column, value in enumerate((job.job_id, job.scan_type, job.label, job.priority)):
+                    self.table.setItem(row, column, QTableWidgetItem(str(value)))
+                self.table.item(row, 0).setData(Qt.UserRole, job.job_id)
+            self.set_cell(row, 4, job.status)
+            self.set_cell(row, 5, self.progress_text(job))
+            self.set_cell(row, 6, job.error or job.detail)
+
+    def set_cell(self, row, column, text):
+        item = self.table.item(row, column)
+        if item is None:
+            self.table.setItem(row, column, QTableWidgetItem(text))
+        elif item.text() != text:
+            item.setText(text)
+
+    @staticmethod
+    def progress_text(job):
+        if not job.total:
+            return ""
+        return f"{100 * job.done // job.total}% ({job.done}/{job.total})"
+
+    def cancel_selected(self):
+        rows = {index.row() for index in self.table.selectionModel().selectedRows()}
+        for row in rows:
+            self.scheduler.cancel(self.table.item(row, 0).data(Qt.UserRole))
+        self.refresh()
+
+    def clear_finished(self):
+        self.scheduler.clear_finished()
+        self.table.setRowCount(0)
+        self.rows_by_id = {}
+        self.refresh()
@@ -0,0 +1,212 @@
+import threading
+from collections import OrderedDict
+from html import escape
+
+from PyQt5.QtCore import QUrl, pyqtSignal
+from PyQt5.QtGui import QDesktopServices
+from PyQt5.QtWidgets import QTextBrowser
+
+from core.identity import get_identity
+
+# Rows (table rows or list items) shown per page of a section.
+PAGE_ROWS = 100
+# Rendered sections kept in memory, keyed by target, scan type and data version.
+FRAGMENT_CACHE_SIZE = 128
+# Distance from the bottom, in pixels, at which scrolling loads the next page.
+SCROLL_MARGIN = 150
+
+TABLE_STYLE = ("table { width: 100%; border-collapse: collapse; font-family: sans-serif; } "
+               "th, td { padding: 8px; text-align: left; border-bottom: 1px solid #444; } "
+               "th { background-color: #222; color: #eee; } tr:nth-child(even) {background-color: #333;}")
+
+
+def key_label(key):
+    return escape(str(key).replace('_', ' ').title())
+
+
+def value_html(value):
+    """A value as HTML: lists one item per line, nested dicts as "key: value" lines."""
+    if isinstance(value, dict):
+        return "<br>".join(f"<i>{key_label(k)}:</i> {value_html(v)}" for k, v in value.items())
+    if isinstance(value, list):
+        return "<br>".join(value_html(v) for v in value)
+    return escape(str(value))
+
+
+def table_row(label, value):
+    return f"<tr><td style='width: 25%;'><b>{label}</b></td><td>{value}</td></tr>"
+
+
+def table_rows(data):
+    """
+    One <tr> per key of data; list values of dicts (e.g. WHOIS "nets")
+    get one row per element so long arrays can be paged.
+    """
+    rows = []
+    for key, value in data.items():
+        label = key_label(key)
+        if isinstance(value, list) and any(isinstance(v, dict) for v in value):
+            rows.extend(table_row(f"{label} [{i + 1}]", value_html(v)) for i, v in enumerate(value))
+        else:
+            rows.append(table_row(label, value_html(value)))
+    return rows
+
+
+def table_html(rows):
+    return f"<table>{''.join(rows)}</table>" if rows else "<p>No data found.</p>"
+
+
+def account_item(entry):
+    url = (entry.get("url") or entry.get("profile_url")) if isinstance(entry, dict) else entry
+    url = escape(str(url))
+    return f"<li><a href='{url}'>{url}</a></li>"
+
+
+def build_section(scan_type, data):
+    """
+    (scan type, opening tag, rows, closing tag, message if empty) for one
+    scan result; built off the GUI thread and cached.
+    """
+    if scan_type == "Username":
+        rows = [account_item(entry) for entry in data] if isinstance(data, list) else []
+        return scan_type, "<ul>", rows, "</ul>", "No accounts found."
+    if isinstance(data, dict):
+        return scan_type, "<table>", table_rows(data), "</table>", "No data found."
+    if isinstance(data, list):
+        rows = [table_row(str(i + 1), value_html(v)) for i, v in enumerate(data)]
+        return scan_type, "<table>", rows, "</table>", "No data found."
+    rows = [] if data is None else [table_row("", value_html(data))]
+    return scan_type, "<table>", rows, "</table>", "No data found."
+
+
+_fragments = OrderedDict()  # {(target, scan type, data version): section}
+_fragments_lock = threading.Lock()
+
+
+def target_sections(target_name):
+    """The sections of a target's raw data, rebuilt only for scans whose data changed."""
+    identity = get_identity(target_name)
+    sections = []
+    for scan_type in identity.scan_types():
+        key = (target_name, scan_type, identity.data_version(scan_type))
+        with _fragments_lock:
+            section = _fragments.get(key)
+            if section is not None:
+                _fragments.move_to_end(key)
+        if section is None:
+            section = build_section(scan_type, identity.get_data(scan_type))
+            with _fragments_lock:
+                _fragments[key] = section
+                while len(_fragments) > FRAGMENT_CACHE_SIZE:
+                    _fragments.popitem(last=False)
+        sections.append(section)
+    return sections
+
+
+class RawDataView(QTextBrowser):
+    """
+    Raw scan results of one target, rendered lazily.
+
+    Results are loaded and turned into HTML fragments on a background
+    thread (cached per data version), so opening a target never blocks
+    the GUI. Each scan type is a section, collapsed by default; an open
+    section shows PAGE_ROWS rows at a time, and scrolling to the bottom or
+    "Show more" adds the next page. Only the rows shown are in the document.
+    """
+    # Emitted from the loading thread with (request number, target, sections).
+    sections_ready = pyqtSignal(int, str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setOpenLinks(False)
+        self.anchorClicked.connect(self.link_clicked)
+        self.document().setDefaultStyleSheet(TABLE_STYLE)
+        self.verticalScrollBar().valueChanged.connect(self.scrolled)
+        self.sections_ready.connect(self.apply_sections)
+        self.request = 0
+        self.target_name = None
+        self.sections = []
+        self.shown = {}  # {scan type: rows shown} for open sections
+        self.rendering = False
+
+    def show_target(self, target_name):
+        """Shows a target's raw data; open sections stay open when the same target is shown again."""
+        self.request += 1
+        request = self.request
+        if target_name != self.target_name:
+            self.target_name = target_name
+            self.sections = []
+            self.shown = {}
+            self.setHtml(f"<h1>{escape(target_name)}</h1><p>Loading…</p>")
+
+        def run():
+            try:
+                sections = target_sections(target_name)
+            except Exception as e:
+                print(f"Error loading raw data for {target_name}: {e}")
+                sections = []
+            self.sections_ready.emit(request, target_name, sections)
+        threading.Thread(target=run, daemon=True).start()
+
+    def apply_sections(self, request, target_name, sections):
+        if request != self.request:
+            return  # another target was opened meanwhile
+        self.sections = sections
+        scan_types = {section[0] for section in sections}
+        self.shown = {scan_type: shown for scan_type, shown in self.shown.items() if scan_type in scan_types}
+        self.render()
+
+    def render(self):
+        parts = [f"<h1>{escape(self.target_name)}</h1>"]
+        if not self.sections:
+            parts.append("<p>No data found.</p>")
+        for index, (scan_type, opening, rows, closing, empty) in enumerate(self.sections):
+            shown = self.shown.get(scan_type)
+            arrow = "&#9662;" if shown is not None else "&#9656;"
+            parts.append(f"<h2><a href='section:{index}'>{arrow} {escape(scan_type)}</a>"
+                         f" <small>({len(rows)})</small></h2>")
+            if shown is None:
+                continue
+            if not rows:
+                parts.append(f"<p>{empty}</p>")
+                continue
+            parts.append(opening)
+            parts.extend(rows[:shown])
+            parts.append(closing)
+            if shown < len(rows):
+                parts.append(f"<p><a href='more:{index}'>Show more ({len(rows) - shown} more)</a></p>")
+
+        scrollbar = self.verticalScrollBar()
+        position = scrollbar.value()
+        self.rendering = True
+        self.setHtml("".join(parts))
+        scrollbar.setValue(position)
+        self.rendering = False
+
+    def link_clicked(self, url):
+        scheme, index = url.scheme(), url.path()
+        if scheme == "section":
+            scan_type = self.sections[int(index)][0]
+            if scan_type in self.shown:
+                del self.shown[scan_type]
+            else:
+                self.shown[scan_type] = PAGE_ROWS
+            self.render()
+        elif scheme == "more":
+            self.next_page(int(index))
+        else:
+            QDesktopServices.openUrl(QUrl(url))
+
+    def next_page(self, index):
+        scan_type = self.sections[index][0]
+        self.shown[scan_type] = self.shown.get(scan_type, 0) + PAGE_ROWS
+        self.render()
+
+    def scrolled(self, value):
+        # Scrolling to the bottom pages in the last open section, if it has more rows.
+        scrollbar = self.verticalScrollBar()
+        if self.rendering or not self.shown or value < scrollbar.maximum() - SCROLL_MARGIN:
+            return
+        index = max(i for i, section in enumerate(self.sections) if section[0] in self.shown)
+        if self.shown[self.sections[index][0]] < len(self.sections[index][2]):
+            self.next_page(index)
@@ -0,0 +1,167 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel, QSize, QRectF
+from PyQt5.QtGui import QColor, QFont, QPen, QPainter
+
+EntryRole = Qt.UserRole + 1
+PendingRole = Qt.UserRole + 2
+OrderRole = Qt.UserRole + 3
+SiteRole = Qt.UserRole + 4
+UrlRole = Qt.UserRole + 5
+SearchRole = Qt.UserRole + 6
+
+CARD_HEIGHT = 84
+CARD_MARGIN = 4
+DETAIL_KEYS = ("bio", "snippet", "location")
+
+
+class ProfileListModel(QAbstractListModel):
+    """
+    Flat list of found profiles for the live result view.
+
+    Rows are only ever appended or updated in place, so a new hit costs one
+    row insertion rather than a rebuild of everything already shown.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = []
+        self.pending = []
+        self.rows_by_url = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        if role in (Qt.DisplayRole, SiteRole):
+            return entry.get("site", "")
+        if role == EntryRole:
+            return entry
+        if role == PendingRole:
+            return self.pending[index.row()]
+        if role == OrderRole:
+            return index.row()
+        if role in (UrlRole, Qt.ToolTipRole):
+            return entry.get("url", "")
+        if role == SearchRole:
+            return " ".join(str(entry.get(key, "")) for key in ("site", "name", "url") + DETAIL_KEYS)
+        return None
+
+    def append(self, entry, pending=False):
+        """Adds a row; returns False if a row for the same URL already exists."""
+        url = entry.get("url")
+        if url and url in self.rows_by_url:
+            return False
+        row = len(self.entries)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.entries.append(entry)
+        self.pending.append(pending)
+        if url:
+            self.rows_by_url[url] = row
+        self.endInsertRows()
+        return True
+
+    def extend(self, entries, pending=False):
+        """Adds several rows in one insertion; returns the entries actually added."""
+        added = []
+        seen = set(self.rows_by_url)
+        for entry in entries:
+            url = entry.get("url")
+            if url and url in seen:
+                continue
+            seen.add(url)
+            added.append(entry)
+        if not added:
+            return added
+        first = len(self.entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+        for row, entry in enumerate(added, first):
+            self.entries.append(entry)
+            self.pending.append(pending)
+            if entry.get("url"):
+                self.rows_by_url[entry["url"]] = row
+        self.endInsertRows()
+        return added
+
+    def entry_for_url(self, url):
+        row = self.rows_by_url.get(url)
+        return None if row is None else self.entries[row]
+
+    def mark_updated(self, url):
+        """Signals that the entry for url was filled in (no longer pending)."""
+        row = self.rows_by_url.get(url)
+        if row is None:
+            return
+        self.pending[row] = False
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def clear(self):
+        self.beginResetModel()
+        self.entries = []
+        self.pending = []
+        self.rows_by_url = {}
+        self.endResetModel()
+
+
+class ProfileFilterProxy(QSortFilterProxyModel):
+    """Sorts and filters the profile list without touching the source rows."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterRole(SearchRole)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setSortCaseSensitivity(Qt.CaseInsensitive)
+        self.setSortRole(OrderRole)
+        self.setDynamicSortFilter(True)
+
+
+class ProfileCardDelegate(QStyledItemDelegate):
+    """Paints a profile row as a card; only rows in the viewport are ever painted."""
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), CARD_HEIGHT)
+
+    def paint(self, painter, option, index):
+        entry = index.data(EntryRole) or {}
+        pending = index.data(PendingRole)
+        rect = QRectF(option.rect.adjusted(CARD_MARGIN, CARD_MARGIN, -CARD_MARGIN, -CARD_MARGIN))
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        selected = option.state & QStyle.State_Selected
+        painter.setPen(QPen(QColor("#1e90ff" if selected else "#444")))
+        painter.setBrush(QColor("#333" if selected else "#2b2b2b"))
+        painter.drawRoundedRect(rect, 6, 6)
+
+        text_rect = rect.adjusted(10, 6, -10, -6)
+        line_height = text_rect.height() / 3
+        width = int(text_rect.width())
+
+        title = entry.get("site", "")
+        if entry.get("name"):
+            title += f" — {entry['name']}"
+        title_font = QFont(option.font)
+        title_font.setBold(True)
+        title_font.setPointSizeF(option.font.pointSizeF() + 2)
+        painter.setFont(title_font)
+        painter.setPen(QColor("#eee"))
+        self._draw_line(painter, text_rect, 0, line_height, title, width)
+
+        painter.setFont(option.font)
+        painter.setPen(QColor("#4da3ff"))
+        self._draw_line(painter, text_rect, 1, line_height, entry.get("url", ""), width)
+
+        details = [str(entry[key]) for key in DETAIL_KEYS if entry.get(key)]
+        if entry.get("followers") or entry.get("following"):
+            details.append(f"Followers: {entry.get('followers', '')} · Following: {entry.get('following', '')}")
+        if pending:
+            details.append("Loading profile details…")
+        painter.setPen(QColor("#888" if pending and len(details) == 1 else "#ccc"))
+        self._draw_line(painter, text_rect, 2, line_height, " · ".join(details), width)
+        painter.restore()
+
+    @staticmethod
+    def _draw_line(painter, text_rect, line, line_height, text, width):
+        elided = painter.fontMetrics().elidedText(text, Qt.ElideRight, width)
+        line_rect = QRectF(text_rect.left(), text_rect.top() + line * line_height, text_rect.width(), line_height)
+        painter.drawText(line_rect, Qt.AlignLeft | Qt.AlignVCenter, elided)
@@ -0,0 +1,69 @@
+import threading
+
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+# How often buffered scan events are handed to the GUI thread.
+FRAME_INTERVAL_MS = 50
+# Hits buffered before a frame is flushed without waiting for the timer.
+FRAME_MAX_HITS = 100
+
+
+class FrameCoalescer(QObject):
+    """
+    Gathers progress ticks and hits from scan threads into frames.
+
+    Scan threads call add_progress/add_hit directly (no queued signal per
+    event); a timer on the GUI thread drains the buffer every interval_ms
+    and emits one frame(done, total, hits) if anything changed. A burst of
+    max_hits hits wakes the GUI thread early so frames stay bounded.
+    """
+    frame = pyqtSignal(int, int, list)  # done, total, [(site, url, status), ...]
+    _wake = pyqtSignal()
+
+    def __init__(self, interval_ms=FRAME_INTERVAL_MS, max_hits=FRAME_MAX_HITS, parent=None):
+        super().__init__(parent)
+        self.max_hits = max_hits
+        self._lock = threading.Lock()
+        self._done = 0
+        self._total = 0
+        self._hits = []
+        self._dirty = False
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._wake.connect(self.flush, Qt.QueuedConnection)
+
+    def start(self):
+        with self._lock:
+            self._done = self._total = 0
+            self._hits = []
+            self._dirty = False
+        self._timer.start()
+
+    def stop(self):
+        """Delivers whatever is still buffered and stops the timer."""
+        self._timer.stop()
+        self.flush()
+
+    def add_progress(self, done, total):
+        with self._lock:
+            self._done = done
+            self._total = total
+            self._dirty = True
+
+    def add_hit(self, site, url, status):
+        with self._lock:
+            self._hits.append((site, url, status))
+            self._dirty = True
+            wake = len(self._hits) == self.max_hits
+        if wake:
+            self._wake.emit()
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            done, total, hits = self._done, self._total, self._hits
+            self._hits = []
+            self._dirty = False
+        self.frame.emit(done, total, hits)
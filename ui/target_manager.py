@@ -1,26 +1,54 @@
 import os
 import json
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QTextBrowser, QPushButton, QTabWidget, QSplitter, QTextEdit, QInputDialog, QMessageBox
-from PyQt5.QtCore import Qt
+from html import escape
+import threading
+import time
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QTextBrowser, QPushButton, QTabWidget, QSplitter, QTextEdit, QInputDialog, QMessageBox, QLineEdit, QComboBox
+from PyQt5.QtCore import Qt, pyqtSignal, QFileSystemWatcher, QTimer
 
-from core.identity import TargetIdentity
-from core.correlation import find_correlations
-from core.graph import create_graph_from_identity
+from core import storage
+from core.storage import scan_label
+from core.catalog import get_catalog, PROFILE
+from core.identity import get_identity
+from core.correlation import find_correlations, find_shared_artifacts, find_fuzzy_correlations
+from core.investigation_graph import get_investigation
 from .graph_view import GraphView
-from core.json_utils import safe_json_dump
+from .raw_data_view import RawDataView, TABLE_STYLE, key_label, table_html, table_rows
+from core.json_utils import dump
 
 class TargetManager(QWidget):
+    # Emitted with the parsed multi-target entries when "Send to Scan" is pressed.
+    scan_requested = pyqtSignal(list)
+    # Emitted from the background thread once the catalog has been synced.
+    catalog_synced = pyqtSignal()
+    # Emitted from the background thread with the names of targets whose catalog entries changed.
+    targets_changed = pyqtSignal(list)
+    # Emitted (from any thread) with the target name when a scan result is saved to the result store.
+    results_saved = pyqtSignal(str)
+    # Emitted from the lookup thread with (request number, correlations HTML).
+    correlations_ready = pyqtSignal(int, str)
+
     def __init__(self):
         super().__init__()
         self.layout = QHBoxLayout(self)
+        self.catalog = get_catalog()
+        self.watched_target = None
 
         # --- Target List & Management ---
         left_panel_layout = QVBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search targets")
+        self.search_input.textChanged.connect(self.populate_target_list)
+        self.scan_filter = QComboBox()
+        self.scan_filter.currentIndexChanged.connect(self.populate_target_list)
         self.target_list = QListWidget()
+        self.target_list.setUniformItemSizes(True)
         self.target_list.itemClicked.connect(self.display_target_data)
         self.refresh_button = QPushButton("Refresh Targets")
-        self.refresh_button.clicked.connect(self.populate_target_list)
+        self.refresh_button.clicked.connect(self.sync_catalog)
         left_panel_layout.addWidget(self.refresh_button)
+        left_panel_layout.addWidget(self.search_input)
+        left_panel_layout.addWidget(self.scan_filter)
         left_panel_layout.addWidget(self.target_list)
 
         # --- Multi-Target Input ---
@@ -37,7 +65,7 @@ class TargetManager(QWidget):
         self.delete_btn = QPushButton("Delete Target")
         self.delete_btn.clicked.connect(self.delete_target)
         self.send_btn = QPushButton("Send to Scan")
-        # Placeholder: connect to signal for future integration
+        self.send_btn.clicked.connect(self.send_to_scan)
         btn_layout.addWidget(self.save_btn)
         btn_layout.addWidget(self.load_btn)
         btn_layout.addWidget(self.delete_btn)
@@ -46,9 +74,13 @@ class TargetManager(QWidget):
 
         # --- Data Display Tabs ---
         self.tabs = QTabWidget()
-        self.raw_data_view = QTextBrowser()
+        self.raw_data_view = RawDataView()
         self.correlations_view = QTextBrowser()
+        self.correlations_view.document().setDefaultStyleSheet(TABLE_STYLE)
+        self.correlations_request = 0
+        self.correlations_ready.connect(self.show_correlations)
         self.graph_view = GraphView()
+        self.graph_view.target_activated.connect(self.open_target)
 
         self.tabs.addTab(self.raw_data_view, "Raw Data")
         self.tabs.addTab(self.correlations_view, "Correlations")
@@ -57,28 +89,164 @@ class TargetManager(QWidget):
         self.layout.addLayout(left_panel_layout, 1)
         self.layout.addWidget(self.tabs, 3)
 
+        # --- Catalog Updates ---
+        # The list comes from the catalog index. Saves in this process update
+        # it through the storage listener; the watcher picks up other changes
+        # (top-level data/ for new/removed targets, plus the open target).
+        self.watcher = QFileSystemWatcher(self)
+        if os.path.isdir(self.catalog.data_dir):
+            self.watcher.addPath(self.catalog.data_dir)
+        self.watcher.directoryChanged.connect(self.data_dir_changed)
+        self.changed_dirs = set()
+        self.changed_targets = set()
+        self.change_timer = QTimer(self)
+        self.change_timer.setSingleShot(True)
+        self.change_timer.setInterval(200)
+        self.change_timer.timeout.connect(self.apply_dir_changes)
+        self.catalog_synced.connect(self.populate_target_list)
+        self.targets_changed.connect(self.targets_reindexed)
+        self.results_saved.connect(self.target_saved)
+        storage.add_save_listener(lambda target, scan_type, scan_id: self.results_saved.emit(target))
+
         self.populate_target_list()
+        self.sync_catalog()
+
+    def sync_catalog(self):
+        """Reconciles the catalog with data/ in the background, then refreshes the list."""
+        def run():
+            try:
+                self.catalog.sync()
+            except Exception as e:
+                print(f"Error syncing target catalog: {e}")
+            self.catalog_synced.emit()
+        threading.Thread(target=run, daemon=True).start()
+
+    def data_dir_changed(self, path):
+        # Changes arrive in bursts while scans save; apply them together.
+        self.changed_dirs.add(path)
+        self.change_timer.start()
+
+    def target_saved(self, target_name):
+        # The catalog indexed the save already (see get_catalog); only the list needs updating.
+        self.changed_targets.add(target_name)
+        self.change_timer.start()
+
+    def apply_dir_changes(self):
+        """Re-indexes the changed directories in the background, then updates their rows."""
+        changed, self.changed_dirs = self.changed_dirs, set()
+        saved, self.changed_targets = self.changed_targets, set()
+
+        def run():
+            names = set(saved)
+            try:
+                for path in changed:
+                    if os.path.normpath(path) == os.path.normpath(self.catalog.data_dir):
+                        names.update(self.catalog.sync(full=False))
+                    else:
+                        name = os.path.basename(path)
+                        self.catalog.refresh_target(name)
+                        names.add(name)
+            except Exception as e:
+                print(f"Error updating target catalog: {e}")
+            self.targets_changed.emit(sorted(names))
+        threading.Thread(target=run, daemon=True).start()
+
+    def targets_reindexed(self, names):
+        self.update_targets(names)
+        # Saved scans may have changed targets in the investigation graph.
+        self.graph_view.refresh()
+
+    def update_targets(self, names):
+        """Inserts, updates or removes the list rows of the named targets."""
+        if not names:
+            return
+        self.update_scan_filter()
+        rows = {row["name"]: row for row in self.catalog.list_targets(
+            search=self.search_input.text().strip() or None, scan=self.scan_filter.currentData(), names=names)}
+        for name in names:
+            self.update_target_item(name, rows.get(name))
+
+    def update_target_item(self, name, row):
+        # row is the target's catalog entry, or None if it was removed or is filtered out.
+        items = self.target_list.findItems(name, Qt.MatchExactly)
+        if row is None:
+            for item in items:
+                self.target_list.takeItem(self.target_list.row(item))
+            return
+        if items:
+            items[0].setToolTip(self.target_summary(row))
+            return
+        # The list is sorted by name, like list_targets().
+        low, high = 0, self.target_list.count()
+        while low < high:
+            middle = (low + high) // 2
+            if self.target_list.item(middle).text() < name:
+                low = middle + 1
+            else:
+                high = middle
+        item = QListWidgetItem(name)
+        item.setToolTip(self.target_summary(row))
+        self.target_list.insertItem(low, item)
 
     def populate_target_list(self):
+        self.update_scan_filter()
+        current = self.target_list.currentItem()
+        current_name = current.text() if current else None
+        rows = self.catalog.list_targets(search=self.search_input.text().strip() or None,
+                                         scan=self.scan_filter.currentData())
+        self.target_list.setUpdatesEnabled(False)
         self.target_list.clear()
-        data_dir = "data"
-        if not os.path.exists(data_dir):
+        for row in rows:
+            item = QListWidgetItem(row["name"])
+            item.setToolTip(self.target_summary(row))
+            self.target_list.addItem(item)
+            if row["name"] == current_name:
+                self.target_list.setCurrentItem(item)
+        self.target_list.setUpdatesEnabled(True)
+
+    def update_scan_filter(self):
+        scans = self.catalog.scan_types()
+        if [self.scan_filter.itemData(i) for i in range(1, self.scan_filter.count())] == scans:
             return
-        # Recursively find all .json files in data/
-        json_targets = []
-        for root, dirs, files in os.walk(data_dir):
-            for file in files:
-                if file.endswith('.json'):
-                    rel_path = os.path.relpath(os.path.join(root, file), data_dir)
-                    json_targets.append(rel_path[:-5])  # Remove .json
-        self.target_list.addItems(sorted(json_targets))
+        selected = self.scan_filter.currentData()
+        self.scan_filter.blockSignals(True)
+        self.scan_filter.clear()
+        self.scan_filter.addItem("All scan types", None)
+        for scan in scans:
+            self.scan_filter.addItem(scan_label(scan), scan)
+        index = self.scan_filter.findData(selected)
+        self.scan_filter.setCurrentIndex(max(index, 0))
+        self.scan_filter.blockSignals(False)
+
+    @staticmethod
+    def target_summary(row):
+        if row["kind"] == PROFILE:
+            parts = [f"Saved profile: {row['items']} entries"]
+        else:
+            parts = [", ".join(scan_label(scan) for scan in row["scan_types"]) or "No scans",
+                     f"{row['items']} items"]
+        parts.append(f"{row['size'] / 1024:.1f} KB")
+        if row["mtime"]:
+            parts.append("updated " + time.strftime("%Y-%m-%d %H:%M", time.localtime(row["mtime"])))
+        return " · ".join(parts)
+
+    def watch_target(self, target_name):
+        """Watches the open target's directory so its entry stays current."""
+        target_dir = os.path.join(self.catalog.data_dir, target_name)
+        if self.watched_target == target_dir:
+            return
+        if self.watched_target:
+            self.watcher.removePath(self.watched_target)
+        self.watched_target = target_dir if os.path.isdir(target_dir) else None
+        if self.watched_target:
+            self.watcher.addPath(self.watched_target)
 
     def display_target_data(self, item):
         target_name = item.text()
+        self.watch_target(target_name)
         
         # Display input box content for selected target
-        data_dir = "data"
-        path = os.path.join(data_dir, f"{target_name}.json")
+        path = os.path.join(storage.DATA_DIR, f"{target_name}.json")
         if os.path.exists(path):
             with open(path, 'r') as f:
                 try:
@@ -97,18 +265,35 @@ class TargetManager(QWidget):
         name, ok = QInputDialog.getText(self, "Save Target", "Enter a name for this target profile:")
         if not ok or not name.strip():
             return
-        data_dir = "data"
-        os.makedirs(data_dir, exist_ok=True)
-        # Parse input (split by comma/newline, strip, dedup)
-        entries = self.input_box.toPlainText().replace(",", "\n").split("\n")
-        entries = sorted(set([x.strip() for x in entries if x.strip()]))
+        os.makedirs(storage.DATA_DIR, exist_ok=True)
+        entries = self.parse_entries()
         if not entries:
             QMessageBox.warning(self, "No Data", "No usernames or emails entered.")
             return
-        path = os.path.join(data_dir, f"{name}.json")
+        path = os.path.join(storage.DATA_DIR, f"{name}.json")
         with open(path, 'w') as f:
-            safe_json_dump(entries, f, indent=2)
-        self.populate_target_list()
+            dump(entries, f, pretty=True)
+        self.catalog.refresh_target(name)
+        self.update_targets([name])
+
+    def parse_entries(self):
+        """Parses the multi-target input (split by comma/newline, strip, dedup)."""
+        entries = self.input_box.toPlainText().replace(",", "\n").split("\n")
+        return sorted(set([x.strip() for x in entries if x.strip()]))
+
+    def send_to_scan(self):
+        entries = self.parse_entries()
+        if not entries:
+            QMessageBox.warning(self, "No Data", "No usernames or emails entered.")
+            return
+        self.scan_requested.emit(entries)
+
+    def open_target(self, name):
+        """Selects and displays a target by name (e.g. clicked in the graph)."""
+        items = self.target_list.findItems(name, Qt.MatchExactly)
+        if items:
+            self.target_list.setCurrentItem(items[0])
+            self.display_target_data(items[0])
 
     def load_target(self):
         item = self.target_list.currentItem()
@@ -123,93 +308,91 @@ class TargetManager(QWidget):
             QMessageBox.warning(self, "No Selection", "Select a target to delete.")
             return
         name = item.text()
-        data_dir = "data"
-        path = os.path.join(data_dir, f"{name}.json")
+        path = os.path.join(storage.DATA_DIR, f"{name}.json")
         if os.path.exists(path):
             os.remove(path)
-        self.populate_target_list()
+        self.catalog.refresh_target(name)
+        self.update_targets([name])
         self.input_box.clear()
 
     def display_raw_data(self, target_name):
-        target_dir = os.path.join("data", target_name)
-        self.raw_data_view.clear()
-        html = f"<h1>{target_name}</h1>"
+        # Loaded and rendered in the background; see RawDataView.
+        self.raw_data_view.show_target(target_name)
 
-        if not os.path.isdir(target_dir):
-            self.raw_data_view.setHtml(html)
-            return
+    def display_correlations(self, target_name):
+        """Looks up the target's correlations in the background, then shows them and the graph."""
+        self.correlations_request += 1
+        request = self.correlations_request
+        self.correlations_view.setHtml(f"<h1>Correlations for {escape(target_name)}</h1><p>Loading…</p>")
 
-        for filename in sorted(os.listdir(target_dir)):
-            if filename.endswith(".json"):
-                file_path = os.path.join(target_dir, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                scan_type = filename.replace(".json", "").replace("_", " ").title()
-                html += f"<h2>{scan_type}</h2>"
-
-                if scan_type == "Username":
-                    if data:
-                        html += "<ul>"
-                        for url in data:
-                            html += f"<li><a href='{url}'>{url}</a></li>"
-                        html += "</ul>"
-                    else:
-                        html += "<p>No accounts found.</p>"
-                else:
-                    html += self.format_dict_to_html_table(data)
-        
-        self.raw_data_view.setHtml(html)
+        def run():
+            try:
+                html = self.correlations_html(target_name)
+                # The target joins the merged investigation graph.
+                get_investigation().add_target(target_name)
+            except Exception as e:
+                print(f"Error finding correlations for {target_name}: {e}")
+                html = f"<h1>Correlations for {escape(target_name)}</h1><p>Error: {escape(str(e))}</p>"
+            self.correlations_ready.emit(request, html)
+        threading.Thread(target=run, daemon=True).start()
 
-    def display_correlations(self, target_name):
-        identity = TargetIdentity(target_name)
-        correlations = find_correlations(identity)
+    def show_correlations(self, request, html):
+        if request != self.correlations_request:
+            return  # another target was opened meanwhile
+        self.correlations_view.setHtml(html)
+        self.graph_view.show_investigation(get_investigation())
 
-        # Update Correlations Tab
-        self.correlations_view.clear()
-        corr_html = f"<h1>Correlations for {target_name}</h1>"
+    def correlations_html(self, target_name):
+        correlations = find_correlations(get_identity(target_name))
+        parts = [f"<h1>Correlations for {escape(target_name)}</h1>"]
         if not any(correlations.values()):
-            corr_html += "<p>No correlations found.</p>"
+            parts.append("<p>No correlations found.</p>")
         else:
-            corr_html += self.format_correlations_to_html(correlations)
-        self.correlations_view.setHtml(corr_html)
-
-        # Update Graph View
-        graph = create_graph_from_identity(identity, correlations)
-        self.graph_view.update_graph(graph)
+            parts.append(self.format_correlations_to_html(correlations))
+        parts.append(self.format_shared_artifacts_to_html(find_shared_artifacts(target_name)))
+        parts.append(self.format_fuzzy_matches_to_html(find_fuzzy_correlations(target_name)))
+        return "".join(parts)
 
     def format_correlations_to_html(self, correlations):
-        html = ""
+        parts = []
         for key, values in correlations.items():
             if not values:
                 continue
-
-            html += f"<h3>{key.replace('_', ' ').title()}</h3>"
-
+            parts.append(f"<h3>{key_label(key)}</h3>")
             if isinstance(values, list):
-                html += "<ul>"
-                for value in values:
-                    html += f"<li>{value}</li>"
-                html += "</ul>"
+                parts.append(f"<ul>{''.join(f'<li>{escape(str(value))}</li>' for value in values)}</ul>")
             elif isinstance(values, dict):
                 # Re-use the existing table formatting for dictionaries
-                html += self.format_dict_to_html_table(values)
+                parts.append(self.format_dict_to_html_table(values))
             else:
-                html += f"<p>{values}</p>"
-        return html
+                parts.append(f"<p>{escape(str(values))}</p>")
+        return "".join(parts)
+
+    def format_shared_artifacts_to_html(self, shared):
+        if not shared:
+            return ""
+        parts = ["<h2>Shared With Other Targets</h2>"]
+        for kind, entries in shared.items():
+            parts.append(f"<h3>{key_label(kind)}</h3><ul>")
+            for value, count, targets in entries:
+                more = f" (+{count - len(targets)} more)" if count > len(targets) else ""
+                parts.append(f"<li>{escape(value)}: {escape(', '.join(targets))}{more}</li>")
+            parts.append("</ul>")
+        return "".join(parts)
+
+    def format_fuzzy_matches_to_html(self, matches):
+        if not matches:
+            return ""
+        parts = ["<h2>Possible Matches</h2>"]
+        for kind, entries in matches.items():
+            parts.append(f"<h3>{key_label(kind)}</h3><ul>")
+            for value, other_value, confidence, count, targets in entries:
+                more = f" (+{count - len(targets)} more)" if count > len(targets) else ""
+                parts.append(f"<li>{escape(value)} ~ {escape(other_value)} ({confidence:.0%}): "
+                             f"{escape(', '.join(targets))}{more}</li>")
+            parts.append("</ul>")
+        return "".join(parts)
 
     def format_dict_to_html_table(self, data):
-        if not data:
-            return "<p>No data found.</p>"
-        
-        table_html = "<style> table { width: 100%; border-collapse: collapse; font-family: sans-serif; } th, td { padding: 8px; text-align: left; border-bottom: 1px solid #444; } th { background-color: #222; color: #eee; } tr:nth-child(even) {background-color: #333;} </style>"
-        table_html += "<table>"
-        for key, value in data.items():
-            key_str = str(key).replace('_', ' ').title()
-            if isinstance(value, list):
-                value_str = "<br>".join(map(str, value))
-            else:
-                value_str = str(value)
-            table_html += f"<tr><td style='width: 25%;'><b>{key_str}</b></td><td>{value_str}</td></tr>"
-        table_html += "</table>"
-        return table_html
+        # The table style is the view's default stylesheet, set once.
+        return table_html(table_rows(data)) if data else "<p>No data found.</p>"